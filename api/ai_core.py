@@ -1,8 +1,7 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import os
 import logging
 import asyncio
-from anthropic import Anthropic
 from sqlalchemy.orm import Session
 from models.grant import Grant
 from models.organisation import OrganisationProfile
@@ -13,19 +12,44 @@ from datetime import datetime
 from .utils import rate_limit, cache_result, get_db_session
 from pydantic import BaseModel, Field, validator
 from .monitoring import track_timing, set_model_info, update_system_metrics, ELIGIBILITY_REQUESTS
-from .cache_manager import cached
+from .cache_manager import cache
+from .llm import llm_client
+from .changes import change_operation, record_changes
+from .grant_events import grants_written
+import hashlib
 import json
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Anthropic client
-anthropic = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
-
 # Set model info for monitoring
 set_model_info("claude-3-opus", "20240229")
 
+ELIGIBILITY_MODEL = "claude-3-opus-20240229"
+ELIGIBILITY_SYSTEM_PROMPT = "You are an expert grant analyst. Analyze grant eligibility based on the provided information."
+# Bump whenever the prompt template, system prompt, sampling or response parsing
+# changes, so results produced the old way are no longer served
+ELIGIBILITY_PROMPT_VERSION = 2
+
+# The fields construct_eligibility_prompt reads
+PROMPT_GRANT_FIELDS = ('name', 'funder', 'description', 'amount_string', 'due_date')
+# Organisation profile columns shown to the LLM (eligibility and drafts), with their labels
+PROFILE_PROMPT_LINES = (
+    ('Name', 'name'),
+    ('Mission', 'mission'),
+    ('Focus Areas', 'focus_areas'),
+    ('Target Demographics', 'target_demographics'),
+    ('Annual Revenue', 'annual_revenue'),
+    ('DGR Status', 'dgr_status'),
+    ('Profile', 'profile_text')
+)
+PROMPT_PROFILE_FIELDS = tuple(field for _, field in PROFILE_PROMPT_LINES)
+
+# Results are addressed by their inputs and never invalidated; unused ones age out
+ELIGIBILITY_CACHE_TTL = 30 * 24 * 3600
+ELIGIBILITY_MEMORY_TTL = 3600
+
 class EligibilityCriterion(BaseModel):
     """Model for individual eligibility criteria."""
     name: str
@@ -61,6 +85,18 @@ class EligibilityAnalysis(BaseModel):
             raise ValueError('List cannot be empty')
         return v
 
+def format_profile(org_profile, prefix: str = '') -> str:
+    """The organisation profile as prompt lines, one per ``PROFILE_PROMPT_LINES`` entry."""
+    lines = []
+    for label, field in PROFILE_PROMPT_LINES:
+        value = getattr(org_profile, field)
+        if isinstance(value, (list, tuple)):
+            value = ', '.join(str(item) for item in value)
+        elif isinstance(value, bool):
+            value = 'Yes' if value else 'No'
+        lines.append(f"{prefix}{label}: {value if value not in (None, '') else 'Not provided'}")
+    return '\n'.join(lines)
+
 def construct_eligibility_prompt(grant, org_profile):
     """Construct prompt for eligibility analysis."""
     return f"""Analyze grant eligibility for:
@@ -73,14 +109,7 @@ Grant Details:
 - Due Date: {grant.due_date}
 
 Organization Profile:
-- Name: {org_profile.name}
-- Mission: {org_profile.mission}
-- Focus Areas: {org_profile.focus_areas}
-- Years Active: {org_profile.years_active}
-- Annual Budget: {org_profile.annual_budget}
-- Previous Grants: {org_profile.previous_grants}
-- Staff Size: {org_profile.staff_size}
-- Target Demographics: {org_profile.target_demographics}
+{format_profile(org_profile, '- ')}
 
 Analyze the alignment between the grant requirements and organization profile.
 Format your response in JSON with the following structure:
@@ -98,6 +127,22 @@ Format your response in JSON with the following structure:
     ]
 }}"""
 
+def eligibility_cache_key(grant, org_profile) -> str:
+    """
+    Cache key for an analysis: a hash of everything that shapes the prompt and response.
+
+    Any edit to a prompted grant or profile field gives a new key, so stale
+    results are never read and nothing needs invalidating.
+    """
+    inputs = {
+        'model': ELIGIBILITY_MODEL,
+        'prompt_version': ELIGIBILITY_PROMPT_VERSION,
+        'grant': {field: getattr(grant, field) for field in PROMPT_GRANT_FIELDS},
+        'org': {field: getattr(org_profile, field) for field in PROMPT_PROFILE_FIELDS}
+    }
+    raw = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+    return f"eligibility_scan:{hashlib.sha256(raw.encode()).hexdigest()}"
+
 def parse_ai_response(response_text: str) -> Dict:
     """Parse and validate AI response."""
     try:
@@ -107,39 +152,66 @@ def parse_ai_response(response_text: str) -> Dict:
     except (json.JSONDecodeError, ValueError) as e:
         raise ValueError(f"Invalid AI response format: {str(e)}")
 
-@cached(key_prefix='eligibility_scan')
+def load_scan_subjects(session: Session, grant_id: int, org_id: Optional[int] = None):
+    """The grant and the organisation profile it is analysed for (either may be None)."""
+    grant = session.query(Grant).filter(Grant.id == grant_id).first()
+    profile_id = org_id if org_id is not None else (grant.org_id if grant else None)
+    org_profile = session.query(OrganisationProfile).filter(OrganisationProfile.id == profile_id).first()
+    return grant, org_profile
+
+def save_analysis(session: Session, grant: Grant, result: Dict) -> None:
+    """Store an analysis in the grant's ``eligibility_analysis``, logging the change in the same commit."""
+    grant.eligibility_analysis = result
+    grant.updated_at = datetime.utcnow()
+    record_changes([(grant.id, change_operation(False, grant.status))], session)
+    session.commit()
+
+async def analyze_eligibility(grant, org_profile) -> Dict:
+    """The LLM's analysis of ``grant`` for ``org_profile``, from cache when the inputs are unchanged."""
+    # Unchanged inputs were already analysed
+    cache_key = eligibility_cache_key(grant, org_profile)
+    cached_result = cache.get(cache_key, memory_ttl=ELIGIBILITY_MEMORY_TTL)
+    if cached_result is not None:
+        return cached_result
+
+    # Construct prompt
+    prompt = construct_eligibility_prompt(grant, org_profile)
+
+    # Call AI API
+    response = await llm_client().create_message(
+        model=ELIGIBILITY_MODEL,
+        max_tokens=1500,
+        temperature=0.2,
+        system=ELIGIBILITY_SYSTEM_PROMPT,
+        messages=[{"role": "user", "content": prompt}]
+    )
+
+    # Parse and validate response
+    result = parse_ai_response(response.content[0].text)
+    cache.set(cache_key, result, memory_ttl=ELIGIBILITY_MEMORY_TTL, redis_ttl=ELIGIBILITY_CACHE_TTL)
+    return result
+
 @track_timing('eligibility_scan')
-async def run_eligibility_scan(grant_id: int) -> Dict:
-    """Run eligibility scan for a grant."""
+async def run_eligibility_scan(grant_id: int, org_id: Optional[int] = None) -> Dict:
+    """
+    Run eligibility scan for a grant, for ``org_id`` or else the grant's own organisation.
+
+    The blocking database work runs in the default executor, so the event
+    loop only waits on the LLM.
+    """
+    session = get_db_session()
     try:
         # Get grant and org data
-        session = get_db_session()
-        grant = session.query(Grant).filter(Grant.id == grant_id).first()
-        org_profile = session.query(OrganisationProfile).filter(OrganisationProfile.id == grant.org_id).first()
+        grant, org_profile = await asyncio.to_thread(load_scan_subjects, session, grant_id, org_id)
 
         if not grant or not org_profile:
             raise ValueError("Grant or organization not found")
 
-        # Construct prompt
-        prompt = construct_eligibility_prompt(grant, org_profile)
-
-        # Call AI API
-        client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
-        response = await client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=1500,
-            temperature=0.2,
-            system="You are an expert grant analyst. Analyze grant eligibility based on the provided information.",
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        # Parse and validate response
-        result = parse_ai_response(response.content[0].text)
+        result = await analyze_eligibility(grant, org_profile)
 
-        # Update grant status
-        grant.last_analysis = datetime.now()
-        grant.eligibility_score = result['score']
-        session.commit()
+        # Store the analysis on the grant
+        await asyncio.to_thread(save_analysis, session, grant, result)
+        grants_written([grant.id])
 
         ELIGIBILITY_REQUESTS.labels(status='success').inc()
         return result
@@ -147,6 +219,8 @@ async def run_eligibility_scan(grant_id: int) -> Dict:
     except Exception as e:
         ELIGIBILITY_REQUESTS.labels(status='error').inc()
         raise Exception(f"Error in eligibility scan: {str(e)}")
+    finally:
+        session.close()
 
 def format_eligibility_results(analysis: Dict[str, Any]) -> str:
     """Format eligibility analysis results for display."""
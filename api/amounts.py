@@ -0,0 +1,83 @@
+import re
+from typing import Optional, Tuple
+from sqlalchemy import bindparam, select
+
+_NUMBER_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(k|m|million|thousand)?\b', re.IGNORECASE)
+
+_MULTIPLIERS = {
+    'k': 1_000,
+    'thousand': 1_000,
+    'm': 1_000_000,
+    'million': 1_000_000
+}
+
+AmountRange = Tuple[Optional[float], Optional[float]]
+
+def parse_amount_range(text: Optional[str]) -> AmountRange:
+    """
+    Parse display text such as ``$5,000 - $20,000`` or ``Up to $10k`` into
+    ``(minimum, maximum)``; either bound is ``None`` when open or unknown.
+    """
+    if not text:
+        return None, None
+    values = []
+    for number, suffix in _NUMBER_RE.findall(text):
+        value = float(number.replace(',', ''))
+        if suffix:
+            value *= _MULTIPLIERS[suffix.lower()]
+        values.append(value)
+    if not values:
+        return None, None
+
+    lowered = text.lower()
+    if 'up to' in lowered or 'maximum' in lowered:
+        return None, max(values)
+    if len(values) == 1 and ('from' in lowered or 'at least' in lowered or '+' in text):
+        return values[0], None
+    return min(values), max(values)
+
+def ranges_overlap(amount: AmountRange, minimum: Optional[float], maximum: Optional[float]) -> bool:
+    """Whether a grant's amount range can satisfy a ``[minimum, maximum]`` filter."""
+    low, high = amount
+    if low is None and high is None:
+        return False
+    if minimum is not None and high is not None and high < minimum:
+        return False
+    if maximum is not None and low is not None and low > maximum:
+        return False
+    return True
+
+BACKFILL_BATCH_SIZE = 1000
+
+def backfill_amounts(connection, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Fill ``amount_min``/``amount_max`` from ``amount_string`` for every grant,
+    one id range per statement batch. Returns the number of rows updated.
+    """
+    from models.grant import Grant
+
+    table = Grant.__table__
+    update = (
+        table.update()
+        .where(table.c.id == bindparam('grant_id'))
+        .values(amount_min=bindparam('low'), amount_max=bindparam('high'))
+    )
+    updated, last_id = 0, 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.amount_string)
+            .where(table.c.id > last_id, table.c.amount_string.isnot(None))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        params = []
+        for grant_id, text in rows:
+            low, high = parse_amount_range(text)
+            if low is not None or high is not None:
+                params.append({'grant_id': grant_id, 'low': low, 'high': high})
+        if params:
+            connection.execute(update, params)
+        updated += len(params)
+        last_id = rows[-1][0]
@@ -0,0 +1,165 @@
+"""
+ASGI adapter for the Flask app.
+
+Under a sync WSGI worker an ``async def`` view gets a fresh event loop per
+request, and with it a fresh LLM client and connection pool. ``ASGIApp``
+serves the app from the server's event loop instead, one per worker
+process for its lifetime.
+
+It is asgiref's ``WsgiToAsgi`` around the app: every request goes through
+``Flask.wsgi_app`` in a bounded thread pool, and async views (eligibility
+analysis, drafting) run through Flask's own async support. Flask hands them
+to asgiref's ``async_to_sync``, which, in a thread started by the adapter,
+runs them on the server's loop, so they share its LLM client. The request's
+thread waits meanwhile, so the pool size bounds the requests in flight per
+worker. Blocking work an async view hands off (``asyncio.to_thread``) runs
+in the loop's default executor, not in that pool, so it can't be starved
+by the requests waiting on it.
+
+Two things differ from a stock ``WsgiToAsgi``: the WSGI app runs in the
+adapter's pool rather than asgiref's single shared thread, and the
+environ carries the server's loop so an ``AsyncBody`` response (server-sent
+events) can produce its chunks there.
+"""
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Union
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask import Flask, has_request_context, request
+from api.llm import close_llm_client
+
+DEFAULT_THREADS = 32
+
+# The environ key holding the server's event loop under ASGIApp
+LOOP_ENVIRON_KEY = 'grants.asgi_loop'
+
+class AsyncBody:
+    """
+    A response body produced by an async iterator of ``str`` or ``bytes``.
+
+    Like any streamed body it is read by the thread serving the request.
+    Under ``ASGIApp`` each chunk is produced on the server's loop, which
+    the view ran on, and sent as soon as it is ready. Under a WSGI server
+    the iterator is driven on a private event loop instead, one chunk per
+    ``next``, and the LLM client created on that loop is closed along with
+    it. The iterator must not rely on the request context, which is gone
+    by the time the body is read.
+    """
+
+    def __init__(self, chunks: AsyncIterator[Union[str, bytes]]):
+        self._chunks = chunks
+        self._loop: Optional[asyncio.AbstractEventLoop] = (
+            request.environ.get(LOOP_ENVIRON_KEY) if has_request_context() else None
+        )
+
+    def __aiter__(self) -> AsyncIterator[Union[str, bytes]]:
+        return self._chunks.__aiter__()
+
+    async def aclose(self) -> None:
+        close = getattr(self._chunks, 'aclose', None)
+        if close is not None:
+            await close()
+
+    def __iter__(self) -> Iterator[Union[str, bytes]]:
+        if self._loop is not None:
+            return self._iter_on(self._loop)
+        return self._iter_private()
+
+    def _iter_on(self, loop: asyncio.AbstractEventLoop) -> Iterator[Union[str, bytes]]:
+        chunks = self.__aiter__()
+
+        async def next_chunk():
+            return await chunks.__anext__()
+
+        try:
+            while True:
+                try:
+                    chunk = asyncio.run_coroutine_threadsafe(next_chunk(), loop).result()
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            # Releases whatever the iterator holds (an LLM stream) if the client goes away
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+
+    def _iter_private(self) -> Iterator[Union[str, bytes]]:
+        loop = asyncio.new_event_loop()
+        chunks = self.__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = loop.run_until_complete(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            loop.run_until_complete(self.aclose())
+            loop.run_until_complete(close_llm_client())
+            loop.close()
+
+class _Request(WsgiToAsgiInstance):
+    """One request through ``WsgiToAsgi``, run in the adapter's pool."""
+
+    def __init__(self, adapter: 'ASGIApp'):
+        super().__init__(adapter.wsgi_application, adapter.duplicate_header_limit)
+        self.adapter = adapter
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        self.loop = asyncio.get_running_loop()
+        await super().__call__(scope, receive, send)
+
+    def build_environ(self, scope: Dict[str, Any], body) -> Dict[str, Any]:
+        environ = super().build_environ(scope, body)
+        # The body is read whole, so it can be consumed without a Content-Length
+        environ['wsgi.input_terminated'] = True
+        environ[LOOP_ENVIRON_KEY] = self.loop
+        return environ
+
+    async def run_wsgi_app(self, body) -> None:
+        run = sync_to_async(_run_wsgi_app, thread_sensitive=False, executor=self.adapter.executor())
+        await run(self, body)
+
+# ``WsgiToAsgiInstance.run_wsgi_app`` without its single-thread ``sync_to_async``
+_run_wsgi_app = inspect.unwrap(WsgiToAsgiInstance.run_wsgi_app)
+
+class ASGIApp(WsgiToAsgi):
+    """Serves a Flask app over ASGI, running async views on the server's loop."""
+
+    def __init__(self, app: Flask, threads: int = DEFAULT_THREADS):
+        super().__init__(app)
+        self.app = app
+        self.threads = threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def executor(self) -> ThreadPoolExecutor:
+        """The request pool for the running loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        if self._executor is None or self._loop is not loop:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='asgi')
+            self._loop = loop
+        return self._executor
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        else:
+            await _Request(self)(scope, receive, send)
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.executor()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
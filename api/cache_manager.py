@@ -1,25 +1,34 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 import json
 import time
 from functools import wraps
 import redis
 from datetime import datetime, timedelta
+import fnmatch
 import hashlib
 import os
 import redis
-import json
 from datetime import timedelta
 from typing import Any, Dict, Optional
 from functools import wraps
+import threading
+from collections import OrderedDict
 from .monitoring import CACHE_HITS, CACHE_MISSES
+from . import serialization
+
+# Entries kept in each process's memory tier; the least recently used go first
+MEMORY_MAX_ENTRIES = int(os.getenv('CACHE_MEMORY_MAX_ENTRIES', 10000))
 
 class TieredCache:
     """Two-level cache implementation with memory and Redis."""
     
-    def __init__(self):
+    def __init__(self, max_memory_entries: int = MEMORY_MAX_ENTRIES):
         """Initialize cache with memory and Redis backends."""
-        self._memory_cache: Dict[str, Dict[str, Any]] = {}
+        # Least recently used first; bounded by max_memory_entries
+        self._memory_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
         self._memory_expiry: Dict[str, datetime] = {}
+        self._memory_lock = threading.Lock()
+        self._max_memory_entries = max_memory_entries
         self._version = "1.0"
         
         # Initialize Redis connection
@@ -34,29 +43,36 @@ class TieredCache:
         """Get versioned cache key."""
         return f"{self._version}:{key}"
     
-    def get(self, key: str) -> Optional[Dict[str, Any]]:
-        """Get value from cache."""
+    def get(self, key: str, memory_ttl: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get value from cache.
+        
+        A Redis hit is copied into memory only until the earlier of its Redis
+        expiry and ``memory_ttl``; with neither it is not copied, so another
+        process's invalidation is seen on the next read.
+        """
         versioned_key = self._get_versioned_key(key)
         
         # Try memory cache first
-        if versioned_key in self._memory_cache:
-            if versioned_key not in self._memory_expiry or \
-               self._memory_expiry[versioned_key] > datetime.now():
-                CACHE_HITS.inc()
-                return self._memory_cache[versioned_key]
-            else:
-                # Expired from memory
-                del self._memory_cache[versioned_key]
-                if versioned_key in self._memory_expiry:
-                    del self._memory_expiry[versioned_key]
+        with self._memory_lock:
+            if versioned_key in self._memory_cache:
+                if versioned_key not in self._memory_expiry or \
+                   self._memory_expiry[versioned_key] > datetime.now():
+                    self._memory_cache.move_to_end(versioned_key)
+                    CACHE_HITS.inc()
+                    return self._memory_cache[versioned_key]
+                else:
+                    # Expired from memory
+                    self._forget(versioned_key)
         
         # Try Redis
         try:
             redis_value = self._redis_client.get(versioned_key)
             if redis_value:
-                value = json.loads(redis_value)
-                # Cache in memory
-                self._memory_cache[versioned_key] = value
+                value = serialization.loads(redis_value)
+                ttl = self._promotion_ttl(versioned_key, memory_ttl)
+                if ttl is not None:
+                    self._remember(versioned_key, value, ttl)
                 CACHE_HITS.inc()
                 return value
         except (redis.RedisError, json.JSONDecodeError):
@@ -65,18 +81,44 @@ class TieredCache:
         CACHE_MISSES.inc()
         return None
     
-    def set(self, key: str, value: Dict[str, Any], memory_ttl: Optional[int] = None) -> None:
+    def _promotion_ttl(self, versioned_key: str, memory_ttl: Optional[int]) -> Optional[float]:
+        """Seconds a copy of a Redis entry may stay in memory, or None to not copy it."""
+        bounds = [memory_ttl] if memory_ttl else []
+        remaining = self._redis_client.pttl(versioned_key)
+        # PTTL is -1 for a key without expiry and -2 once it is gone
+        if isinstance(remaining, int) and remaining > 0:
+            bounds.append(remaining / 1000)
+        return min(bounds) if bounds else None
+    
+    def _remember(self, versioned_key: str, value: Any, ttl: Optional[float]) -> None:
+        """Store in memory as most recently used, evicting the least recently used past the cap."""
+        with self._memory_lock:
+            self._memory_cache[versioned_key] = value
+            self._memory_cache.move_to_end(versioned_key)
+            if ttl:
+                self._memory_expiry[versioned_key] = datetime.now() + timedelta(seconds=ttl)
+            else:
+                self._memory_expiry.pop(versioned_key, None)
+            while len(self._memory_cache) > self._max_memory_entries:
+                oldest, _ = self._memory_cache.popitem(last=False)
+                self._memory_expiry.pop(oldest, None)
+    
+    def _forget(self, versioned_key: str) -> None:
+        """Drop a memory entry; the caller holds ``_memory_lock``."""
+        self._memory_cache.pop(versioned_key, None)
+        self._memory_expiry.pop(versioned_key, None)
+    
+    def set(self, key: str, value: Dict[str, Any], memory_ttl: Optional[int] = None,
+            redis_ttl: Optional[int] = None) -> None:
         """Set value in cache."""
         versioned_key = self._get_versioned_key(key)
         
         # Set in memory
-        self._memory_cache[versioned_key] = value
-        if memory_ttl:
-            self._memory_expiry[versioned_key] = datetime.now() + timedelta(seconds=memory_ttl)
+        self._remember(versioned_key, value, memory_ttl)
         
         # Set in Redis
         try:
-            self._redis_client.set(versioned_key, json.dumps(value))
+            self._redis_client.set(versioned_key, serialization.dumps(value), ex=redis_ttl)
         except redis.RedisError:
             pass
     
@@ -85,10 +127,8 @@ class TieredCache:
         versioned_key = self._get_versioned_key(key)
         
         # Remove from memory
-        if versioned_key in self._memory_cache:
-            del self._memory_cache[versioned_key]
-        if versioned_key in self._memory_expiry:
-            del self._memory_expiry[versioned_key]
+        with self._memory_lock:
+            self._forget(versioned_key)
         
         # Remove from Redis
         try:
@@ -96,16 +136,30 @@ class TieredCache:
         except redis.RedisError:
             pass
     
+    def invalidate_many(self, keys: List[str]) -> None:
+        """Invalidate several cache entries with a single Redis round-trip."""
+        versioned_keys = [self._get_versioned_key(key) for key in keys]
+        if not versioned_keys:
+            return
+        
+        with self._memory_lock:
+            for k in versioned_keys:
+                self._forget(k)
+        
+        try:
+            self._redis_client.delete(*versioned_keys)
+        except redis.RedisError:
+            pass
+    
     def invalidate_pattern(self, pattern: str) -> None:
         """Invalidate all keys matching pattern."""
         versioned_pattern = self._get_versioned_key(pattern)
         
-        # Remove from memory
-        memory_keys = [k for k in self._memory_cache.keys() if k.startswith(versioned_pattern)]
-        for k in memory_keys:
-            del self._memory_cache[k]
-            if k in self._memory_expiry:
-                del self._memory_expiry[k]
+        # Remove from memory, using the same glob semantics as Redis SCAN MATCH
+        with self._memory_lock:
+            memory_keys = [k for k in self._memory_cache.keys() if fnmatch.fnmatchcase(k, versioned_pattern)]
+            for k in memory_keys:
+                self._forget(k)
         
         # Remove from Redis
         try:
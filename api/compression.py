@@ -0,0 +1,154 @@
+"""
+HTTP response compression.
+
+gzip is always available; brotli (``br``) and zstd are used when the
+``brotli`` / ``zstandard`` packages are installed. The encoding is negotiated
+from ``Accept-Encoding``, bodies under ``COMPRESSION_MIN_SIZE`` are sent as
+is, and streamed responses are compressed chunk by chunk.
+"""
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/csv',
+    'text/html',
+    'text/plain'
+}
+
+class GzipStream:
+    """Incremental gzip encoder."""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        # Sync-flush so every chunk of a stream reaches the client promptly
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class BrotliStream:
+    """Incremental brotli encoder."""
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class ZstdStream:
+    """Incremental zstd encoder."""
+
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+def _available_streams() -> Dict[str, Callable]:
+    """Encoders usable here, in order of server preference."""
+    streams = {}
+    if zstandard is not None:
+        streams['zstd'] = ZstdStream
+    if brotli is not None:
+        streams['br'] = BrotliStream
+    streams['gzip'] = GzipStream
+    return streams
+
+STREAMS = _available_streams()
+
+def negotiate_encoding() -> Optional[str]:
+    """Pick the best supported content-coding the client accepts, if any."""
+    return request.accept_encodings.best_match(list(STREAMS))
+
+def compression_enabled() -> bool:
+    """Whether the app registered compression (``setup_compression``)."""
+    return 'compression' in current_app.extensions
+
+def min_size() -> int:
+    return current_app.config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a whole body with the given content-coding."""
+    if encoding == 'gzip':
+        return zlib.compress(data, GZIP_LEVEL, wbits=31)
+    stream = STREAMS[encoding]()
+    return stream.compress(data) + stream.finish()
+
+def _compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    stream = STREAMS[encoding]()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            encoded = stream.compress(chunk)
+            if encoded:
+                yield encoded
+        yield stream.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def is_compressible(response: Response) -> bool:
+    """Whether the response type benefits from compression at all."""
+    return (
+        response.mimetype in COMPRESSIBLE_MIMETYPES
+        and 'Content-Encoding' not in response.headers
+        and not response.direct_passthrough
+        and response.status_code not in (204, 206, 304)
+        and response.status_code >= 200
+    )
+
+def set_encoding(response: Response, encoding: str) -> None:
+    """Mark a response as encoded; the entity tag becomes weak (RFC 9110, 8.8.3)."""
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+def compress_response(response: Response) -> Response:
+    """Compress ``response`` in place when the client and size allow it."""
+    if request.method == 'HEAD' or not is_compressible(response):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = negotiate_encoding()
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < min_size():
+            return response
+        response.set_data(compress(body, encoding))
+    set_encoding(response, encoding)
+    return response
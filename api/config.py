@@ -27,6 +27,17 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = JWT_ACCESS_TOKEN_EXPIRES
     JWT_REFRESH_TOKEN_EXPIRES = JWT_REFRESH_TOKEN_EXPIRES
     RATE_LIMIT_DEFAULT = "100 per minute"
+    # Read-through response caching, switched per view (see api/response_cache.py)
+    RESPONSE_CACHE_ROUTES = {
+        'get_grant': os.getenv('RESPONSE_CACHE_GET_GRANT', 'true').lower() == 'true',
+        'get_grants': os.getenv('RESPONSE_CACHE_GET_GRANTS', 'true').lower() == 'true',
+        'search_grants': os.getenv('RESPONSE_CACHE_SEARCH_GRANTS', 'true').lower() == 'true'
+    }
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+    # Bodies smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    # Percolation and duplicate detection run after the write by default (see api/grant_events.py)
+    GRANT_HOOKS_INLINE = os.getenv('GRANT_HOOKS_INLINE', 'false').lower() == 'true'
     CORS_ORIGINS = CORS_ORIGINS
 
 class DevelopmentConfig(Config):
@@ -40,6 +51,7 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     REDIS_DB = 1
+    GRANT_HOOKS_INLINE = True
 
 class ProductionConfig(Config):
     """Production configuration."""
@@ -0,0 +1,123 @@
+"""
+Due-date bucket index behind the deadline calendar.
+
+Each worker keeps every dated grant, except removed ones (merged
+duplicates), in per-(week, status) lists sorted by due date, so "what's
+due in the next N weeks" is a handful of dictionary lookups and slices.
+The index is built on first use and kept current from the table's
+version (``api.watermark``), applying only grants changed since its last
+sync, including writes made by other workers.
+"""
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from models import db
+from models.grant import Grant
+from api.changes import REMOVED_STATUSES
+from api.watermark import EngineLocal, WatermarkIndex
+
+DEFAULT_HORIZON_WEEKS = 4
+MAX_HORIZON_WEEKS = 52
+
+SUMMARY_COLUMNS = (
+    Grant.id, Grant.name, Grant.funder, Grant.due_date,
+    Grant.status, Grant.amount_string, Grant.updated_at
+)
+
+UNKNOWN_STATUS = 'unknown'
+
+def parse_horizon(value: Optional[str]) -> int:
+    """Parse the ``horizon`` query parameter (weeks)."""
+    if value is None or value == '':
+        return DEFAULT_HORIZON_WEEKS
+    try:
+        weeks = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('horizon must be a whole number of weeks')
+    if not 1 <= weeks <= MAX_HORIZON_WEEKS:
+        raise ValueError(f'horizon must be between 1 and {MAX_HORIZON_WEEKS} weeks')
+    return weeks
+
+def week_start(value: datetime) -> date:
+    """Monday of the calendar week containing ``value``."""
+    day = value.date()
+    return day - timedelta(days=day.weekday())
+
+class DeadlineIndex(WatermarkIndex):
+    """In-process index of dated grants bucketed by (week, status)."""
+
+    columns = SUMMARY_COLUMNS
+
+    def __init__(self):
+        super().__init__()
+        self._grants: Dict[int, Dict[str, Any]] = {}
+        self._buckets: Dict[Tuple[date, str], List[Tuple[datetime, int]]] = {}
+
+    def _remove(self, grant_id: int) -> None:
+        summary = self._grants.pop(grant_id, None)
+        if summary is None:
+            return
+        key = (week_start(summary['due_date']), summary['status'])
+        bucket = self._buckets[key]
+        del bucket[bisect_left(bucket, (summary['due_date'], grant_id))]
+        if not bucket:
+            del self._buckets[key]
+
+    def _apply(self, row) -> None:
+        """Insert, move or drop one grant according to its current row."""
+        self._remove(row.id)
+        if row.due_date is None or row.status in REMOVED_STATUSES:
+            return
+        summary = {
+            'id': row.id,
+            'name': row.name,
+            'funder': row.funder,
+            'due_date': row.due_date,
+            'status': row.status or UNKNOWN_STATUS,
+            'amount_string': row.amount_string
+        }
+        self._grants[row.id] = summary
+        insort(self._buckets.setdefault((week_start(row.due_date), summary['status']), []),
+               (row.due_date, row.id))
+
+    def _build(self) -> None:
+        for row in db.session.query(*SUMMARY_COLUMNS).filter(Grant.due_date.isnot(None)):
+            self._apply(row)
+
+    def calendar(self, start: datetime, weeks: int) -> Dict[str, Any]:
+        """
+        Grants due in ``[start, start + weeks)`` grouped by calendar week and status.
+
+        Every week in the window is listed, including empty ones; within a
+        status, grants are ordered by due date.
+        """
+        end = start + timedelta(weeks=weeks)
+        first, last = week_start(start), week_start(end - timedelta(microseconds=1))
+        statuses = sorted({status for _, status in self._buckets})
+        result, total = [], 0
+        week = first
+        while week <= last:
+            by_status = {}
+            for status in statuses:
+                bucket = self._buckets.get((week, status))
+                if not bucket:
+                    continue
+                # Only the first and last weeks can extend past the window
+                lo = bisect_left(bucket, (start,)) if week == first else 0
+                hi = bisect_left(bucket, (end,)) if week == last else len(bucket)
+                if lo < hi:
+                    by_status[status] = [self._grants[grant_id] for _, grant_id in bucket[lo:hi]]
+            count = sum(len(grants) for grants in by_status.values())
+            total += count
+            result.append({'week_start': week, 'count': count, 'statuses': by_status})
+            week += timedelta(weeks=1)
+        return {'start': start, 'end': end, 'horizon_weeks': weeks, 'total': total, 'weeks': result}
+
+    def query(self, start: datetime, weeks: int) -> Dict[str, Any]:
+        """Sync with the database, then build the calendar."""
+        with self._lock:
+            self.sync()
+            return self.calendar(start, weeks)
+
+# The deadline index for the current app's database
+deadline_index = EngineLocal(DeadlineIndex)
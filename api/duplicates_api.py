@@ -0,0 +1,123 @@
+from flask import Blueprint, jsonify, request
+from datetime import datetime
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
+import logging
+
+from models import db
+from models.duplicate import DuplicateCandidate
+from api.changes import change_operation, record_changes
+from api.dedup import merge_duplicate
+from api.grant_events import grants_written
+from api.pagination import decode_rank_cursor, encode_rank_cursor, page_response, parse_limit
+
+logger = logging.getLogger(__name__)
+duplicates_bp = Blueprint('duplicates', __name__)
+
+GRANT_SUMMARY_FIELDS = ('id', 'name', 'funder', 'source_url', 'due_date', 'amount_string', 'status')
+
+def candidate_to_dict(candidate: DuplicateCandidate):
+    """A candidate pair with a summary of both grants."""
+    return dict(
+        candidate.to_dict(),
+        grant=candidate.grant.to_dict(GRANT_SUMMARY_FIELDS),
+        duplicate=candidate.duplicate.to_dict(GRANT_SUMMARY_FIELDS)
+    )
+
+@duplicates_bp.route('/api/grants/duplicates', methods=['GET'])
+def get_duplicate_candidates():
+    """List likely duplicate pairs, most similar first."""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        status = request.args.get('status', 'pending')
+        
+        rank = -DuplicateCandidate.similarity
+        query = DuplicateCandidate.query.filter(DuplicateCandidate.status == status)
+        if cursor:
+            last_rank, last_id = decode_rank_cursor(cursor)
+            query = query.filter(tuple_(rank, DuplicateCandidate.id) > tuple_(last_rank, last_id))
+        rows = query.order_by(rank, DuplicateCandidate.id).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_rank_cursor(-rows[-1].similarity, rows[-1].id)
+        return jsonify(page_response([candidate_to_dict(c) for c in rows], next_cursor)), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@duplicates_bp.route('/api/grants/duplicates/<int:candidate_id>/merge', methods=['POST'])
+def merge_duplicate_candidate(candidate_id):
+    """Merge a duplicate pair into the grant given as ``keep_id``."""
+    try:
+        candidate = db.session.get(DuplicateCandidate, candidate_id)
+        if not candidate:
+            return jsonify({
+                'success': False,
+                'error': 'Duplicate candidate not found'
+            }), 404
+        
+        data = request.get_json(silent=True) or {}
+        if 'keep_id' not in data:
+            raise ValueError('Missing required field: keep_id')
+        kept, dropped = merge_duplicate(candidate, int(data['keep_id']))
+        record_changes([(grant.id, change_operation(False, grant.status)) for grant in (kept, dropped)])
+        db.session.commit()
+        grants_written([kept.id, dropped.id])
+        
+        return jsonify({
+            'success': True,
+            'data': candidate_to_dict(candidate),
+            'message': 'Grants merged successfully'
+        }), 200
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error merging duplicate candidate {candidate_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Database error occurred'
+        }), 500
+
+@duplicates_bp.route('/api/grants/duplicates/<int:candidate_id>/dismiss', methods=['POST'])
+def dismiss_duplicate_candidate(candidate_id):
+    """Mark a pair as not duplicates; it will not be reported again."""
+    try:
+        candidate = db.session.get(DuplicateCandidate, candidate_id)
+        if not candidate:
+            return jsonify({
+                'success': False,
+                'error': 'Duplicate candidate not found'
+            }), 404
+        if candidate.status != 'pending':
+            return jsonify({
+                'success': False,
+                'error': f'Duplicate candidate is already {candidate.status}'
+            }), 400
+        
+        candidate.status = 'dismissed'
+        candidate.resolved_at = datetime.utcnow()
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'data': candidate.to_dict()
+        }), 200
+        
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error dismissing duplicate candidate {candidate_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Database error occurred'
+        }), 500
@@ -0,0 +1,186 @@
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy.exc import SQLAlchemyError
+import logging
+
+from models import db
+from models.grant import Grant
+from models.organisation import OrganisationProfile
+from models.eligibility import EligibilityScan, EligibilityScanResult
+from api.eligibility_scans import MAX_SCAN_GRANTS, RESULT_STATUSES, parse_concurrency, start_scan
+from api.grants_api import (
+    apply_amount_filters, apply_date_filters, apply_grant_filters, apply_keyword_filter, parse_fields
+)
+from api.fuzzy import paginate_matches
+from api.pagination import page_response, paginate_by, parse_limit
+from api.relevance import parse_min_relevance, profile_terms, relevance_index
+from api.rows import row_encoder
+
+logger = logging.getLogger(__name__)
+eligibility_bp = Blueprint('eligibility', __name__)
+
+def parse_grant_ids(value) -> list:
+    """Parse a ``grant_ids`` list from a request body."""
+    if not isinstance(value, list) or not value:
+        raise ValueError('grant_ids must be a non-empty list')
+    try:
+        grant_ids = list(dict.fromkeys(int(grant_id) for grant_id in value))
+    except (TypeError, ValueError):
+        raise ValueError('grant_ids must be integers')
+    if len(grant_ids) > MAX_SCAN_GRANTS:
+        raise ValueError(f'A scan can cover at most {MAX_SCAN_GRANTS} grants')
+    return grant_ids
+
+def select_grant_ids(data) -> list:
+    """The grants to scan: ``grant_ids`` from the body, or the listing filters in the query string."""
+    if 'grant_ids' in data:
+        requested = parse_grant_ids(data['grant_ids'])
+        found = {grant_id for (grant_id,) in db.session.query(Grant.id).filter(Grant.id.in_(requested))}
+        return [grant_id for grant_id in requested if grant_id in found]
+
+    query = apply_keyword_filter(db.session.query(Grant.id), request.args.get('keyword', '').lower().strip())
+    query = apply_date_filters(apply_amount_filters(apply_grant_filters(query)))
+    grant_ids = [grant_id for (grant_id,) in query.order_by(Grant.due_date, Grant.id).limit(MAX_SCAN_GRANTS + 1)]
+    if len(grant_ids) > MAX_SCAN_GRANTS:
+        raise ValueError(f'The filter matches more than {MAX_SCAN_GRANTS} grants; narrow it or pass grant_ids')
+    return grant_ids
+
+@eligibility_bp.route('/api/orgs/<int:org_id>/eligibility-scan', methods=['POST'])
+def create_eligibility_scan(org_id):
+    """
+    Start an eligibility scan of many grants for an organisation.
+
+    Takes ``grant_ids`` in the body, or else the grant listing filters
+    (status, funder, keyword, amounts, dates) in the query string, plus an
+    optional ``concurrency``. Grants are analysed best local relevance
+    first; with ``min_relevance`` (0-1), grants scoring below it are
+    skipped without an LLM call. Returns at once; poll the scan for
+    progress and results.
+    """
+    try:
+        profile = db.session.get(OrganisationProfile, org_id)
+        if not profile:
+            return jsonify({
+                'success': False,
+                'error': 'Organisation not found'
+            }), 404
+
+        data = request.get_json(silent=True) or {}
+        concurrency = parse_concurrency(data.get('concurrency'))
+        min_relevance = parse_min_relevance(data.get('min_relevance'))
+        terms = profile_terms(profile)
+        if min_relevance is not None and not terms:
+            raise ValueError('min_relevance needs a mission, focus areas or target demographics to score against')
+        grant_ids = select_grant_ids(data)
+        if not grant_ids:
+            raise ValueError('No grants to scan')
+        relevance = relevance_index().relevance(terms, grant_ids) if terms else None
+        scan = start_scan(current_app._get_current_object(), org_id, grant_ids, concurrency,
+                          relevance, min_relevance)
+
+        return jsonify({
+            'success': True,
+            'data': scan.to_dict()
+        }), 202
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error starting eligibility scan for org {org_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Database error occurred'
+        }), 500
+
+@eligibility_bp.route('/api/orgs/<int:org_id>/eligibility-scan/<int:scan_id>', methods=['GET'])
+def get_eligibility_scan(org_id, scan_id):
+    """
+    A scan's progress and a page of its results so far, best score first.
+
+    Pending and skipped grants are listed best local relevance first.
+    """
+    try:
+        scan = db.session.get(EligibilityScan, scan_id)
+        if not scan or scan.org_id != org_id:
+            return jsonify({
+                'success': False,
+                'error': 'Eligibility scan not found'
+            }), 404
+
+        status = request.args.get('status', 'completed')
+        if status not in RESULT_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(RESULT_STATUSES)}")
+        limit = parse_limit(request.args.get('limit'))
+        query = EligibilityScanResult.query.filter(
+            EligibilityScanResult.scan_id == scan_id,
+            EligibilityScanResult.status == status
+        )
+        key = 'relevance' if status in ('pending', 'skipped') else 'score'
+        rows, next_cursor = paginate_by(query, EligibilityScanResult, key, request.args.get('cursor'),
+                                        limit, descending=True)
+
+        body = page_response([result.to_dict() for result in rows], next_cursor)
+        body['scan'] = scan.to_dict()
+        return jsonify(body), 200
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error fetching eligibility scan {scan_id} for org {org_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch eligibility scan'
+        }), 500
+
+@eligibility_bp.route('/api/orgs/<int:org_id>/relevance', methods=['GET'])
+def get_grant_relevance(org_id):
+    """
+    Grants ranked by local relevance to an organisation, without any LLM call.
+
+    Scores BM25 overlap between the organisation's mission, focus areas and
+    target demographics and each grant's name and description, from 0 to 1.
+    Takes ``min_relevance``, ``fields``, ``limit`` and ``cursor``.
+    """
+    try:
+        profile = db.session.get(OrganisationProfile, org_id)
+        if not profile:
+            return jsonify({
+                'success': False,
+                'error': 'Organisation not found'
+            }), 404
+
+        limit = parse_limit(request.args.get('limit'))
+        min_relevance = parse_min_relevance(request.args.get('min_relevance')) or 0.0
+        encoder = row_encoder(parse_fields(request.args.get('fields')), ['id'])
+
+        scores = relevance_index().relevance(profile_terms(profile))
+        matches = sorted(
+            ((grant_id, score) for grant_id, score in scores.items() if score > 0 and score >= min_relevance),
+            key=lambda item: (-item[1], item[0])
+        )
+        page, next_cursor = paginate_matches(matches, request.args.get('cursor'), limit)
+        ranked = dict(page)
+        rows = encoder.query().filter(Grant.id.in_(list(ranked)))
+        grants = [
+            dict(encoder.encode(row), relevance=ranked[row.id])
+            for row in sorted(rows, key=lambda row: (-ranked[row.id], row.id))
+        ]
+        return jsonify(page_response(grants, next_cursor)), 200
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except SQLAlchemyError as e:
+        logger.error(f"Database error scoring grant relevance for org {org_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Database error occurred'
+        }), 500
@@ -0,0 +1,160 @@
+"""
+Batch eligibility scans: one organisation against many grants.
+
+``start_scan`` records the scan with a ``pending`` result row per grant,
+hands the work to the worker's scan loop (a long-lived event loop on a
+background thread) and returns at once. There ``analyze_eligibility``
+fans out over the grants, at most ``concurrency`` at a time per scan.
+Grants are analysed in order of their local relevance score
+(``api.relevance``); those below the scan's ``min_relevance`` are recorded
+as ``skipped`` and never reach the LLM.
+
+Every scan in a worker also shares the scan loop's LLM client, so
+together they stay within ``LLM_SCAN_MAX_IN_FLIGHT`` and the SDK backs off
+on rate limits. That client is separate from the one serving requests on
+the server's loop, so a worker makes at most ``LLM_MAX_IN_FLIGHT`` plus
+``LLM_SCAN_MAX_IN_FLIGHT`` calls at once.
+
+The grants and the organisation profile are read once, in one session,
+when the scan starts. Each result is written as it finishes, together
+with the scan's progress counters, so progress and partial results can
+be read from any worker while the scan runs. A scan whose worker exits mid-run stays ``running``.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from flask import Flask
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+from models import db
+from models.eligibility import EligibilityScan, EligibilityScanResult
+from models.grant import Grant
+from models.organisation import OrganisationProfile
+from api.ai_core import analyze_eligibility
+from api.llm import SCAN_MAX_IN_FLIGHT, llm_client
+from api.monitoring import ELIGIBILITY_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+MAX_CONCURRENCY = 32
+MAX_SCAN_GRANTS = 1000
+
+RESULT_STATUSES = ('pending', 'completed', 'failed', 'skipped')
+
+def parse_concurrency(value: Any) -> int:
+    """Parse a scan's ``concurrency``, clamped to the allowed range."""
+    if value is None or value == '':
+        return DEFAULT_CONCURRENCY
+    try:
+        concurrency = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('concurrency must be an integer')
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+    return min(concurrency, MAX_CONCURRENCY)
+
+class ScanLoop:
+    """A long-lived event loop on a daemon thread, started on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def submit(self, coro) -> Future:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='eligibility-scans', daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+scan_loop = ScanLoop()
+
+def start_scan(app: Flask, org_id: int, grant_ids: List[int], concurrency: int,
+               relevance: Optional[Dict[int, float]] = None,
+               min_relevance: Optional[float] = None) -> EligibilityScan:
+    """
+    Record a scan of ``grant_ids`` for ``org_id`` and start it in the background.
+
+    With ``relevance`` scores, grants are analysed best match first, and
+    those scoring below ``min_relevance`` are skipped.
+    """
+    relevance = relevance or {}
+    if relevance:
+        grant_ids = sorted(grant_ids, key=lambda grant_id: -relevance.get(grant_id, 0.0))
+    skipped = set()
+    if min_relevance is not None:
+        skipped = {grant_id for grant_id in grant_ids if relevance.get(grant_id, 0.0) < min_relevance}
+    scanned = [grant_id for grant_id in grant_ids if grant_id not in skipped]
+
+    scan = EligibilityScan(org_id=org_id, status='running' if scanned else 'completed', concurrency=concurrency,
+                           total=len(grant_ids), skipped=len(skipped), min_relevance=min_relevance,
+                           finished_at=None if scanned else datetime.utcnow())
+    db.session.add(scan)
+    db.session.flush()
+    db.session.execute(EligibilityScanResult.__table__.insert(), [
+        {'scan_id': scan.id, 'grant_id': grant_id, 'status': 'skipped' if grant_id in skipped else 'pending',
+         'relevance': relevance.get(grant_id)}
+        for grant_id in grant_ids
+    ])
+    db.session.commit()
+    if scanned:
+        scan_loop.submit(run_scan(app, scan.id, org_id, scanned, concurrency))
+    return scan
+
+async def run_scan(app: Flask, scan_id: int, org_id: int, grant_ids: List[int], concurrency: int) -> None:
+    """Analyse the grants in order, ``concurrency`` at a time, recording each as it finishes."""
+    slots = asyncio.Semaphore(concurrency)
+    # The scan loop's client, shared by every scan in this worker
+    llm_client(SCAN_MAX_IN_FLIGHT)
+    with app.app_context():
+        grants = {grant.id: grant for grant in Grant.query.filter(Grant.id.in_(grant_ids))}
+        org_profile = db.session.get(OrganisationProfile, org_id)
+
+    async def scan_one(grant_id: int) -> None:
+        async with slots:
+            try:
+                if grant_id not in grants or org_profile is None:
+                    raise ValueError('Grant or organization not found')
+                result, error = await analyze_eligibility(grants[grant_id], org_profile), None
+                ELIGIBILITY_REQUESTS.labels(status='success').inc()
+            except Exception as e:
+                result, error = None, str(e)
+                ELIGIBILITY_REQUESTS.labels(status='error').inc()
+        record_result(app, scan_id, grant_id, result, error)
+
+    await asyncio.gather(*(scan_one(grant_id) for grant_id in grant_ids))
+    with app.app_context():
+        try:
+            db.session.execute(
+                update(EligibilityScan).where(EligibilityScan.id == scan_id)
+                .values(status='completed', finished_at=datetime.utcnow())
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Database error finishing eligibility scan {scan_id}: {e}")
+
+def record_result(app: Flask, scan_id: int, grant_id: int, result: Optional[Dict[str, Any]],
+                  error: Optional[str]) -> None:
+    """Write one grant's outcome and advance the scan's counters in one transaction."""
+    counter = 'failed' if error is not None else 'completed'
+    with app.app_context():
+        try:
+            db.session.execute(
+                update(EligibilityScanResult)
+                .where(EligibilityScanResult.scan_id == scan_id, EligibilityScanResult.grant_id == grant_id)
+                .values(status=counter, score=result['score'] if result else None, analysis=result,
+                        error=error, finished_at=datetime.utcnow())
+            )
+            db.session.execute(
+                update(EligibilityScan).where(EligibilityScan.id == scan_id)
+                .values({counter: getattr(EligibilityScan, counter) + 1})
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Database error recording eligibility scan {scan_id} grant {grant_id}: {e}")
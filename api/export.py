@@ -0,0 +1,74 @@
+import csv
+import io
+from datetime import date
+from typing import Any, AnyStr, Dict, Iterable, Iterator
+from api import serialization
+
+# Rows fetched per round-trip from the server-side cursor and emitted per chunk
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+EXPORT_COLUMNS = [
+    'id',
+    'name',
+    'funder',
+    'source_url',
+    'due_date',
+    'amount_string',
+    'amount_min',
+    'amount_max',
+    'description',
+    'status',
+    'eligibility_analysis'
+]
+
+def _chunked(lines: Iterable[AnyStr], batch_size: int, empty: AnyStr = '') -> Iterator[AnyStr]:
+    """Join lines into chunks so each write carries a batch of rows."""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= batch_size:
+            yield empty.join(buffer)
+            buffer = []
+    if buffer:
+        yield empty.join(buffer)
+
+def iter_ndjson(records: Iterable[Dict[str, Any]], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Stream records as newline-delimited JSON, encoded as UTF-8."""
+    lines = (serialization.dumps_bytes(record) + b'\n' for record in records)
+    return _chunked(lines, batch_size, b'')
+
+def iter_csv(records: Iterable[Dict[str, Any]], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Stream records as CSV, starting with a header row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for record in records:
+        row = []
+        for column in EXPORT_COLUMNS:
+            value = record.get(column)
+            if isinstance(value, (dict, list)):
+                value = serialization.dumps(value)
+            elif isinstance(value, date):
+                value = value.isoformat()
+            row.append(value)
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if pending:
+        yield buffer.getvalue()
@@ -0,0 +1,56 @@
+from collections import Counter
+from typing import Any, Dict, List
+from sqlalchemy import func
+from models import db
+from models.grant import Grant
+
+# Facets are cached until the next grant write. Each worker's in-process copy,
+# computed there or copied from Redis, expires after FACET_MEMORY_TTL seconds,
+# which bounds how long it can lag behind an invalidation by another worker
+FACET_CACHE_PREFIX = 'grant_facets'
+FACET_MEMORY_TTL = 30
+
+def due_month_expression():
+    """SQL expression for a grant's due month as ``YYYY-MM``."""
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(Grant.due_date, 'YYYY-MM')
+    return func.strftime('%Y-%m', Grant.due_date)
+
+def _ranked(counter: Counter) -> List[Dict[str, Any]]:
+    """Facet values ordered by count (descending), then value."""
+    return [
+        {'value': value, 'count': count}
+        for value, count in sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+    ]
+
+def compute_facets(query) -> Dict[str, Any]:
+    """
+    Count grants in ``query`` per status, funder and due month.
+
+    All three facets come from a single GROUP BY over the combined key; the
+    per-facet totals are summed from those groups in Python.
+    """
+    month = due_month_expression().label('due_month')
+    grouped = (
+        query.with_entities(Grant.status, Grant.funder, month, func.count(Grant.id))
+        .order_by(None)
+        .group_by(Grant.status, Grant.funder, month)
+    )
+
+    status, funder, due_month = Counter(), Counter(), Counter()
+    total = 0
+    for status_value, funder_value, month_value, count in grouped:
+        status[status_value] += count
+        funder[funder_value] += count
+        due_month[month_value] += count
+        total += count
+
+    return {
+        'total': total,
+        'status': _ranked(status),
+        'funder': _ranked(funder),
+        'due_month': sorted(
+            ({'value': value, 'count': count} for value, count in due_month.items()),
+            key=lambda facet: (facet['value'] is None, facet['value'] or '')
+        )
+    }
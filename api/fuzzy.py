@@ -0,0 +1,212 @@
+"""
+Typo-tolerant (trigram) matching for grant names and funders.
+
+PostgreSQL uses ``pg_trgm`` with GIN trigram indexes on ``name`` and
+``funder`` (migration 006). On SQLite each worker keeps in-memory trigram
+indexes over the distinct funders and over the words used in grant names,
+kept current from the table's version (``api.watermark``). A fuzzy name
+search corrects each query word to the closest indexed words and then runs
+an ordinary full-text lookup for those words, so it never scans the table;
+the (bounded) candidates are scored in Python on both backends.
+
+Similarity follows ``pg_trgm``: words are lowercased and padded, and two
+strings score the share of trigrams they have in common.
+"""
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import and_, column, func, literal, literal_column, or_, table
+from models import db
+from models.grant import Grant
+from api.pagination import decode_rank_cursor, encode_rank_cursor
+from api.search_index import FTS_TABLE, SQLITE_WEIGHTS, has_search_index
+from api.watermark import EngineLocal, WatermarkIndex
+
+# pg_trgm's default similarity threshold
+SIMILARITY_THRESHOLD = 0.3
+# Corrections considered per query word, and funders per fuzzy funder filter
+MAX_WORD_VARIANTS = 5
+MAX_FUNDER_MATCHES = 10
+# Grants scored per fuzzy name search
+MAX_CANDIDATES = 1000
+
+_WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+def trigrams(text: str) -> Set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space."""
+    grams = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def similarity(a: str, b: str) -> float:
+    """Share of trigrams two strings have in common (``pg_trgm.similarity``)."""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+class TrigramIndex:
+    """Inverted index from trigrams to the strings containing them."""
+
+    def __init__(self):
+        self._grams: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def add(self, value: str) -> None:
+        if not value or value in self._grams:
+            return
+        grams = trigrams(value)
+        self._grams[value] = grams
+        for gram in grams:
+            self._postings[gram].add(value)
+
+    def search(self, query: str, limit: int, threshold: float = SIMILARITY_THRESHOLD) -> List[Tuple[str, float]]:
+        """Indexed strings at least ``threshold`` similar to ``query``, best first."""
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        scored = []
+        for value, count in shared.items():
+            score = count / (len(grams) + len(self._grams[value]) - count)
+            if score >= threshold:
+                scored.append((value, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+class FuzzyIndex(WatermarkIndex):
+    """Per-worker trigram indexes over funders and name words (SQLite).
+
+    Entries are only ever added; a stale word or funder just matches no rows.
+    """
+
+    columns = (Grant.name, Grant.funder)
+
+    def __init__(self):
+        super().__init__()
+        self.funders = TrigramIndex()
+        self.words = TrigramIndex()
+
+    def _apply(self, row) -> None:
+        name, funder = row
+        self.funders.add(funder)
+        for word in _WORD_RE.findall((name or '').lower()):
+            # Numbers can't be meaningfully typo-corrected
+            if not word.isdigit():
+                self.words.add(word)
+
+_indexes = EngineLocal(FuzzyIndex)
+
+def fuzzy_index() -> FuzzyIndex:
+    """The synced fuzzy index for the current app's database."""
+    index = _indexes()
+    with index._lock:
+        index.sync()
+    return index
+
+def _is_postgres() -> bool:
+    return db.engine.dialect.name == 'postgresql'
+
+def match_funders(funder: str) -> List[str]:
+    """Stored funder names similar to ``funder``, most similar first."""
+    if _is_postgres():
+        score = func.similarity(Grant.funder, funder)
+        rows = (
+            db.session.query(Grant.funder, func.max(score).label('score'))
+            .filter(Grant.funder.op('%')(funder))
+            .group_by(Grant.funder)
+            .order_by(literal_column('score').desc(), Grant.funder)
+            .limit(MAX_FUNDER_MATCHES)
+        )
+        return [value for value, _ in rows]
+    return [value for value, _ in fuzzy_index().funders.search(funder, MAX_FUNDER_MATCHES)]
+
+def fuzzy_candidates(keyword: str):
+    """
+    Build a query of ``(id, name)`` for grants whose names may match
+    ``keyword`` despite typos, or ``None`` if the keyword has no words.
+
+    Candidates come most promising first (trigram similarity on PostgreSQL,
+    BM25 over the corrected words with the full-text index), so the
+    ``MAX_CANDIDATES`` cap in :func:`rank_candidates` drops the weakest.
+    Without the index they come in id order. Narrow it with further filters,
+    then order it with :func:`rank_candidates`.
+    """
+    words = _WORD_RE.findall(keyword.lower())
+    if not words:
+        return None
+    candidates = db.session.query(Grant.id, Grant.name)
+
+    if _is_postgres():
+        return (
+            candidates.filter(literal(keyword).op('<%')(Grant.name))
+            .order_by(func.word_similarity(keyword, Grant.name).desc())
+        )
+
+    # Correct each query word to indexed name words; every word must match
+    index = fuzzy_index()
+    variants = [[value for value, _ in index.words.search(word, MAX_WORD_VARIANTS)] for word in words]
+    if not all(variants):
+        return candidates.filter(literal(False))
+
+    if has_search_index(db.engine):
+        fts = table(FTS_TABLE, column('rowid'))
+        fts_ref = literal_column(FTS_TABLE)
+        match = ' AND '.join(
+            '(' + ' OR '.join(f'name:"{variant}"' for variant in options) + ')'
+            for options in variants
+        )
+        return (
+            candidates.join(fts, fts.c.rowid == Grant.id)
+            .filter(fts_ref.op('MATCH')(match))
+            .order_by(func.bm25(fts_ref, *SQLITE_WEIGHTS), Grant.id)
+        )
+    return candidates.filter(and_(*(
+        or_(*(Grant.name.ilike(f'%{variant}%') for variant in options))
+        for options in variants
+    ))).order_by(Grant.id)
+
+def rank_candidates(keyword: str, candidates) -> Tuple[List[Tuple[int, float]], bool]:
+    """
+    Score the first ``MAX_CANDIDATES`` candidate grants, best first.
+
+    A grant scores the mean, over query words, of the best similarity
+    between that word and any word of its name. Also returns whether the
+    cap left candidates unscored.
+    """
+    words = _WORD_RE.findall(keyword.lower())
+    known: List[Dict[str, float]] = [{} for _ in words]
+    scored = []
+    rows = candidates.limit(MAX_CANDIDATES + 1).all()
+    capped = len(rows) > MAX_CANDIDATES
+    for grant_id, name in rows[:MAX_CANDIDATES]:
+        name_words = set(_WORD_RE.findall((name or '').lower()))
+        total = 0.0
+        for word, cache in zip(words, known):
+            best = 0.0
+            for candidate in name_words:
+                if candidate not in cache:
+                    cache[candidate] = similarity(word, candidate)
+                best = max(best, cache[candidate])
+            total += best
+        scored.append((grant_id, round(total / len(words), 6)))
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored, capped
+
+def paginate_matches(matches: List[Tuple[int, float]], cursor: Optional[str],
+                     limit: int) -> Tuple[List[Tuple[int, float]], Optional[str]]:
+    """Slice one page from ranked ``(id, score)`` matches, with a rank cursor."""
+    if cursor:
+        last_rank, last_id = decode_rank_cursor(cursor)
+        matches = [m for m in matches if (-m[1], m[0]) > (last_rank, last_id)]
+    if len(matches) <= limit:
+        return matches, None
+    page = matches[:limit]
+    grant_id, score = page[-1]
+    return page, encode_rank_cursor(-score, grant_id)
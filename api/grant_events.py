@@ -0,0 +1,111 @@
+"""
+Hooks run after grants are written.
+
+Every code path that creates or updates grants (the API handlers, bulk
+ingest and the scrapers) calls :func:`grants_written` once its transaction
+has committed, so derived state stays consistent with the table.
+
+Cached responses and facet counts are invalidated before it returns, so
+the writer's next read sees its write. Saved-search percolation and
+near-duplicate detection cost far more than the write itself (signing a
+bulk batch takes several times as long as upserting it), so they are
+queued for the worker's hook thread. Both only add notifications and
+duplicate candidates, which are read later.
+
+The hook thread waits for writes to go quiet for ``HOOK_QUIET_SECONDS``
+(or at most ``HOOK_MAX_DELAY_SECONDS``) and then runs everything queued
+as one batch, in write order. A bulk ingest therefore isn't slowed by
+hooks competing with it for the interpreter, and its grants are
+percolated and signed together once it finishes. With
+``GRANT_HOOKS_INLINE`` (on by default when testing) the hooks run before
+``grants_written`` returns instead.
+
+Hooks still queued when a worker exits are lost; ``backfill_signatures``
+signs any grants that missed duplicate detection.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from flask import Flask, current_app
+from api.cache_manager import cache
+from api.facets import FACET_CACHE_PREFIX
+from api.response_cache import invalidate_grant_responses
+from api.percolator import percolate
+from api.dedup import detect_duplicates
+
+logger = logging.getLogger(__name__)
+
+HOOK_QUIET_SECONDS = 0.5
+HOOK_MAX_DELAY_SECONDS = 30
+# Grants per hook call; keeps the id lists under SQLite's parameter limit
+HOOK_CHUNK = 1000
+
+def run_deferred_hooks(grant_ids: List[int]) -> None:
+    """Percolate and check for duplicates; needs an app context."""
+    percolate(grant_ids)
+    detect_duplicates(grant_ids)
+
+class HookQueue:
+    """Runs deferred hooks on a daemon thread, started on first use, once writes go quiet."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Tuple[Flask, List[int]]]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, app: Flask, grant_ids: List[int]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='grant-hooks', daemon=True)
+                self._thread.start()
+        self._queue.put((app, grant_ids))
+
+    def join(self) -> None:
+        """Block until every hook queued so far has run."""
+        self._queue.join()
+
+    def _collect(self) -> Tuple[Dict[Flask, List[int]], int]:
+        """Wait for a submission, then keep taking them until the queue is quiet."""
+        app, grant_ids = self._queue.get()
+        pending = {app: list(grant_ids)}
+        taken = 1
+        deadline = time.monotonic() + HOOK_MAX_DELAY_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                app, grant_ids = self._queue.get(timeout=HOOK_QUIET_SECONDS)
+            except queue.Empty:
+                break
+            pending.setdefault(app, []).extend(grant_ids)
+            taken += 1
+        return pending, taken
+
+    def _run(self) -> None:
+        while True:
+            pending, taken = self._collect()
+            try:
+                for app, grant_ids in pending.items():
+                    grant_ids = list(dict.fromkeys(grant_ids))
+                    with app.app_context():
+                        for start in range(0, len(grant_ids), HOOK_CHUNK):
+                            run_deferred_hooks(grant_ids[start:start + HOOK_CHUNK])
+            except Exception as e:
+                logger.error(f"Error running grant hooks: {e}")
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+hook_queue = HookQueue()
+
+def grants_written(grant_ids: Iterable[int]) -> None:
+    """Refresh derived state after the given grants were created or updated."""
+    grant_ids = list(grant_ids)
+    if not grant_ids:
+        return
+    invalidate_grant_responses(grant_ids)
+    cache.invalidate_pattern(f'{FACET_CACHE_PREFIX}:*')
+    if current_app.config.get('GRANT_HOOKS_INLINE', current_app.testing):
+        run_deferred_hooks(grant_ids)
+    else:
+        hook_queue.submit(current_app._get_current_object(), grant_ids)
@@ -1,14 +1,37 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from models import db
 from models.grant import Grant
 from models.organisation import OrganisationProfile
-from api.ai_core import run_eligibility_scan, get_db_session, anthropic
+from api.ai_core import format_profile, run_eligibility_scan, get_db_session
+from api.llm import llm_client
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 import asyncio
+import hashlib
+import json
+import time
 from api.monitoring import track_timing, DRAFT_REQUESTS, DRAFT_LATENCY
+from api.pagination import paginate, paginate_by, page_response, parse_limit
+from api.search_index import fulltext_filter, has_search_index, paginate_ranked, ranked_search
+from api.http_cache import collection_etag, grant_etag, is_not_modified, not_modified, set_validators
+from api.ingest import amount_bounds, upsert_grants
+from api.cache_manager import cache
+from api.facets import FACET_CACHE_PREFIX, FACET_MEMORY_TTL, compute_facets
+from api.deadlines import deadline_index, parse_horizon
+from api.suggest import parse_suggest_limit, suggest_index
+from api.fuzzy import fuzzy_candidates, match_funders, paginate_matches, rank_candidates
+from api.grant_events import grants_written
+from api.response_cache import cached_response
+from api.rows import row_encoder
+from api.changes import (
+    change_operation, decode_change_cursor, encode_change_cursor, read_changes, record_changes
+)
+from api.watermark import grant_version
+from api import serialization
+from api.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, iter_csv, iter_ndjson
+from api.asgi import AsyncBody
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -27,32 +50,160 @@ def validate_grant_data(data: Dict[str, Any]) -> tuple[bool, str]:
             
     return True, ""
 
+def apply_grant_filters(query):
+    """Apply the exact-match listing filters from the query string."""
+    status = request.args.get('status')
+    funder = request.args.get('funder')
+    
+    if status:
+        query = query.filter(Grant.status == status)
+    if funder and wants_fuzzy():
+        query = query.filter(Grant.funder.in_(match_funders(funder)))
+    elif funder:
+        query = query.filter(Grant.funder == funder)
+    return query
+
+def parse_amount_param(name: str) -> Optional[float]:
+    """Parse a numeric amount query parameter."""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number')
+
+def apply_amount_filters(query):
+    """
+    Keep grants whose parsed amount range overlaps min_amount/max_amount.
+
+    Open bounds count as overlapping and grants with no parsed amount are
+    excluded, as in ``api.amounts.ranges_overlap``.
+    """
+    minimum = parse_amount_param('min_amount')
+    maximum = parse_amount_param('max_amount')
+    
+    if minimum is not None and maximum is not None and minimum > maximum:
+        raise ValueError('min_amount must not be greater than max_amount')
+    if minimum is not None:
+        query = query.filter(db.or_(
+            Grant.amount_max >= minimum,
+            db.and_(Grant.amount_max.is_(None), Grant.amount_min.isnot(None))
+        ))
+    if maximum is not None:
+        query = query.filter(db.or_(
+            Grant.amount_min <= maximum,
+            db.and_(Grant.amount_min.is_(None), Grant.amount_max.isnot(None))
+        ))
+    return query
+
+# ``sort`` values mapped to the (column, descending) keyset order they select;
+# amounts sort on the upper bound, with open or unknown maximums last
+SORT_OPTIONS = {
+    'due_date': None,
+    'amount': ('amount_max', False),
+    '-amount': ('amount_max', True)
+}
+
+def parse_sort(value: Optional[str]) -> Optional[Tuple[str, bool]]:
+    """Parse the ``sort`` parameter; ``None`` means the default due date order."""
+    if not value:
+        return None
+    if value not in SORT_OPTIONS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_OPTIONS)}")
+    return SORT_OPTIONS[value]
+
+def sort_key(sort: Optional[Tuple[str, bool]]) -> str:
+    """The keyset column behind a parsed ``sort``."""
+    return sort[0] if sort else 'due_date'
+
+def paginate_sorted(query, sort: Optional[Tuple[str, bool]], cursor: Optional[str], limit: int):
+    """Fetch one page in the requested sort order."""
+    if sort is None:
+        return paginate(query, Grant, cursor, limit)
+    key, descending = sort
+    return paginate_by(query, Grant, key, cursor, limit, descending)
+
+def apply_date_filters(query):
+    """Apply the min_date/max_date due date range from the query string."""
+    min_date = request.args.get('min_date')
+    max_date = request.args.get('max_date')
+    
+    if min_date:
+        query = query.filter(Grant.due_date >= datetime.fromisoformat(min_date))
+    if max_date:
+        query = query.filter(Grant.due_date <= datetime.fromisoformat(max_date))
+    return query
+
+def keyword_filter(keyword: str):
+    """Substring match on name, description and funder (unindexed fallback)."""
+    return db.or_(
+        Grant.name.ilike(f'%{keyword}%'),
+        Grant.description.ilike(f'%{keyword}%'),
+        Grant.funder.ilike(f'%{keyword}%')
+    )
+
+def apply_keyword_filter(query, keyword: str):
+    """Restrict to keyword matches, through the full-text index when installed."""
+    if not keyword:
+        return query
+    if has_search_index(db.engine):
+        condition = fulltext_filter(keyword)
+        return query.filter(condition) if condition is not None else query
+    return query.filter(keyword_filter(keyword))
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Parse the ``fields`` sparse fieldset parameter; ``None`` means all fields."""
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in Grant.SERIALIZED_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # id is always returned so clients can address individual rows
+    return ['id'] + [field for field in dict.fromkeys(fields) if field != 'id']
+
+def wants_fuzzy() -> bool:
+    """Whether typo-tolerant matching was requested (``fuzzy=true``)."""
+    return request.args.get('fuzzy', '').lower() == 'true'
+
+def wants_count() -> bool:
+    """Whether the client asked for the total match count."""
+    return request.args.get('include_count', '').lower() in ('1', 'true', 'yes')
+
 @grants_bp.route('/api/grants', methods=['GET'])
+@cached_response('list')
 def get_grants():
-    """Get all grants with optional filtering."""
+    """Get a page of grants with optional filtering."""
     try:
-        # Get query parameters for filtering
-        status = request.args.get('status')
-        funder = request.args.get('funder')
-        
-        # Start with base query
-        query = Grant.query
-        
-        # Apply filters if provided
-        if status:
-            query = query.filter(Grant.status == status)
-        if funder:
-            query = query.filter(Grant.funder == funder)
+        # Read plain column rows (see api/rows.py), only for the requested fields
+        fields = parse_fields(request.args.get('fields'))
+        sort = parse_sort(request.args.get('sort'))
+        encoder = row_encoder(fields, ['id', sort_key(sort)])
+        
+        # Start with base query and apply filters if provided
+        query = apply_amount_filters(apply_grant_filters(encoder.query()))
+        
+        # Revalidate against the table's version (two index lookups) before loading any rows
+        seq, last_updated = grant_version()
+        etag = collection_etag(request.args.items(multi=True), seq, last_updated)
+        if is_not_modified(etag, last_updated):
+            return not_modified(etag, last_updated)
             
-        # Execute query and convert to list of dictionaries
-        grants = [grant.to_dict() for grant in query.all()]
+        # Fetch a single page
+        limit = parse_limit(request.args.get('limit'))
+        rows, next_cursor = paginate_sorted(query, sort, request.args.get('cursor'), limit)
+        grants = encoder.encode_all(rows)
+        count = query.order_by(None).count() if wants_count() else None
         
-        return jsonify({
-            'success': True,
-            'data': grants,
-            'count': len(grants)
-        }), 200
+        response = jsonify(page_response(grants, next_cursor, count))
+        return set_validators(response, etag, last_updated), 200
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"Error fetching grants: {e}")
         return jsonify({
@@ -61,6 +212,7 @@ def get_grants():
         }), 500
 
 @grants_bp.route('/api/grants/<int:grant_id>', methods=['GET'])
+@cached_response('grant')
 def get_grant(grant_id):
     """Get a specific grant by ID."""
     try:
@@ -72,10 +224,16 @@ def get_grant(grant_id):
                 'error': 'Grant not found'
             }), 404
             
-        return jsonify({
+        # Skip serialization entirely when the client's copy is current
+        etag = grant_etag(grant.id, grant.updated_at)
+        if is_not_modified(etag, grant.updated_at):
+            return not_modified(etag, grant.updated_at)
+            
+        response = jsonify({
             'success': True,
             'data': grant.to_dict()
-        }), 200
+        })
+        return set_validators(response, etag, grant.updated_at), 200
         
     except Exception as e:
         logger.error(f"Error fetching grant {grant_id}: {e}")
@@ -99,19 +257,25 @@ def create_grant():
             }), 400
             
         # Create new grant
+        amount_min, amount_max = amount_bounds(data)
         new_grant = Grant(
             name=data['name'],
             funder=data['funder'],
             source_url=data.get('source_url'),
             due_date=datetime.fromisoformat(data['due_date']) if data.get('due_date') else None,
             amount_string=data.get('amount_string'),
+            amount_min=amount_min,
+            amount_max=amount_max,
             description=data.get('description'),
             status=data.get('status', 'potential'),
             eligibility_analysis=data.get('eligibility_analysis', {})
         )
         
         db.session.add(new_grant)
+        db.session.flush()
+        record_changes([(new_grant.id, change_operation(True, new_grant.status))])
         db.session.commit()
+        grants_written([new_grant.id])
         
         return jsonify({
             'success': True,
@@ -119,6 +283,11 @@ def create_grant():
             'message': 'Grant created successfully'
         }), 201
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except SQLAlchemyError as e:
         db.session.rollback()
         logger.error(f"Database error creating grant: {e}")
@@ -156,8 +325,9 @@ def update_grant(grant_id):
             grant.source_url = data['source_url']
         if 'due_date' in data:
             grant.due_date = datetime.fromisoformat(data['due_date']) if data['due_date'] else None
-        if 'amount_string' in data:
-            grant.amount_string = data['amount_string']
+        if 'amount_string' in data or 'amount_min' in data or 'amount_max' in data:
+            grant.amount_string = data.get('amount_string', grant.amount_string)
+            grant.amount_min, grant.amount_max = amount_bounds(dict(data, amount_string=grant.amount_string))
         if 'description' in data:
             grant.description = data['description']
         if 'status' in data:
@@ -166,8 +336,10 @@ def update_grant(grant_id):
             grant.eligibility_analysis = data['eligibility_analysis']
             
         grant.updated_at = datetime.utcnow()
+        record_changes([(grant.id, change_operation(False, grant.status))])
         
         db.session.commit()
+        grants_written([grant.id])
         
         return jsonify({
             'success': True,
@@ -175,6 +347,12 @@ def update_grant(grant_id):
             'message': 'Grant updated successfully'
         }), 200
         
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except SQLAlchemyError as e:
         db.session.rollback()
         logger.error(f"Database error updating grant {grant_id}: {e}")
@@ -189,51 +367,270 @@ def update_grant(grant_id):
             'error': 'Failed to update grant'
         }), 500
 
+@grants_bp.route('/api/grants/bulk', methods=['POST'])
+def bulk_upsert_grants():
+    """Create or update many grants at once, matched on source_url."""
+    # Accept a JSON array or one JSON object per line (NDJSON)
+    try:
+        if request.mimetype == 'application/x-ndjson':
+            payload = [
+                serialization.loads(line)
+                for line in request.get_data().splitlines()
+                if line.strip()
+            ]
+        else:
+            payload = request.get_json(silent=True)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid NDJSON body: {e}"
+        }), 400
+        
+    if not isinstance(payload, list):
+        return jsonify({
+            'success': False,
+            'error': 'Request body must be a JSON array or NDJSON of grants'
+        }), 400
+        
+    # Validate every row up front; only valid rows reach the database
+    results = [None] * len(payload)
+    valid, positions = [], []
+    for index, data in enumerate(payload):
+        if not isinstance(data, dict):
+            results[index] = {'status': 'error', 'error': 'Grant must be a JSON object'}
+            continue
+        is_valid, error_message = validate_grant_data(data)
+        if not is_valid:
+            results[index] = {'status': 'error', 'error': error_message}
+            continue
+        valid.append(data)
+        positions.append(index)
+        
+    for position, result in zip(positions, upsert_grants(valid)):
+        results[position] = result
+        
+    summary = {'created': 0, 'updated': 0, 'skipped': 0, 'error': 0}
+    for result in results:
+        summary[result['status']] += 1
+        
+    return jsonify({
+        'success': summary['error'] == 0,
+        'data': {
+            'summary': summary,
+            'results': [dict(result, index=index) for index, result in enumerate(results)]
+        }
+    }), 200
+
 # Additional helper endpoints
 
 @grants_bp.route('/api/grants/search', methods=['GET'])
+@cached_response('search')
 def search_grants():
     """Search grants with more complex filtering."""
     try:
         # Get search parameters
         keyword = request.args.get('keyword', '').lower()
-        min_date = request.args.get('min_date')
-        max_date = request.args.get('max_date')
-        
-        # Start with base query
-        query = Grant.query
-        
-        # Apply filters
-        if keyword:
-            query = query.filter(
-                db.or_(
-                    Grant.name.ilike(f'%{keyword}%'),
-                    Grant.description.ilike(f'%{keyword}%'),
-                    Grant.funder.ilike(f'%{keyword}%')
-                )
-            )
+        limit = parse_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        fields = parse_fields(request.args.get('fields'))
+        sort = parse_sort(request.args.get('sort'))
+        ranking = keyword and sort is None
+        encoder = row_encoder(fields, ['id', sort_key(sort)])
+        
+        # Typo-tolerant name matching, ranked by similarity
+        candidates = fuzzy_candidates(keyword) if ranking and wants_fuzzy() else None
+        if candidates is not None:
+            matches, capped = rank_candidates(keyword, apply_amount_filters(apply_date_filters(candidates)))
+            page, next_cursor = paginate_matches(matches, cursor, limit)
+            scores = dict(page)
+            rows = encoder.query().filter(Grant.id.in_(list(scores)))
+            grants = [
+                dict(encoder.encode(row), score=scores[row.id])
+                for row in sorted(rows, key=lambda row: (-scores[row.id], row.id))
+            ]
+            body = page_response(grants, next_cursor, len(matches) if wants_count() else None)
+            if wants_count():
+                # Only the first MAX_CANDIDATES matches are ranked, so the count stops there
+                body['count_capped'] = capped
+            return jsonify(body), 200
+        
+        # Use the full-text index when it is installed, ranked by relevance
+        ranked = ranked_search(keyword, encoder.columns) if ranking and has_search_index(db.engine) else None
+        if ranked:
+            query, rank = ranked
+            query = apply_amount_filters(apply_date_filters(query))
+            rows, next_cursor = paginate_ranked(query, rank, cursor, limit)
+            grants = [dict(encoder.encode(row), score=-row.rank, snippet=row.snippet) for row in rows]
+            count = query.order_by(None).count() if wants_count() else None
+            return jsonify(page_response(grants, next_cursor, count)), 200
+        
+        # Otherwise filter on the keyword and list in due date (or the requested) order
+        query = apply_amount_filters(apply_date_filters(apply_keyword_filter(encoder.query(), keyword)))
             
-        if min_date:
-            query = query.filter(Grant.due_date >= datetime.fromisoformat(min_date))
-        if max_date:
-            query = query.filter(Grant.due_date <= datetime.fromisoformat(max_date))
+        # Fetch a single page
+        rows, next_cursor = paginate_sorted(query, sort, cursor, limit)
+        grants = encoder.encode_all(rows)
+        count = query.order_by(None).count() if wants_count() else None
+        
+        return jsonify(page_response(grants, next_cursor, count)), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error searching grants: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to search grants'
+        }), 500
+
+@grants_bp.route('/api/grants/facets', methods=['GET'])
+def get_grant_facets():
+    """Count matching grants per status, funder and due month."""
+    try:
+        # Same filters as search_grants, normalized for the cache key
+        keyword = request.args.get('keyword', '').lower().strip()
+        fuzzy = bool(keyword) and wants_fuzzy()
+        params = [
+            keyword, request.args.get('min_date', ''), request.args.get('max_date', ''),
+            parse_amount_param('min_amount'), parse_amount_param('max_amount'), fuzzy
+        ]
+        digest = hashlib.sha1(json.dumps(params).encode()).hexdigest()
+        cache_key = f"{FACET_CACHE_PREFIX}:{digest}"
+        
+        facets = cache.get(cache_key, memory_ttl=FACET_MEMORY_TTL)
+        if facets is None:
+            candidates = fuzzy_candidates(keyword) if fuzzy else None
+            if candidates is not None:
+                # Count the grants a fuzzy search would rank, capped as it is
+                matches, capped = rank_candidates(keyword, apply_amount_filters(apply_date_filters(candidates)))
+                query = Grant.query.filter(Grant.id.in_([grant_id for grant_id, _ in matches]))
+                facets = dict(compute_facets(query), count_capped=capped)
+            else:
+                query = apply_amount_filters(apply_date_filters(apply_keyword_filter(Grant.query, keyword)))
+                facets = compute_facets(query)
+            cache.set(cache_key, facets, memory_ttl=FACET_MEMORY_TTL)
             
-        # Execute query
-        grants = [grant.to_dict() for grant in query.all()]
+        return jsonify({
+            'success': True,
+            'data': facets
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error computing grant facets: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to compute grant facets'
+        }), 500
+
+@grants_bp.route('/api/grants/deadlines', methods=['GET'])
+def get_deadlines():
+    """Get grants due within the horizon, bucketed by week and status."""
+    try:
+        weeks = parse_horizon(request.args.get('horizon'))
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
         
         return jsonify({
             'success': True,
-            'data': grants,
-            'count': len(grants)
+            'data': deadline_index().query(today, weeks)
         }), 200
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
-        logger.error(f"Error searching grants: {e}")
+        logger.error(f"Error fetching deadlines: {e}")
         return jsonify({
             'success': False,
-            'error': 'Failed to search grants'
+            'error': 'Failed to fetch deadlines'
         }), 500
 
+@grants_bp.route('/api/grants/changes', methods=['GET'])
+def get_grant_changes():
+    """Get grants created, updated, closed or removed since a change cursor."""
+    try:
+        since = decode_change_cursor(request.args.get('since'))
+        limit = parse_limit(request.args.get('limit'))
+        encoder = row_encoder(parse_fields(request.args.get('fields')))
+        changes, last_seq, has_more = read_changes(since, limit, encoder)
+        
+        # The cursor is returned even when caught up, so clients can resume from it
+        return jsonify({
+            'success': True,
+            'data': changes,
+            'next_cursor': encode_change_cursor(last_seq),
+            'has_more': has_more
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error reading grant changes: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to read grant changes'
+        }), 500
+
+@grants_bp.route('/api/grants/suggest', methods=['GET'])
+def suggest_grants():
+    """Autocomplete grant names and funders from a typed prefix."""
+    try:
+        limit = parse_suggest_limit(request.args.get('limit'))
+        
+        return jsonify({
+            'success': True,
+            'data': suggest_index().query(request.args.get('q', ''), limit)
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error fetching suggestions: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch suggestions'
+        }), 500
+
+@grants_bp.route('/api/grants/export', methods=['GET'])
+def export_grants():
+    """Stream all grants matching the listing filters as NDJSON or CSV."""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Unsupported export format: {export_format}"
+        }), 400
+        
+    # Rows are pulled from a server-side cursor in batches, so memory stays
+    # flat and the first chunk is sent before the query has finished
+    encoder = row_encoder()
+    query = apply_grant_filters(encoder.query()).order_by(Grant.id).yield_per(EXPORT_BATCH_SIZE)
+    records = (encoder.encode(row) for row in query)
+    chunks = iter_csv(records) if export_format == 'csv' else iter_ndjson(records)
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename=grants.{export_format}'
+        }
+    )
+
 @grants_bp.route('/grants/<int:grant_id>/analyze-eligibility', methods=['POST'])
 async def analyze_grant_eligibility(grant_id):
     """
@@ -260,46 +657,104 @@ async def analyze_grant_eligibility(grant_id):
             'message': f"Failed to analyze grant eligibility: {str(e)}"
         }), 500
 
+DRAFT_MODEL = "claude-3-opus-20240229"
+DRAFT_SYSTEM_PROMPT = "You are an expert grant writer with extensive experience in crafting successful grant applications. Write clear, compelling, and evidence-based responses."
+
+def sse_event(event: str, data: Any) -> str:
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {serialization.dumps(data)}\n\n"
+
+async def stream_draft(params: Dict[str, Any]):
+    """
+    Server-sent events for a draft: a ``token`` event per text delta as the
+    provider streams it, then ``done`` with usage and timing, or ``error``.
+    """
+    start = time.perf_counter()
+    first_token = None
+    try:
+        async with llm_client().stream_message(**params) as stream:
+            async for text in stream.text_stream:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                    DRAFT_LATENCY.labels(phase='first_token').observe(first_token)
+                yield sse_event('token', {'text': text})
+            message = await stream.get_final_message()
+    except Exception as e:
+        logger.error(f"Error streaming grant draft: {str(e)}", exc_info=True)
+        DRAFT_REQUESTS.labels(status='error').inc()
+        yield sse_event('error', {'error': f"Failed to generate grant draft: {str(e)}"})
+        return
+
+    total = time.perf_counter() - start
+    DRAFT_LATENCY.labels(phase='api_call').observe(total)
+    DRAFT_REQUESTS.labels(status='success').inc()
+    yield sse_event('done', {
+        'stop_reason': message.stop_reason,
+        'usage': {
+            'input_tokens': message.usage.input_tokens,
+            'output_tokens': message.usage.output_tokens
+        },
+        'timing': {
+            'first_token_ms': round(first_token * 1000, 1) if first_token is not None else None,
+            'total_ms': round(total * 1000, 1)
+        }
+    })
+
+def draft_event_stream(params: Dict[str, Any]) -> Response:
+    """A ``text/event-stream`` response streaming a draft as it is written."""
+    return Response(AsyncBody(stream_draft(params)), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop proxies (nginx) from buffering the events
+        'X-Accel-Buffering': 'no'
+    })
+
+def load_draft_subjects(grant_id: int):
+    """The grant a draft is written for and the organisation profile, read in one session."""
+    session = get_db_session()
+    try:
+        grant = session.query(Grant).filter(Grant.id == grant_id).first()
+        org_profile = session.query(OrganisationProfile).first()
+        return grant, org_profile
+    finally:
+        session.close()
+
 @grants_bp.route('/api/grants/<int:grant_id>/generate-draft', methods=['POST'])
 @track_timing('total')
 async def generate_grant_draft(grant_id):
     """
     Generate an AI-powered draft for a grant application question.
+
+    With ``stream=true`` the draft is sent as server-sent events while it is
+    written, instead of as one JSON response at the end.
     """
     try:
         # Start timing
         DRAFT_LATENCY.labels(phase='total').observe(0)
         
-        # Get database session
-        db = get_db_session()
-        
-        try:
-            # Validate request data
-            data = request.get_json()
-            if not data or 'application_question' not in data:
-                return jsonify({
-                    'success': False,
-                    'error': 'Missing required field: application_question'
-                }), 400
-                
-            # Get the grant
-            grant = db.query(Grant).filter(Grant.id == grant_id).first()
-            if not grant:
-                return jsonify({
-                    'success': False,
-                    'error': 'Grant not found'
-                }), 404
-                
-            # Get organization profile
-            org_profile = db.query(OrganisationProfile).first()
-            if not org_profile:
-                return jsonify({
-                    'success': False,
-                    'error': 'No organization profile found'
-                }), 404
-                
-            # Construct the prompt
-            prompt = f"""You are an expert grant writer. Write a compelling response to the following grant application question.
+        # Validate request data
+        data = request.get_json()
+        if not data or 'application_question' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required field: application_question'
+            }), 400
+        
+        # Get the grant and organization profile off the event loop
+        grant, org_profile = await asyncio.to_thread(load_draft_subjects, grant_id)
+        if not grant:
+            return jsonify({
+                'success': False,
+                'error': 'Grant not found'
+            }), 404
+            
+        if not org_profile:
+            return jsonify({
+                'success': False,
+                'error': 'No organization profile found'
+            }), 404
+            
+        # Construct the prompt
+        prompt = f"""You are an expert grant writer. Write a compelling response to the following grant application question.
 Use the provided context about the grant and organization to craft a detailed, persuasive answer.
 
 GRANT DETAILS:
@@ -309,14 +764,7 @@ Description: {grant.description}
 Amount: {grant.amount_string}
 
 ORGANIZATION PROFILE:
-Name: {org_profile.name}
-Mission: {org_profile.mission}
-Focus Areas: {org_profile.focus_areas}
-Years Active: {org_profile.years_active}
-Annual Budget: {org_profile.annual_budget}
-Previous Grants: {org_profile.previous_grants}
-Staff Size: {org_profile.staff_size}
-Target Demographics: {org_profile.target_demographics}
+{format_profile(org_profile)}
 
 ADDITIONAL CONTEXT:
 {data.get('context_documents', '')}
@@ -335,47 +783,49 @@ Please write a response that:
 
 Your response should be well-structured with clear paragraphs and should not include any placeholder text or notes.
 """
-            
-            # Call the Anthropic API with retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    @track_timing('api_call')
-                    async def make_api_call():
-                        DRAFT_LATENCY.labels(phase='api_call').observe(0)
-                        return anthropic.messages.create(
-                            model="claude-3-opus-20240229",
-                            max_tokens=4000,
-                            temperature=0.7,
-                            system="You are an expert grant writer with extensive experience in crafting successful grant applications. Write clear, compelling, and evidence-based responses.",
-                            messages=[
-                                {
-                                    "role": "user",
-                                    "content": prompt
-                                }
-                            ]
-                        )
-                    
-                    response = await make_api_call()
-                    break
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise
-                    logger.warning(f"API call failed (attempt {attempt + 1}): {str(e)}")
-                    await asyncio.sleep(1 * (attempt + 1))
-            
-            # Record success
-            DRAFT_REQUESTS.labels(status='success').inc()
-            
-            return jsonify({
-                'success': True,
-                'data': {
-                    'draft_text': response.content[0].text.strip()
+        params = {
+            'model': DRAFT_MODEL,
+            'max_tokens': 4000,
+            'temperature': 0.7,
+            'system': DRAFT_SYSTEM_PROMPT,
+            'messages': [
+                {
+                    "role": "user",
+                    "content": prompt
                 }
-            }), 200
-            
-        finally:
-            db.close()
+            ]
+        }
+        
+        # Stream tokens as they arrive; retries are left to the SDK, before the first token
+        if request.args.get('stream', '').lower() == 'true':
+            return draft_event_stream(params)
+        
+        # Call the Anthropic API with retry logic
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                @track_timing('api_call')
+                async def make_api_call():
+                    DRAFT_LATENCY.labels(phase='api_call').observe(0)
+                    return await llm_client().create_message(**params)
+                
+                response = await make_api_call()
+                break
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    raise
+                logger.warning(f"API call failed (attempt {attempt + 1}): {str(e)}")
+                await asyncio.sleep(1 * (attempt + 1))
+        
+        # Record success
+        DRAFT_REQUESTS.labels(status='success').inc()
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'draft_text': response.content[0].text.strip()
+            }
+        }), 200
             
     except Exception as e:
         logger.error(f"Error generating grant draft: {str(e)}", exc_info=True)
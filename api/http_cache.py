@@ -0,0 +1,62 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+from flask import Response, request
+
+# Cacheable reads may be stored by the client but must be revalidated each time
+REVALIDATE_CACHE_CONTROL = 'private, no-cache'
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag value from the parts that determine a representation."""
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+def grant_etag(grant_id: int, updated_at: Optional[datetime]) -> str:
+    """ETag for a single grant, derived from its id and last update time."""
+    return make_etag('grant', grant_id, updated_at.isoformat() if updated_at else None)
+
+def collection_etag(args: Iterable[Any], seq: int, last_updated: Optional[datetime]) -> str:
+    """
+    ETag for a listing: the normalized query plus the version of the whole
+    table (see ``api.changes.collection_version``).
+
+    Any grant write changes it, including writes outside the listing's
+    filters, so some revalidations miss that a narrower version would have
+    hit. In exchange it never aggregates over the filtered set.
+    """
+    return make_etag(
+        'grants',
+        sorted(args),
+        seq,
+        last_updated.isoformat() if last_updated else None
+    )
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (stored as UTC) as aware, at HTTP-date precision."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+def is_not_modified(etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Check the request's conditional headers against the current validators."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # If-None-Match takes precedence over If-Modified-Since (RFC 7232, section 6)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        return _as_utc(last_modified) <= request.if_modified_since
+    return False
+
+def set_validators(response: Response, etag: str,
+                   last_modified: Optional[datetime] = None) -> Response:
+    """Attach ETag, Last-Modified and a revalidating Cache-Control policy."""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = _as_utc(last_modified)
+    response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Build an empty 304 response carrying the current validators."""
+    return set_validators(Response(status=304), etag, last_modified)
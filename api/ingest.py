@@ -0,0 +1,194 @@
+"""
+Batched grant ingest shared by the bulk API endpoint and the scrapers.
+
+Rows are upserted on ``source_url`` with ``INSERT ... ON CONFLICT DO UPDATE``
+executed once per batch, so loading thousands of grants costs a handful of
+round-trips and one commit per batch instead of one per row.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from models import db
+from models.grant import Grant
+from api.amounts import AmountRange, parse_amount_range
+from api.changes import change_operation, record_changes
+from api.grant_events import grants_written
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 1000
+
+# Optional columns keep their stored value when an upserted row omits them
+OPTIONAL_COLUMNS = ['due_date', 'amount_string', 'description', 'status', 'last_scraped_at']
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if value is None or value == '' or isinstance(value, datetime):
+        return value or None
+    return datetime.fromisoformat(value)
+
+def _parse_amount(data: Dict[str, Any], key: str) -> Optional[float]:
+    value = data.get(key)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must be a number')
+
+def amount_bounds(data: Dict[str, Any]) -> AmountRange:
+    """
+    Numeric ``(amount_min, amount_max)``: given explicitly, or parsed from ``amount_string``.
+
+    Raises ValueError if an explicit bound is not a number.
+    """
+    if 'amount_min' in data or 'amount_max' in data:
+        return _parse_amount(data, 'amount_min'), _parse_amount(data, 'amount_max')
+    return parse_amount_range(data.get('amount_string'))
+
+def normalize_grant_record(data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Map an incoming grant payload onto ``grants`` column values."""
+    amount_min, amount_max = amount_bounds(data)
+    return {
+        'name': data['name'],
+        'funder': data['funder'],
+        'source_url': data.get('source_url') or None,
+        'due_date': _parse_datetime(data.get('due_date')),
+        'amount_string': data.get('amount_string'),
+        'amount_min': amount_min,
+        'amount_max': amount_max,
+        'description': data.get('description'),
+        'status': data.get('status'),
+        'eligibility_analysis': data.get('eligibility_analysis', {}),
+        'last_scraped_at': _parse_datetime(data.get('last_scraped_at')),
+        'created_at': now,
+        'updated_at': now
+    }
+
+def _upsert_statement():
+    """Build the dialect-specific upsert keyed on ``source_url``."""
+    table = Grant.__table__
+    dialect = db.engine.dialect.name
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    stmt = insert(table)
+    # Analysis results are produced locally, so feeds never overwrite them
+    update = {
+        'name': stmt.excluded.name,
+        'funder': stmt.excluded.funder,
+        'updated_at': stmt.excluded.updated_at
+    }
+    for column in OPTIONAL_COLUMNS:
+        update[column] = func.coalesce(stmt.excluded[column], table.c[column])
+    # Parsed bounds follow amount_string, including when it is kept
+    kept = stmt.excluded.amount_string.is_(None)
+    for column in ('amount_min', 'amount_max'):
+        update[column] = case((kept, table.c[column]), else_=stmt.excluded[column])
+    return stmt.on_conflict_do_update(index_elements=['source_url'], set_=update)
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def upsert_batch(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Upsert one batch of validated grant payloads in a single transaction.
+
+    Returns one result per record, in order, with the row ``id`` and whether
+    it was ``created`` or ``updated``. Records that cannot be converted are
+    reported as errors; a record whose ``source_url`` appears again later in
+    the same batch is skipped in favour of the later one.
+    """
+    now = datetime.utcnow()
+    results: List[Dict[str, Any]] = [{} for _ in records]
+    rows, positions = [], []
+    last_seen: Dict[str, int] = {}
+
+    for index, record in enumerate(records):
+        try:
+            row = normalize_grant_record(record, now)
+        except (KeyError, TypeError, ValueError) as e:
+            results[index] = {'status': 'error', 'error': f"Invalid grant: {e}"}
+            continue
+        if row['source_url']:
+            if row['source_url'] in last_seen:
+                earlier = last_seen[row['source_url']]
+                results[positions[earlier]] = {
+                    'status': 'skipped',
+                    'error': 'Superseded by a later row with the same source_url'
+                }
+            last_seen[row['source_url']] = len(rows)
+        rows.append(row)
+        positions.append(index)
+
+    keep = [i for i, row in enumerate(rows) if not row['source_url'] or last_seen[row['source_url']] == i]
+    rows = [rows[i] for i in keep]
+    positions = [positions[i] for i in keep]
+    if not rows:
+        return results
+
+    urls = [row['source_url'] for row in rows if row['source_url']]
+    existing = set()
+    if urls:
+        existing = {
+            url for (url,) in db.session.query(Grant.source_url).filter(Grant.source_url.in_(urls))
+        }
+    for row in rows:
+        if row['source_url'] not in existing and row['status'] is None:
+            row['status'] = 'potential'
+
+    keyed = [row for row in rows if row['source_url']]
+    unkeyed = [row for row in rows if not row['source_url']]
+    try:
+        # Plain executemany for the upsert; ids are read back by source_url,
+        # since RETURNING would force one statement per row here
+        ids_by_url, statuses = {}, {}
+        if keyed:
+            db.session.execute(_upsert_statement(), keyed)
+            for url, grant_id, status in db.session.query(Grant.source_url, Grant.id, Grant.status).filter(
+                Grant.source_url.in_(urls)
+            ):
+                ids_by_url[url] = grant_id
+                statuses[grant_id] = status
+        # Rows without a source_url can't conflict and are always inserted
+        new_ids = []
+        if unkeyed:
+            insert = Grant.__table__.insert().returning(Grant.id, sort_by_parameter_order=True)
+            new_ids = db.session.execute(insert, unkeyed).scalars().all()
+            statuses.update((grant_id, row['status']) for grant_id, row in zip(new_ids, unkeyed))
+        new_ids = iter(new_ids)
+
+        ids = [ids_by_url[row['source_url']] if row['source_url'] else next(new_ids) for row in rows]
+        record_changes(
+            (grant_id, change_operation(row['source_url'] not in existing, statuses[grant_id]))
+            for grant_id, row in zip(ids, rows)
+        )
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error upserting grant batch: {e}")
+        for position in positions:
+            results[position] = {'status': 'error', 'error': 'Database error occurred'}
+        return results
+
+    for position, row, grant_id in zip(positions, rows, ids):
+        results[position] = {
+            'id': grant_id,
+            'status': 'updated' if row['source_url'] in existing else 'created'
+        }
+    grants_written(results[position]['id'] for position in positions)
+    return results
+
+def upsert_grants(records: Iterable[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """Upsert grant payloads in batches; returns one result per record."""
+    results = []
+    for batch in _batches(records, batch_size):
+        results.extend(upsert_batch(batch))
+    return results
@@ -0,0 +1,92 @@
+"""
+Shared async client for the LLM provider.
+
+Each event loop (one per ASGI worker for its lifetime) gets one
+``AsyncAnthropic`` client, created on first use. A short-lived loop (a
+streamed response under WSGI) closes its client with
+:func:`close_llm_client` before the loop is closed. Its connection pool keeps
+provider connections alive between calls, so TLS handshakes and client
+setup are paid once per worker instead of on every request. A semaphore
+caps the calls in flight per loop; calls past the cap wait for a slot
+instead of piling onto the provider's rate limits.
+
+Configured from the environment:
+
+* ``LLM_MAX_IN_FLIGHT``: concurrent calls per worker from requests (default 32)
+* ``LLM_SCAN_MAX_IN_FLIGHT``: concurrent calls per worker from batch
+  eligibility scans, which run on their own loop (default 8). A worker
+  makes at most the sum of the two at once.
+* ``LLM_TIMEOUT``: seconds allowed for a call (default 120)
+* ``LLM_CONNECT_TIMEOUT``: seconds allowed to connect (default 5)
+* ``LLM_MAX_RETRIES``: SDK retries on rate limits and 5xx (default 2)
+"""
+import asyncio
+import os
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+MAX_IN_FLIGHT = int(os.getenv('LLM_MAX_IN_FLIGHT', '32'))
+SCAN_MAX_IN_FLIGHT = int(os.getenv('LLM_SCAN_MAX_IN_FLIGHT', '8'))
+TIMEOUT = float(os.getenv('LLM_TIMEOUT', '120'))
+CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))
+MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))
+# Idle provider connections are kept this long for the next call
+KEEPALIVE_EXPIRY = 60.0
+
+class LLMClient:
+    """A pooled async provider client with a cap on calls in flight."""
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, timeout: float = TIMEOUT,
+                 connect_timeout: float = CONNECT_TIMEOUT, max_retries: int = MAX_RETRIES):
+        self.max_in_flight = max_in_flight
+        self.client = AsyncAnthropic(
+            api_key=os.getenv('ANTHROPIC_API_KEY'),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            max_retries=max_retries,
+            http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(
+                max_connections=max_in_flight,
+                max_keepalive_connections=max_in_flight,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            ))
+        )
+        self.in_flight = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def create_message(self, **params: Any):
+        """``messages.create`` once a slot is free."""
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                return await self.client.messages.create(**params)
+            finally:
+                self.in_flight -= 1
+
+    @asynccontextmanager
+    async def stream_message(self, **params: Any) -> AsyncIterator[Any]:
+        """``messages.stream`` once a slot is free, holding the slot until the stream closes."""
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                async with self.client.messages.stream(**params) as stream:
+                    yield stream
+            finally:
+                self.in_flight -= 1
+
+# One client per event loop: the connection pool can't be shared across loops
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMClient]' = weakref.WeakKeyDictionary()
+
+def llm_client(max_in_flight: Optional[int] = None) -> LLMClient:
+    """The LLM client for the running event loop, created with ``max_in_flight`` slots on first use."""
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        _clients[loop] = LLMClient(max_in_flight or MAX_IN_FLIGHT)
+    return _clients[loop]
+
+async def close_llm_client() -> None:
+    """Close the running event loop's client, if it has one, releasing its connections."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.client.close()
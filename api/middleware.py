@@ -4,6 +4,7 @@ import re
 import bleach
 from typing import Dict, Any, Callable
 import logging
+from api.compression import compress_response
 
 logger = logging.getLogger(__name__)
 
@@ -73,10 +74,21 @@ def setup_security_headers(app):
         response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
         response.headers['Content-Security-Policy'] = "default-src 'self'"
         response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        response.headers['Pragma'] = 'no-cache'
+        # Routes that support conditional requests set their own policy
+        if 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
+            response.headers['Pragma'] = 'no-cache'
         return response
 
+def setup_compression(app):
+    """Configure response compression (see api/compression.py)."""
+    @app.after_request
+    def compress(response):
+        """Compress large text responses for clients that accept it."""
+        return compress_response(response)
+
+    app.extensions['compression'] = True
+
 def setup_request_logging(app):
     """Configure request logging."""
     @app.before_request
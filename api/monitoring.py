@@ -28,6 +28,19 @@ CACHE_MISSES = Counter(
     'Number of cache misses'
 )
 
+# Read-through response cache; hit ratio per route is hits / (hits + misses)
+RESPONSE_CACHE_HITS = Counter(
+    'grant_response_cache_hits_total',
+    'Number of grant read responses served from cache',
+    ['route']
+)
+
+RESPONSE_CACHE_MISSES = Counter(
+    'grant_response_cache_misses_total',
+    'Number of grant read responses rendered from the database',
+    ['route']
+)
+
 API_RATE_LIMITS = Counter(
     'grant_eligibility_rate_limits_total',
     'Number of rate limit hits'
@@ -58,7 +71,7 @@ DRAFT_REQUESTS = Counter(
 DRAFT_LATENCY = Histogram(
     'grant_draft_duration_seconds',
     'Time spent generating draft responses',
-    ['phase']  # api_call, total
+    ['phase']  # api_call, first_token, total
 )
 
 def track_timing(phase: str):
@@ -146,7 +146,7 @@ def register_openapi_docs(app):
             operations={
                 "get": {
                     "tags": ["grants"],
-                    "summary": "Get all grants",
+                    "summary": "Get a page of grants",
                     "security": [{"bearerAuth": []}],
                     "parameters": [
                         {
@@ -158,11 +158,35 @@ def register_openapi_docs(app):
                             "name": "funder",
                             "in": "query",
                             "schema": {"type": "string"}
+                        },
+                        {
+                            "name": "limit",
+                            "in": "query",
+                            "schema": {"type": "integer", "default": 50, "maximum": 500}
+                        },
+                        {
+                            "name": "cursor",
+                            "in": "query",
+                            "description": "Opaque next_cursor value from the previous page",
+                            "schema": {"type": "string"}
+                        },
+                        {
+                            "name": "fields",
+                            "in": "query",
+                            "description": "Comma-separated subset of Grant fields to return; id is always included",
+                            "schema": {"type": "string"},
+                            "example": "name,funder,due_date,status"
+                        },
+                        {
+                            "name": "include_count",
+                            "in": "query",
+                            "description": "Also return the total number of matching grants",
+                            "schema": {"type": "boolean", "default": False}
                         }
                     ],
                     "responses": {
                         "200": {
-                            "description": "List of grants",
+                            "description": "Page of grants",
                             "content": {
                                 "application/json": {
                                     "schema": {
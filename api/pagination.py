@@ -0,0 +1,150 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+def parse_limit(value: Optional[str]) -> int:
+    """Parse the ``limit`` query parameter, clamped to the allowed range."""
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, MAX_PAGE_SIZE)
+
+def encode_cursor(due_date: Optional[datetime], grant_id: int) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    payload = [due_date.isoformat() if due_date else None, grant_id]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor produced by :func:`encode_cursor`."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        due_date, grant_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.fromisoformat(due_date) if due_date else None), int(grant_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError('Invalid cursor')
+
+def encode_rank_cursor(rank: float, grant_id: int) -> str:
+    """Encode the (rank, id) sort key of a ranked search result as a cursor."""
+    raw = json.dumps(['rank', rank, grant_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    """Decode a cursor produced by :func:`encode_rank_cursor`."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        kind, rank, grant_id = json.loads(base64.urlsafe_b64decode(padded))
+        if kind != 'rank':
+            raise ValueError(kind)
+        return float(rank), int(grant_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError('Invalid cursor')
+
+def paginate(query, model, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of ``query`` ordered by due date (nulls last), then id.
+
+    Dated and undated rows are read as two index range scans so every page
+    seeks straight to the cursor position with a plain ``(due_date, id)``
+    row-value comparison. The undated query only runs once the dated rows
+    are exhausted.
+
+    Returns the rows for the page and the cursor for the next page, or
+    ``None`` when this is the last page.
+    """
+    due_date, last_id = decode_cursor(cursor) if cursor else (None, None)
+    rows: List[Any] = []
+
+    if not cursor or due_date is not None:
+        dated = query.filter(model.due_date.isnot(None))
+        if cursor:
+            dated = dated.filter(tuple_(model.due_date, model.id) > tuple_(due_date, last_id))
+        rows = dated.order_by(model.due_date, model.id).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        undated = query.filter(model.due_date.is_(None))
+        if cursor and due_date is None:
+            undated = undated.filter(model.id > last_id)
+        rows += undated.order_by(model.id).limit(limit + 1 - len(rows)).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.due_date, last.id)
+
+def encode_key_cursor(key: str, value: Any, grant_id: int) -> str:
+    """Encode the (value, id) sort key of a listing ordered by another column."""
+    raw = json.dumps([key, value, grant_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_key_cursor(cursor: str, key: str) -> Tuple[Any, int]:
+    """Decode a cursor produced by :func:`encode_key_cursor` for the same ``key``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        kind, value, grant_id = json.loads(base64.urlsafe_b64decode(padded))
+        if kind != key:
+            raise ValueError(kind)
+        return value, int(grant_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError('Invalid cursor')
+
+def paginate_by(query, model, key: str, cursor: Optional[str], limit: int,
+                descending: bool = False) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of ``query`` ordered by column ``key`` (nulls last), then id.
+
+    Works like :func:`paginate`, for a numeric column and in either
+    direction; ids follow the column's direction so each part is a single
+    ``(key, id)`` index range scan.
+    """
+    column = getattr(model, key)
+    value, last_id = decode_key_cursor(cursor, key) if cursor else (None, None)
+    rows: List[Any] = []
+
+    if not cursor or value is not None:
+        valued = query.filter(column.isnot(None))
+        if cursor:
+            position = tuple_(column, model.id)
+            bound = tuple_(value, last_id)
+            valued = valued.filter(position < bound if descending else position > bound)
+        order = (column.desc(), model.id.desc()) if descending else (column, model.id)
+        rows = valued.order_by(*order).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        missing = query.filter(column.is_(None))
+        if cursor and value is None:
+            missing = missing.filter(model.id < last_id if descending else model.id > last_id)
+        order = model.id.desc() if descending else model.id
+        rows += missing.order_by(order).limit(limit + 1 - len(rows)).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_key_cursor(key, getattr(last, key), last.id)
+
+def page_response(data: List[Dict[str, Any]], next_cursor: Optional[str],
+                  count: Optional[int] = None) -> Dict[str, Any]:
+    """Build the standard JSON body for a paginated listing."""
+    body = {
+        'success': True,
+        'data': data,
+        'next_cursor': next_cursor
+    }
+    if count is not None:
+        body['count'] = count
+    return body
@@ -0,0 +1,168 @@
+"""
+Saved-search percolator.
+
+Instead of re-running every saved search against the table after a scrape,
+saved searches are compiled into an inverted index and each written grant is
+matched against it once. A search with a keyword is filed under one of its
+terms (the longest, as the most selective), one with only a funder under
+that funder, and only searches with neither are checked against every grant.
+Candidates are then verified against all of their predicates, so the cost
+of a batch grows with its grants and the searches they could match, not
+with saved searches × table size.
+
+Matches become rows in ``notifications``; the unique (search, grant) index
+means a grant is reported once per search however often it is rewritten.
+"""
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from models import db
+from models.grant import Grant
+from models.saved_search import Notification, SavedSearch
+from api.amounts import ranges_overlap
+from api.search_index import tokenize
+from api.watermark import EngineLocal
+
+logger = logging.getLogger(__name__)
+
+class CompiledSearch(NamedTuple):
+    id: int
+    user_id: Optional[int]
+    terms: FrozenSet[str]
+    funder: Optional[str]
+    min_date: Optional[datetime]
+    max_date: Optional[datetime]
+    min_amount: Optional[float]
+    max_amount: Optional[float]
+
+    def matches(self, terms: Set[str], grant) -> bool:
+        """Check every predicate against a grant row and its term set."""
+        if not self.terms <= terms:
+            return False
+        if self.funder is not None and grant.funder != self.funder:
+            return False
+        if self.min_date is not None or self.max_date is not None:
+            if grant.due_date is None:
+                return False
+            if self.min_date is not None and grant.due_date < self.min_date:
+                return False
+            if self.max_date is not None and grant.due_date > self.max_date:
+                return False
+        if self.min_amount is not None or self.max_amount is not None:
+            # The stored bounds, as the min_amount/max_amount listing filters use
+            if not ranges_overlap((grant.amount_min, grant.amount_max), self.min_amount, self.max_amount):
+                return False
+        return True
+
+def compile_search(search: SavedSearch) -> CompiledSearch:
+    return CompiledSearch(
+        id=search.id,
+        user_id=search.user_id,
+        terms=frozenset(tokenize(search.keyword or '')),
+        funder=search.funder or None,
+        min_date=search.min_date,
+        max_date=search.max_date,
+        min_amount=search.min_amount,
+        max_amount=search.max_amount
+    )
+
+def grant_terms(grant) -> Set[str]:
+    """Terms a keyword search can match: name, description and funder."""
+    return set(tokenize(' '.join(filter(None, (grant.name, grant.description, grant.funder)))))
+
+class PercolatorIndex:
+    """Inverted index from grant terms and funders to saved searches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._searches: Dict[int, CompiledSearch] = {}
+        self._by_term: Dict[str, List[CompiledSearch]] = defaultdict(list)
+        self._by_funder: Dict[str, List[CompiledSearch]] = defaultdict(list)
+        self._unanchored: List[CompiledSearch] = []
+        self._version = None
+
+    def __len__(self) -> int:
+        return len(self._searches)
+
+    def load(self, searches: Iterable[CompiledSearch]) -> None:
+        """Replace the index contents (built aside, then swapped in)."""
+        by_id, by_term, by_funder, unanchored = {}, defaultdict(list), defaultdict(list), []
+        for search in searches:
+            by_id[search.id] = search
+            if search.terms:
+                anchor = max(sorted(search.terms), key=len)
+                by_term[anchor].append(search)
+            elif search.funder is not None:
+                by_funder[search.funder].append(search)
+            else:
+                unanchored.append(search)
+        self._searches, self._by_term, self._by_funder, self._unanchored = by_id, by_term, by_funder, unanchored
+
+    def sync(self) -> None:
+        """Reload when saved searches were added, changed or removed (any worker)."""
+        with self._lock:
+            version = tuple(db.session.query(
+                func.count(SavedSearch.id), func.max(SavedSearch.updated_at)
+            ).one())
+            if version != self._version:
+                self.load(compile_search(search) for search in SavedSearch.query)
+                self._version = version
+
+    def candidates(self, terms: Set[str], funder: Optional[str]) -> List[CompiledSearch]:
+        found = list(self._unanchored)
+        for term in terms:
+            found.extend(self._by_term.get(term, ()))
+        found.extend(self._by_funder.get(funder, ()))
+        return found
+
+    def match(self, grant) -> List[CompiledSearch]:
+        """Saved searches the grant satisfies."""
+        terms = grant_terms(grant)
+        return [search for search in self.candidates(terms, grant.funder) if search.matches(terms, grant)]
+
+# The percolator index for the current app's database
+percolator_index = EngineLocal(PercolatorIndex)
+
+def _insert_ignore_duplicates(rows: List[Dict[str, Any]]) -> None:
+    table = Notification.__table__
+    insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    stmt = insert(table).on_conflict_do_nothing(index_elements=['saved_search_id', 'grant_id'])
+    db.session.execute(stmt, rows)
+
+def percolate(grant_ids: Iterable[int]) -> int:
+    """
+    Match written grants against saved searches and record notifications.
+
+    Runs after the grants are committed; errors are logged rather than
+    raised so a failed match never fails the write. Returns the number of
+    matches found (existing notifications are left untouched).
+    """
+    grant_ids = list(grant_ids)
+    try:
+        index = percolator_index()
+        index.sync()
+        if not grant_ids or not len(index):
+            return 0
+
+        rows = db.session.query(
+            Grant.id, Grant.name, Grant.description, Grant.funder, Grant.due_date, Grant.amount_min, Grant.amount_max
+        ).filter(Grant.id.in_(grant_ids))
+        now = datetime.utcnow()
+        matches = [
+            {'saved_search_id': search.id, 'grant_id': grant.id, 'user_id': search.user_id, 'created_at': now}
+            for grant in rows
+            for search in index.match(grant)
+        ]
+        if matches:
+            _insert_ignore_duplicates(matches)
+            db.session.commit()
+        return len(matches)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error percolating grants: {e}")
+        return 0
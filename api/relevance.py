@@ -0,0 +1,195 @@
+"""
+Local lexical relevance of grants to an organisation, scored before any LLM call.
+
+An eligibility analysis is one slow, paid LLM call per grant, yet most
+grants plainly have nothing to do with a given organisation. Here every
+grant is scored with BM25 against the words of the organisation's mission,
+focus areas and target demographics, so scans can analyse the best
+matches first and leave out the clear misses.
+
+Each worker keeps one inverted index over grant names and descriptions
+(term -> postings of document position and term frequency), built on first
+use and kept current from the table's version (``api.watermark``).
+A query reads only the postings of the organisation's own terms. With
+NumPy installed each term's postings are also kept as arrays, and a query
+scores every grant at once; that is a sparse matrix-vector product over
+the postings. Otherwise the same sums run in Python.
+
+Scores are divided by the sum of the query terms' IDF, which is what a
+grant of average length mentioning every term once would score, and
+capped at 1. So 0 means no shared terms and 1 covers the whole profile,
+whatever the profile's length.
+"""
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from models.grant import Grant
+from api.changes import REMOVED_STATUSES
+from api.search_index import tokenize
+from api.watermark import EngineLocal, WatermarkIndex
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+# BM25 term-frequency saturation and length normalisation
+K1 = 1.2
+B = 0.75
+# Name terms count this many times over description terms
+NAME_WEIGHT = 2
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our that the their this to '
+    'we with who which will'.split()
+)
+
+def profile_terms(profile: Any) -> List[str]:
+    """
+    The distinct query terms for an organisation profile.
+
+    Uses ``mission``, ``focus_areas`` (a list or a string) and
+    ``target_demographics``, falling back to ``profile_text`` when all
+    three are empty.
+    """
+    focus_areas = getattr(profile, 'focus_areas', None)
+    if isinstance(focus_areas, (list, tuple)):
+        focus_areas = ' '.join(str(area) for area in focus_areas)
+    parts = [getattr(profile, 'mission', None), focus_areas, getattr(profile, 'target_demographics', None)]
+    text = ' '.join(part for part in parts if part) or getattr(profile, 'profile_text', None) or ''
+    return [term for term in dict.fromkeys(tokenize(text)) if term not in STOPWORDS]
+
+def grant_terms(name: Optional[str], description: Optional[str]) -> Counter:
+    """Term frequencies for one grant, with name terms weighted up."""
+    terms = Counter(tokenize(description or ''))
+    for term in tokenize(name or ''):
+        terms[term] += NAME_WEIGHT
+    return terms
+
+def parse_min_relevance(value: Any) -> Optional[float]:
+    """Parse a ``min_relevance`` threshold between 0 and 1."""
+    if value is None or value == '':
+        return None
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('min_relevance must be a number')
+    if not 0 <= threshold <= 1:
+        raise ValueError('min_relevance must be between 0 and 1')
+    return threshold
+
+class RelevanceIndex(WatermarkIndex):
+    """In-process BM25 index over grant names and descriptions.
+
+    Removed grants (merged duplicates) lose their postings and no longer
+    count towards document frequencies; their positions are reused if they
+    come back.
+    """
+
+    columns = (Grant.id, Grant.name, Grant.description, Grant.status)
+
+    def __init__(self):
+        super().__init__()
+        # Grants get a stable position on first sight; positions index the arrays
+        self._positions: Dict[int, int] = {}
+        self._ids: List[int] = []
+        self._lengths: List[int] = []
+        self._terms: List[Counter] = []
+        self._removed: Set[int] = set()
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+        # NumPy copies of postings, lengths and ids, rebuilt when they change
+        self._arrays: Dict[str, Tuple[Any, Any]] = {}
+        self._length_array = None
+        self._id_array = None
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._removed)
+
+    def _apply(self, row) -> None:
+        """Replace one grant's postings with its current terms, or drop them for removed grants."""
+        grant_id, name, description, status = row
+        position = self._positions.get(grant_id)
+        if status in REMOVED_STATUSES:
+            if position is None or position in self._removed:
+                return
+            self._removed.add(position)
+            terms = Counter()
+        else:
+            terms = grant_terms(name, description)
+            if position is None:
+                position = self._positions[grant_id] = len(self._ids)
+                self._ids.append(grant_id)
+                self._lengths.append(0)
+                self._terms.append(Counter())
+            elif position in self._removed:
+                self._removed.discard(position)
+            elif self._terms[position] == terms:
+                return
+        for term in self._terms[position]:
+            del self._postings[term][position]
+            self._arrays.pop(term, None)
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[position] = count
+            self._arrays.pop(term, None)
+        self._total_length += sum(terms.values()) - self._lengths[position]
+        self._lengths[position] = sum(terms.values())
+        self._terms[position] = terms
+        self._length_array = None
+
+    def _idf(self, term: str) -> float:
+        documents = len(self._postings[term])
+        return math.log(1 + (len(self) - documents + 0.5) / (documents + 0.5))
+
+    def _score_python(self, weights: Dict[str, float], average: float) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term, idf in weights.items():
+            for position, count in self._postings[term].items():
+                norm = K1 * (1 - B + B * self._lengths[position] / average)
+                scores[position] = scores.get(position, 0.0) + idf * count * (K1 + 1) / (count + norm)
+        ceiling = sum(weights.values())
+        return {self._ids[position]: round(min(score / ceiling, 1.0), 6) for position, score in scores.items()}
+
+    def _score_numpy(self, weights: Dict[str, float], average: float) -> Dict[int, float]:
+        if self._length_array is None:
+            self._length_array = numpy.array(self._lengths, dtype=numpy.float64)
+            self._id_array = numpy.array(self._ids, dtype=numpy.int64)
+        scores = numpy.zeros(len(self._ids))
+        for term, idf in weights.items():
+            if term not in self._arrays:
+                postings = self._postings[term]
+                self._arrays[term] = (
+                    numpy.fromiter(postings.keys(), dtype=numpy.int64, count=len(postings)),
+                    numpy.fromiter(postings.values(), dtype=numpy.float64, count=len(postings))
+                )
+            positions, counts = self._arrays[term]
+            norm = K1 * (1 - B + B * self._length_array[positions] / average)
+            scores[positions] += idf * counts * (K1 + 1) / (counts + norm)
+        matched = numpy.flatnonzero(scores)
+        normalized = numpy.minimum(scores[matched] / sum(weights.values()), 1.0).round(6)
+        return dict(zip(self._id_array[matched].tolist(), normalized.tolist()))
+
+    def score(self, terms: Sequence[str]) -> Dict[int, float]:
+        """Relevance of every grant sharing a term with ``terms``, keyed by grant id."""
+        weights = {term: self._idf(term) for term in terms if self._postings.get(term)}
+        if not weights:
+            return {}
+        average = self._total_length / len(self) or 1.0
+        return (self._score_numpy if numpy is not None else self._score_python)(weights, average)
+
+    def relevance(self, terms: Sequence[str], grant_ids: Optional[Iterable[int]] = None) -> Dict[int, float]:
+        """
+        Sync with the database, then score grants against ``terms``.
+
+        With ``grant_ids``, every one of them gets a score (0.0 when nothing
+        matches); otherwise only grants with a shared term are returned.
+        """
+        with self._lock:
+            self.sync()
+            scores = self.score(terms)
+        if grant_ids is None:
+            return scores
+        return {grant_id: scores.get(grant_id, 0.0) for grant_id in grant_ids}
+
+# The relevance index for the current app's database
+relevance_index = EngineLocal(RelevanceIndex)
@@ -0,0 +1,138 @@
+"""
+Read-through caching of rendered grant read responses.
+
+Successful responses from the decorated views are stored in the tiered cache
+together with their validators, so repeat reads (and conditional revalidation)
+are answered without touching the database. Single-grant entries are keyed by
+id; listing and search entries by their normalized query string, so every
+cursor page is its own entry. The memory tier keeps at most
+``CACHE_MEMORY_MAX_ENTRIES`` entries per process, least recently used out
+first, so walking pages cannot grow it without bound. Writes drop
+the affected grant keys plus every listing and search key through
+:func:`invalidate_grant_responses`.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
+from typing import Iterable, Optional
+from flask import Response, current_app, make_response, request
+from api.cache_manager import cache
+from api.compression import (
+    compress, compression_enabled, is_compressible, min_size, negotiate_encoding, set_encoding
+)
+from api.http_cache import is_not_modified, not_modified, set_validators
+from api.monitoring import RESPONSE_CACHE_HITS, RESPONSE_CACHE_MISSES
+
+RESPONSE_CACHE_PREFIX = 'grant_responses'
+DEFAULT_RESPONSE_TTL = 60
+
+# Key scopes: one entry per grant, or one per normalized query string
+GRANT_SCOPE = 'grant'
+COLLECTION_SCOPES = ('list', 'search')
+
+def route_enabled(route: str) -> bool:
+    """Check the per-view switch in ``RESPONSE_CACHE_ROUTES`` (off if unset)."""
+    return bool(current_app.config.get('RESPONSE_CACHE_ROUTES', {}).get(route, False))
+
+def grant_key(grant_id: int) -> str:
+    return f"{RESPONSE_CACHE_PREFIX}:{GRANT_SCOPE}:{grant_id}"
+
+def collection_key(scope: str) -> str:
+    """Key for a listing or search response, from its sorted query parameters."""
+    params = sorted(request.args.items(multi=True))
+    digest = hashlib.sha1(json.dumps(params).encode()).hexdigest()
+    return f"{RESPONSE_CACHE_PREFIX}:{scope}:{digest}"
+
+def _cached_response(entry: dict) -> Response:
+    """Rebuild a response (or a 304) from a cache entry."""
+    etag = entry.get('etag')
+    last_modified = datetime.fromisoformat(entry['last_modified']) if entry.get('last_modified') else None
+    if etag and is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+    response = Response(entry['body'], status=200, mimetype='application/json')
+    if etag:
+        set_validators(response, etag, last_modified)
+    return response
+
+def _cache_entry(response: Response) -> Optional[dict]:
+    """Serialize a successful, fully buffered response for the cache."""
+    if response.status_code != 200 or response.is_streamed:
+        return None
+    etag, _ = response.get_etag()
+    last_modified = response.last_modified
+    return {
+        'body': response.get_data(as_text=True),
+        'etag': etag,
+        'last_modified': last_modified.isoformat() if last_modified else None
+    }
+
+def _apply_cached_encoding(response: Response, entry: dict) -> Optional[dict]:
+    """
+    Serve the body compressed from ``entry``, compressing it on first use.
+
+    ``entry`` may be shared with other threads through the memory tier, so
+    it is never modified: when a new encoded variant is made, a copy of the
+    entry carrying it is returned for the caller to store. Returns None
+    otherwise.
+    """
+    if not compression_enabled() or response.status_code != 200 or not is_compressible(response):
+        return None
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    body = response.get_data()
+    if not encoding or len(body) < min_size():
+        return None
+
+    variants = entry.get('encoded', {})
+    updated = None
+    if encoding not in variants:
+        variants = dict(variants, **{encoding: base64.b64encode(compress(body, encoding)).decode()})
+        updated = dict(entry, encoded=variants)
+    response.set_data(base64.b64decode(variants[encoding]))
+    set_encoding(response, encoding)
+    return updated
+
+def cached_response(scope: str):
+    """
+    Serve a grant read view through the response cache.
+
+    ``scope`` is ``'grant'`` for views taking a ``grant_id``, otherwise one of
+    :data:`COLLECTION_SCOPES`. Only 200 responses are stored.
+    """
+    def decorator(view):
+        route = view.__name__
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not route_enabled(route):
+                return view(*args, **kwargs)
+
+            key = grant_key(kwargs['grant_id']) if scope == GRANT_SCOPE else collection_key(scope)
+            ttl = current_app.config.get('RESPONSE_CACHE_TTL', DEFAULT_RESPONSE_TTL)
+            entry = cache.get(key, memory_ttl=ttl)
+            if entry is not None:
+                RESPONSE_CACHE_HITS.labels(route=route).inc()
+                response = _cached_response(entry)
+                # Keep compressed variants with the entry so later hits reuse them
+                updated = _apply_cached_encoding(response, entry)
+                if updated is not None:
+                    cache.set(key, updated, memory_ttl=ttl, redis_ttl=ttl)
+                return response
+
+            RESPONSE_CACHE_MISSES.labels(route=route).inc()
+            response = make_response(view(*args, **kwargs))
+            entry = _cache_entry(response)
+            if entry is not None:
+                cache.set(key, _apply_cached_encoding(response, entry) or entry, memory_ttl=ttl, redis_ttl=ttl)
+            return response
+
+        return wrapper
+    return decorator
+
+def invalidate_grant_responses(grant_ids: Iterable[int]) -> None:
+    """Drop cached responses for the given grants and every listing/search."""
+    cache.invalidate_many([grant_key(grant_id) for grant_id in grant_ids])
+    for scope in COLLECTION_SCOPES:
+        cache.invalidate_pattern(f"{RESPONSE_CACHE_PREFIX}:{scope}:*")
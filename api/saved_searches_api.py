@@ -0,0 +1,170 @@
+from flask import Blueprint, jsonify, request
+from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Any, Dict, Optional
+import logging
+
+from models import db
+from models.saved_search import Notification, SavedSearch
+from api.pagination import page_response, paginate_by, parse_limit
+
+logger = logging.getLogger(__name__)
+saved_searches_bp = Blueprint('saved_searches', __name__)
+
+def _optional_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def _optional_float(value: Any) -> Optional[float]:
+    return float(value) if value not in (None, '') else None
+
+def build_saved_search(data: Dict[str, Any]) -> SavedSearch:
+    """Create a SavedSearch from a request payload; raises ValueError if invalid."""
+    if not data or not data.get('name'):
+        raise ValueError('Missing required field: name')
+    search = SavedSearch(
+        name=data['name'],
+        user_id=data.get('user_id'),
+        keyword=(data.get('keyword') or '').strip() or None,
+        funder=data.get('funder') or None,
+        min_date=_optional_datetime(data.get('min_date')),
+        max_date=_optional_datetime(data.get('max_date')),
+        min_amount=_optional_float(data.get('min_amount')),
+        max_amount=_optional_float(data.get('max_amount'))
+    )
+    if search.min_date and search.max_date and search.min_date > search.max_date:
+        raise ValueError('min_date must not be after max_date')
+    if search.min_amount is not None and search.max_amount is not None and search.min_amount > search.max_amount:
+        raise ValueError('min_amount must not be greater than max_amount')
+    return search
+
+@saved_searches_bp.route('/api/saved-searches', methods=['POST'])
+def create_saved_search():
+    """Save a search; grants written from now on are matched against it."""
+    try:
+        search = build_saved_search(request.get_json(silent=True))
+        db.session.add(search)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'data': search.to_dict(),
+            'message': 'Saved search created successfully'
+        }), 201
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error creating saved search: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Database error occurred'
+        }), 500
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating saved search: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to create saved search'
+        }), 500
+
+@saved_searches_bp.route('/api/saved-searches', methods=['GET'])
+def get_saved_searches():
+    """Get a page of saved searches in creation order, optionally for one user."""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        query = SavedSearch.query
+        user_id = request.args.get('user_id', type=int)
+        if user_id is not None:
+            query = query.filter(SavedSearch.user_id == user_id)
+
+        rows, next_cursor = paginate_by(query, SavedSearch, 'id', request.args.get('cursor'), limit)
+        return jsonify(page_response([search.to_dict() for search in rows], next_cursor)), 200
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@saved_searches_bp.route('/api/saved-searches/<int:search_id>', methods=['DELETE'])
+def delete_saved_search(search_id):
+    """Delete a saved search and its notifications."""
+    try:
+        search = db.session.get(SavedSearch, search_id)
+        if not search:
+            return jsonify({
+                'success': False,
+                'error': 'Saved search not found'
+            }), 404
+
+        db.session.delete(search)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Saved search deleted successfully'
+        }), 200
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error deleting saved search {search_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Database error occurred'
+        }), 500
+
+@saved_searches_bp.route('/api/notifications', methods=['GET'])
+def get_notifications():
+    """Get a page of grant-match notifications, newest first."""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        query = Notification.query
+        user_id = request.args.get('user_id', type=int)
+        search_id = request.args.get('saved_search_id', type=int)
+        if user_id is not None:
+            query = query.filter(Notification.user_id == user_id)
+        if search_id is not None:
+            query = query.filter(Notification.saved_search_id == search_id)
+        if request.args.get('unread', '').lower() == 'true':
+            query = query.filter(Notification.read_at.is_(None))
+
+        rows, next_cursor = paginate_by(query, Notification, 'id', request.args.get('cursor'), limit,
+                                        descending=True)
+        return jsonify(page_response([n.to_dict() for n in rows], next_cursor)), 200
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@saved_searches_bp.route('/api/notifications/<int:notification_id>/read', methods=['POST'])
+def mark_notification_read(notification_id):
+    """Mark a notification as read."""
+    try:
+        notification = db.session.get(Notification, notification_id)
+        if not notification:
+            return jsonify({
+                'success': False,
+                'error': 'Notification not found'
+            }), 404
+
+        notification.read_at = notification.read_at or datetime.utcnow()
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'data': notification.to_dict()
+        }), 200
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error updating notification {notification_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Database error occurred'
+        }), 500
@@ -0,0 +1,189 @@
+"""
+Full-text search index for grants.
+
+SQLite uses an external-content FTS5 table kept in sync by triggers and
+ranked with BM25. PostgreSQL uses a generated, weighted ``tsvector`` column
+with a GIN index ranked with ``ts_rank_cd``. In both cases the database keeps
+the index current, so every writer (API, bulk ingest, scrapers) stays in sync.
+"""
+import re
+import weakref
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, column, func, literal_column, or_, select, table, text
+from models import db
+from models.grant import Grant
+from api.pagination import decode_rank_cursor, encode_rank_cursor
+
+FTS_TABLE = 'grants_fts'
+SNIPPET_START = '<mark>'
+SNIPPET_END = '</mark>'
+SNIPPET_TOKENS = 16
+
+# BM25 column weights for (name, description, funder)
+SQLITE_WEIGHTS = (10.0, 1.0, 5.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, funder,
+        content='grants', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON grants BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description, funder)
+        VALUES (new.id, new.name, new.description, new.funder);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON grants BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, funder)
+        VALUES ('delete', old.id, old.name, old.description, old.funder);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description, funder ON grants
+    WHEN old.name IS NOT new.name OR old.description IS NOT new.description OR old.funder IS NOT new.funder
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, funder)
+        VALUES ('delete', old.id, old.name, old.description, old.funder);
+        INSERT INTO {FTS_TABLE}(rowid, name, description, funder)
+        VALUES (new.id, new.name, new.description, new.funder);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+]
+
+SQLITE_DROP = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}"
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE grants ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(funder, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_grants_search_vector ON grants USING GIN (search_vector)"
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_grants_search_vector",
+    "ALTER TABLE grants DROP COLUMN IF EXISTS search_vector"
+]
+
+# Whether each engine has the index installed, so searches don't hit the catalog
+_index_state: 'weakref.WeakKeyDictionary[Any, bool]' = weakref.WeakKeyDictionary()
+
+def create_search_index(bind) -> None:
+    """Create (or rebuild) the full-text index for the bound database."""
+    statements = POSTGRES_DDL if bind.dialect.name == 'postgresql' else SQLITE_DDL
+    for statement in statements:
+        bind.execute(text(statement))
+    _index_state[bind.engine] = True
+
+def drop_search_index(bind) -> None:
+    """Drop the full-text index for the bound database."""
+    statements = POSTGRES_DROP if bind.dialect.name == 'postgresql' else SQLITE_DROP
+    for statement in statements:
+        bind.execute(text(statement))
+    _index_state[bind.engine] = False
+
+def has_search_index(engine) -> bool:
+    """Check whether the full-text index is installed."""
+    if engine not in _index_state:
+        with engine.connect() as conn:
+            if engine.dialect.name == 'postgresql':
+                found = conn.execute(text(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = 'grants' AND column_name = 'search_vector'"
+                )).first()
+            else:
+                found = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+                ), {'name': FTS_TABLE}).first()
+        _index_state[engine] = found is not None
+    return _index_state[engine]
+
+def tokenize(keyword: str) -> List[str]:
+    """Split a free-text keyword into lowercase search terms."""
+    return [token.lower() for token in _TOKEN_RE.findall(keyword)]
+
+def to_match_expression(keyword: str) -> Optional[str]:
+    """Build an FTS5 MATCH expression that requires every term, quoted safely."""
+    tokens = tokenize(keyword)
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"' for token in tokens)
+
+def fulltext_filter(keyword: str):
+    """
+    Build a WHERE clause restricting grants to full-text matches for ``keyword``.
+
+    Used where relevance order doesn't matter (e.g. facet counts). Returns
+    ``None`` if the keyword has no searchable terms.
+    """
+    terms = tokenize(keyword)
+    if not terms:
+        return None
+    if db.engine.dialect.name == 'postgresql':
+        ts_query = func.plainto_tsquery('english', ' '.join(terms))
+        return literal_column('grants.search_vector').op('@@')(ts_query)
+    fts = table(FTS_TABLE, column('rowid'))
+    matches = select(fts.c.rowid).where(literal_column(FTS_TABLE).op('MATCH')(to_match_expression(keyword)))
+    return Grant.id.in_(matches)
+
+def ranked_search(keyword: str, entities: Sequence[Any] = (Grant,)):
+    """
+    Build a query of ``(*entities, rank, snippet)`` rows matching ``keyword``;
+    ``entities`` defaults to the ``Grant`` model and may be plain columns.
+
+    Returns the query together with its rank expression, which sorts
+    ascending from most to least relevant on every backend, or ``None`` if
+    the keyword has no searchable terms.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        terms = tokenize(keyword)
+        if not terms:
+            return None
+        ts_query = func.plainto_tsquery('english', ' '.join(terms))
+        vector = literal_column('grants.search_vector')
+        rank = -func.ts_rank_cd(vector, ts_query)
+        snippet = func.ts_headline(
+            'english',
+            func.coalesce(Grant.description, Grant.name),
+            ts_query,
+            f'StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords={SNIPPET_TOKENS * 2}, MinWords=5'
+        ).label('snippet')
+        query = db.session.query(*entities, rank.label('rank'), snippet).filter(vector.op('@@')(ts_query))
+        return query, rank
+
+    match = to_match_expression(keyword)
+    if not match:
+        return None
+    fts = table(FTS_TABLE, column('rowid'))
+    fts_ref = literal_column(FTS_TABLE)
+    rank = func.bm25(fts_ref, *SQLITE_WEIGHTS)
+    snippet = func.snippet(fts_ref, -1, SNIPPET_START, SNIPPET_END, '…', SNIPPET_TOKENS).label('snippet')
+    query = (
+        db.session.query(*entities, rank.label('rank'), snippet)
+        .select_from(fts)
+        .join(Grant, Grant.id == fts.c.rowid)
+        .filter(fts_ref.op('MATCH')(match))
+    )
+    return query, rank
+
+def paginate_ranked(query, rank, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page of a :func:`ranked_search` query in (rank, id) order."""
+    if cursor:
+        last_rank, last_id = decode_rank_cursor(cursor)
+        query = query.filter(or_(
+            rank > last_rank,
+            and_(rank == last_rank, Grant.id > last_id)
+        ))
+    rows = query.order_by(rank, Grant.id).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    last_id = last.id if 'id' in last._fields else last[0].id
+    return rows, encode_rank_cursor(last.rank, last_id)
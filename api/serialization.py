@@ -0,0 +1,109 @@
+"""
+JSON serialization shared by API responses, the cache and exports.
+
+Uses orjson when it is installed and the standard library otherwise; set
+``JSON_BACKEND=json`` to force the fallback. Both backends emit compact JSON
+and encode ``datetime``/``date`` values as ISO 8601, so the listing row path
+(``api.rows``) hands raw column values straight to the serializer. Model
+``to_dict`` methods still return ISO strings, so they encode the same under
+Flask's default provider.
+"""
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional, Union
+from flask import Flask
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Encode the types the standard library can't, matching orjson's output."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class StdlibBackend:
+    """Standard library ``json`` backend."""
+    name = 'json'
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self.dumps(obj).encode()
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+class OrjsonBackend:
+    """orjson backend; serializes straight to UTF-8 bytes."""
+    name = 'orjson'
+
+    def __init__(self):
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self._options)
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+def available_backends() -> Dict[str, Any]:
+    """All backends usable in this environment, keyed by name."""
+    backends = {'json': StdlibBackend()}
+    if orjson is not None:
+        backends['orjson'] = OrjsonBackend()
+    return backends
+
+def _select_backend(name: Optional[str] = None):
+    backends = available_backends()
+    name = name or os.getenv('JSON_BACKEND')
+    if name:
+        if name not in backends:
+            raise ValueError(f"Unknown or unavailable JSON backend: {name}")
+        return backends[name]
+    return backends.get('orjson', backends['json'])
+
+backend = _select_backend()
+
+def dumps(obj: Any) -> str:
+    """Serialize ``obj`` to a JSON string."""
+    return backend.dumps(obj)
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize ``obj`` to UTF-8 encoded JSON."""
+    return backend.dumps_bytes(obj)
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document."""
+    return backend.loads(data)
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by the selected serialization backend."""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # Skip the str round-trip: the response body is written as bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+def init_json(app: Flask) -> None:
+    """Install :class:`FastJSONProvider` as the app's JSON provider."""
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,145 @@
+"""
+Prefix index behind search-box autocomplete.
+
+Each worker keeps one sorted list of ``(key, offset, kind, value, grant_id)``
+entries, where a key is a normalized grant name or funder, or the tail of
+one starting at any later word, so ``comm`` suggests "Regional Community
+Program" as well as "Community Arts". A lookup bisects to the prefix and
+reads a bounded run of entries, so it costs the same at any table size.
+
+The index is built on first use and kept current from the table's version
+(``api.watermark``), re-applying only grants written since its last sync,
+which also picks up other workers' writes.
+"""
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from models import db
+from models.grant import Grant
+from api.changes import REMOVED_STATUSES
+from api.watermark import EngineLocal, WatermarkIndex
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 25
+# Entries read per lookup before ranking; bounds the cost of short prefixes
+MAX_SCAN = 500
+
+GRANT, FUNDER = 'grant', 'funder'
+
+_WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+Entry = Tuple[str, int, str, str, int]
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase and reduce to single-space-separated words."""
+    return ' '.join(_WORD_RE.findall((text or '').lower()))
+
+def parse_suggest_limit(value: Optional[str]) -> int:
+    """Parse the ``limit`` query parameter for suggestions, clamped to the allowed range."""
+    if value is None or value == '':
+        return DEFAULT_SUGGESTIONS
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, MAX_SUGGESTIONS)
+
+def entries_for(kind: str, value: Optional[str], grant_id: int = 0) -> List[Entry]:
+    """Index entries for a value: its normalized form and every word-aligned tail."""
+    words = normalize(value).split()
+    return [(' '.join(words[i:]), i, kind, value, grant_id) for i in range(len(words))]
+
+class SuggestIndex(WatermarkIndex):
+    """In-process sorted prefix index over grant names and funders."""
+
+    columns = (Grant.id, Grant.name, Grant.funder, Grant.status)
+
+    def __init__(self):
+        super().__init__()
+        self._entries: List[Entry] = []
+        self._grants: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+        self._funders: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, entries: List[Entry]) -> None:
+        for entry in entries:
+            insort(self._entries, entry)
+
+    def _delete(self, entries: List[Entry]) -> None:
+        for entry in entries:
+            position = bisect_left(self._entries, entry)
+            if position < len(self._entries) and self._entries[position] == entry:
+                del self._entries[position]
+
+    def _apply(self, row) -> None:
+        """Move one grant's name and funder entries to their current values, or drop removed grants."""
+        grant_id, name, funder, status = row
+        current = None if status in REMOVED_STATUSES else (name, funder)
+        previous = self._grants.get(grant_id)
+        if previous == current:
+            return
+        if previous is not None:
+            old_name, old_funder = self._grants.pop(grant_id)
+            self._delete(entries_for(GRANT, old_name, grant_id))
+            self._funders[old_funder] -= 1
+            if not self._funders[old_funder]:
+                del self._funders[old_funder]
+                self._delete(entries_for(FUNDER, old_funder))
+        if current is None:
+            return
+        self._grants[grant_id] = current
+        self._insert(entries_for(GRANT, name, grant_id))
+        self._funders[funder] += 1
+        if self._funders[funder] == 1:
+            self._insert(entries_for(FUNDER, funder))
+
+    def _build(self) -> None:
+        """Load every grant at once, sorting the entries in one pass."""
+        entries: List[Entry] = []
+        for grant_id, name, funder, status in db.session.query(*self.columns):
+            if status in REMOVED_STATUSES:
+                continue
+            self._grants[grant_id] = (name, funder)
+            self._funders[funder] += 1
+            entries.extend(entries_for(GRANT, name, grant_id))
+        for funder in self._funders:
+            entries.extend(entries_for(FUNDER, funder))
+        entries.sort()
+        self._entries = entries
+
+    def lookup(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Names and funders with a word starting with ``prefix``.
+
+        Values that start with the prefix come first, then shorter values.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        start = bisect_left(self._entries, (prefix,))
+        found: Dict[Tuple[str, Any], Tuple[bool, str, str, int]] = {}
+        for key, offset, kind, value, grant_id in self._entries[start:start + MAX_SCAN]:
+            if not key.startswith(prefix):
+                break
+            identity = (kind, grant_id or value)
+            if identity not in found or not offset:
+                found[identity] = (offset > 0, kind, value, grant_id)
+        ranked = sorted(found.values(), key=lambda item: (item[0], len(item[2]), item[2], item[3]))
+        return [
+            {'type': kind, 'value': value, 'id': grant_id} if kind == GRANT else {'type': kind, 'value': value}
+            for _, kind, value, grant_id in ranked[:limit]
+        ]
+
+    def query(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        """Sync with the database, then look up suggestions."""
+        with self._lock:
+            self.sync()
+            return self.lookup(prefix, limit)
+
+# The suggestion index for the current app's database
+suggest_index = EngineLocal(SuggestIndex)
@@ -0,0 +1,110 @@
+"""
+Base for the in-process grant indexes (deadlines, suggestions, fuzzy
+matching, relevance).
+
+Each worker builds an index on first use and then keeps it current
+incrementally. Before answering, an index compares the table's version
+(:func:`grant_version`: the latest change-log sequence and the latest
+``updated_at``, both single index lookups) with the version it last synced
+at. If either moved, it re-applies only the grants written since its
+``updated_at`` watermark, which also picks up other workers' writes.
+
+The sequence is what catches a transaction that commits after a later one
+with an earlier ``updated_at``: it does not move ``max(updated_at)``, but
+its change-log entry is numbered after everything already visible (see
+``api.changes``). Rows are re-read from ``SYNC_LOOKBACK`` behind the
+watermark so such a grant is applied too.
+
+Within a request the version is read once and shared by every index the
+request consults.
+"""
+import threading
+import weakref
+from datetime import datetime, timedelta
+from typing import Any, Callable, Generic, Optional, Tuple, TypeVar
+from flask import has_request_context, request
+from models import db
+from models.grant import Grant
+from api.changes import collection_version
+
+# Re-read rows this far behind the watermark, for transactions that
+# committed after a later one with an earlier updated_at
+SYNC_LOOKBACK = timedelta(seconds=60)
+
+VERSION_ENVIRON_KEY = 'grants.version'
+
+Version = Tuple[int, Optional[datetime]]
+
+def grant_version() -> Version:
+    """The grants table's ``(seq, updated_at)`` version, read at most once per request."""
+    if not has_request_context():
+        return collection_version()
+    # Kept on the request rather than ``g``, which can outlive it
+    environ = request.environ
+    if VERSION_ENVIRON_KEY not in environ:
+        environ[VERSION_ENVIRON_KEY] = collection_version()
+    return environ[VERSION_ENVIRON_KEY]
+
+class WatermarkIndex:
+    """
+    An in-process index over grant rows, synced from :func:`grant_version`.
+
+    Subclasses list the ``columns`` they read and implement ``_apply`` for
+    one row of them; ``_build`` loads every row the same way unless
+    overridden. ``sync`` does not lock: callers hold ``self._lock`` around
+    it and any read that must see a consistent index.
+    """
+
+    columns: Tuple[Any, ...] = ()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[Version] = None
+        self._loaded = False
+
+    def _apply(self, row) -> None:
+        """Bring one grant's entries up to date with its current row."""
+        raise NotImplementedError
+
+    def _build(self) -> None:
+        """Load every grant on first use."""
+        for row in db.session.query(*self.columns):
+            self._apply(row)
+
+    def sync(self) -> None:
+        """Apply grants changed since the last sync (building on first use)."""
+        version = grant_version()
+        if self._loaded and version == self._version:
+            return
+        if not self._loaded:
+            self._build()
+        else:
+            query = db.session.query(*self.columns)
+            _, watermark = self._version
+            if watermark is not None:
+                query = query.filter(Grant.updated_at >= watermark - SYNC_LOOKBACK)
+            for row in query:
+                self._apply(row)
+        self._version = version
+        self._loaded = True
+
+T = TypeVar('T')
+
+class EngineLocal(Generic[T]):
+    """
+    One ``factory()`` instance per database engine, returned by calling it.
+
+    Apps (and tests) bound to different databases get separate instances.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instances: 'weakref.WeakKeyDictionary[Any, T]' = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        engine = db.engine
+        with self._lock:
+            if engine not in self._instances:
+                self._instances[engine] = self._factory()
+            return self._instances[engine]
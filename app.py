@@ -4,14 +4,19 @@ from api.config import config
 from api.auth import init_auth
 from api.routes.auth import auth_bp
 from api.grants_api import grants_bp
+from api.saved_searches_api import saved_searches_bp
+from api.duplicates_api import duplicates_bp
+from api.eligibility_api import eligibility_bp
 from api.openapi import register_openapi_docs
 from api.logging_config import setup_logging
 from api.middleware import (
     setup_security_headers,
+    setup_compression,
     setup_request_logging,
     setup_error_handling
 )
 from api.database import init_db
+from api.serialization import init_json
 import sentry_sdk
 from sentry_sdk.integrations.flask import FlaskIntegration
 import os
@@ -38,16 +43,21 @@ def create_app(config_name='default'):
     })
 
     # Initialize components
+    init_json(app)
     init_db(app)
     init_auth(app)
     setup_logging(app)
     setup_security_headers(app)
+    setup_compression(app)
     setup_request_logging(app)
     setup_error_handling(app)
 
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(grants_bp)
+    app.register_blueprint(saved_searches_bp)
+    app.register_blueprint(duplicates_bp)
+    app.register_blueprint(eligibility_bp)
 
     # Register OpenAPI documentation
     register_openapi_docs(app)
@@ -0,0 +1,5 @@
+import os
+from app import create_app
+from api.asgi import ASGIApp, DEFAULT_THREADS
+
+app = ASGIApp(create_app('production'), threads=int(os.getenv('ASGI_THREADS', DEFAULT_THREADS)))
@@ -0,0 +1,3 @@
+"""
+Performance benchmarks. Run each module directly, e.g. ``python -m benchmarks.bench_search``.
+"""
@@ -0,0 +1,88 @@
+"""
+Concurrent draft throughput: sync WSGI workers against the ASGI adapter.
+
+    python -m benchmarks.bench_asgi [concurrency...]
+
+Defaults to 50 and 200 simultaneous ``generate-draft`` requests. The LLM is
+the local mock in ``benchmarks.mock_llm``, answering after ``LLM_LATENCY``
+seconds, so only the serving model differs between runs:
+
+* ``wsgi`` is ``gunicorn wsgi:app --workers 4``: four sync workers, each
+  running the async view on a new event loop per request;
+* ``asgi`` is one worker serving ``api.asgi.ASGIApp`` from a single loop.
+
+Drafts in flight per worker are capped by the adapter's request pool
+(``DEFAULT_THREADS``) and by ``LLM_MAX_IN_FLIGHT``. The draft's database stage
+reads fixed rows, so each request costs one LLM call.
+"""
+import asyncio
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from api import grants_api
+from api.asgi import ASGIApp
+from benchmarks.common import make_app
+from benchmarks.mock_llm import FixedRows, start_mock_llm
+
+LLM_LATENCY = 0.2
+WSGI_WORKERS = 4
+
+BODY = json.dumps({'application_question': 'Describe the community need your project addresses.'}).encode()
+
+def run_wsgi(app, concurrency: int) -> float:
+    def post(_):
+        response = app.test_client().post('/api/grants/1/generate-draft', data=BODY, content_type='application/json')
+        assert response.status_code == 200, response.get_data()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(WSGI_WORKERS) as workers:
+        list(workers.map(post, range(concurrency)))
+    return time.perf_counter() - start
+
+async def asgi_post(asgi_app) -> None:
+    scope = {
+        'type': 'http', 'method': 'POST', 'path': '/api/grants/1/generate-draft', 'query_string': b'',
+        'headers': [(b'content-type', b'application/json')], 'http_version': '1.1'
+    }
+    messages = [{'type': 'http.request', 'body': BODY, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    assert sent[0]['status'] == 200, sent
+
+def run_asgi(app, concurrency: int) -> float:
+    asgi_app = ASGIApp(app)
+
+    async def burst():
+        await asgi_post(asgi_app)  # warm up the pool and connections
+        start = time.perf_counter()
+        await asyncio.gather(*(asgi_post(asgi_app) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    return asyncio.run(burst())
+
+def main() -> None:
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    start_mock_llm(LLM_LATENCY)
+    grants_api.get_db_session = FixedRows
+    app = make_app()
+    app.register_blueprint(grants_api.grants_bp)
+
+    print(f'LLM latency {LLM_LATENCY * 1000:.0f}ms')
+    for concurrency in [int(arg) for arg in sys.argv[1:]] or [50, 200]:
+        results = []
+        for name, fn in (('wsgi', run_wsgi), ('asgi', run_asgi)):
+            seconds = fn(app, concurrency)
+            results.append(f'{name} {seconds:7.2f}s {concurrency / seconds:8.1f} drafts/s')
+        print(f'{concurrency:>5} concurrent drafts  ' + '  |  '.join(results))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Time the deadline calendar against an equivalent SQL range query.
+
+    python -m benchmarks.bench_deadlines [sizes...]
+
+Defaults to 100k rows. ``index`` is a warm DeadlineIndex query (watermark
+check plus bucket slicing); ``sql`` fetches the same rows by due-date range.
+"""
+import sys
+from datetime import datetime, timedelta
+from models import db
+from models.grant import Grant
+from api.deadlines import deadline_index
+from benchmarks.common import make_app, seed_grants, timeit
+
+HORIZONS = [2, 4, 8]
+
+def run(size: int) -> None:
+    app = make_app()
+    with app.app_context():
+        seed_grants(size)
+        # Synthetic due dates span 2025-2026; measure from the middle
+        start = datetime(2025, 6, 2)
+        index = deadline_index()
+        index.query(start, 1)
+
+        for weeks in HORIZONS:
+            end = start + timedelta(weeks=weeks)
+            sql = (
+                db.session.query(Grant.id, Grant.name, Grant.funder, Grant.due_date, Grant.status, Grant.amount_string)
+                .filter(Grant.due_date >= start, Grant.due_date < end)
+                .order_by(Grant.due_date, Grant.id)
+            )
+            total = index.query(start, weeks)['total']
+            results = {
+                'index': timeit(lambda: index.query(start, weeks)),
+                'sql': timeit(lambda: sql.all())
+            }
+            timings = '  '.join(f'{name} {ms:8.3f}ms' for name, ms in results.items())
+            print(f'{size:>9,} rows  {weeks} weeks ({total:>5} due)  {timings}')
+        db.session.remove()
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    for size in sizes:
+        run(size)
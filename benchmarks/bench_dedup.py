@@ -0,0 +1,70 @@
+"""
+Measure MinHash/LSH duplicate detection throughput and recall.
+
+    python -m benchmarks.bench_dedup [sizes...]
+
+Defaults to 20k rows. Signs the seeded corpus with ``backfill_signatures``,
+then inserts a batch of near-duplicates (reworded title, new URL, a few
+description words changed) plus as many unrelated grants and times
+``detect_duplicates`` on it, reporting how many planted pairs were found
+and how many other pairs were flagged.
+"""
+import random
+import sys
+import time
+from models import db
+from models.grant import Grant
+from models.duplicate import DuplicateCandidate
+from api.dedup import backfill_signatures, detect_duplicates
+from benchmarks.common import FILLER, make_app, seed_grants, synthetic_grant
+
+BATCH = 500
+
+def near_duplicate(rng: random.Random, row, i: int):
+    words = row.description.split()
+    for position in rng.sample(range(len(words)), 4):
+        words[position] = rng.choice(FILLER)
+    return {
+        'name': row.name.replace(' Grant ', ' Grants Program ') if rng.random() < 0.5 else row.name.upper(),
+        'funder': row.funder,
+        'source_url': f'https://mirror.example.org/opportunity/{i}',
+        'due_date': row.due_date,
+        'amount_string': row.amount_string,
+        'description': ' '.join(words),
+        'status': 'potential'
+    }
+
+def run(size: int) -> None:
+    app = make_app()
+    with app.app_context():
+        seed_grants(size)
+        start = time.perf_counter()
+        backfill_signatures()
+        elapsed = time.perf_counter() - start
+        print(f'{size:>9,} rows  backfill {elapsed:7.2f}s  ({size / elapsed:,.0f} grants/s)')
+        db.session.query(DuplicateCandidate).delete()
+        db.session.commit()
+
+        rng = random.Random(1)
+        originals = db.session.query(Grant).filter(Grant.id.in_(rng.sample(range(1, size + 1), BATCH))).all()
+        rows = [near_duplicate(rng, row, i) for i, row in enumerate(originals)]
+        rows += [dict(synthetic_grant(rng, size + i), source_url=f'https://new.example.org/{i}') for i in range(BATCH)]
+        ids = db.session.execute(
+            Grant.__table__.insert().returning(Grant.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        db.session.commit()
+        planted = {(original.id, new_id) for original, new_id in zip(originals, ids)}
+
+        start = time.perf_counter()
+        detect_duplicates(ids)
+        elapsed = time.perf_counter() - start
+        found = {(c.grant_id, c.duplicate_id) for c in DuplicateCandidate.query}
+        print(f'{size:>9,} rows  batch of {len(ids)}  {elapsed * 1000:8.1f}ms  '
+              f'({elapsed * 1e6 / len(ids):6.0f}us/grant)  '
+              f'recall {len(found & planted)}/{len(planted)}  other pairs {len(found - planted)}')
+        db.session.remove()
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20_000]
+    for size in sizes:
+        run(size)
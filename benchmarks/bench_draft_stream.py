@@ -0,0 +1,80 @@
+"""
+Time to first byte of a draft, buffered against streamed (``stream=true``).
+
+    python -m benchmarks.bench_draft_stream [concurrency...]
+
+Defaults to 1 and 50 simultaneous drafts, served by one ``ASGIApp``
+worker. The LLM is the local mock in ``benchmarks.mock_llm``: it starts
+answering after ``LLM_LATENCY`` seconds, then writes its 400 tokens one
+every ``TOKEN_DELAY`` seconds, about as fast as a large model writes.
+Reports the median time until the client receives its first body byte,
+and until the response is complete.
+"""
+import asyncio
+import json
+import logging
+import sys
+import time
+from statistics import median
+from api import grants_api
+from api.asgi import ASGIApp
+from benchmarks.common import make_app
+from benchmarks.mock_llm import OUTPUT_TOKENS, FixedRows, start_mock_llm
+
+LLM_LATENCY = 0.5
+TOKEN_DELAY = 0.01
+
+BODY = json.dumps({'application_question': 'Describe the community need your project addresses.'}).encode()
+
+async def draft(asgi_app, stream: bool):
+    """POST one draft; returns (seconds to first body byte, seconds to the end)."""
+    scope = {
+        'type': 'http', 'method': 'POST', 'path': '/api/grants/1/generate-draft',
+        'query_string': b'stream=true' if stream else b'',
+        'headers': [(b'content-type', b'application/json')], 'http_version': '1.1'
+    }
+    messages = [{'type': 'http.request', 'body': BODY, 'more_body': False}]
+    start = time.perf_counter()
+    first = None
+    status = None
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        nonlocal first, status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message.get('body') and first is None:
+            first = time.perf_counter() - start
+
+    await asgi_app(scope, receive, send)
+    assert status == 200, status
+    return first, time.perf_counter() - start
+
+def run(app, concurrency: int, stream: bool):
+    asgi_app = ASGIApp(app)
+
+    async def burst():
+        await draft(asgi_app, stream)  # warm up the pool and connections
+        return await asyncio.gather(*(draft(asgi_app, stream) for _ in range(concurrency)))
+
+    results = asyncio.run(burst())
+    return median(first for first, _ in results), median(total for _, total in results)
+
+def main() -> None:
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    start_mock_llm(LLM_LATENCY, TOKEN_DELAY)
+    grants_api.get_db_session = FixedRows
+    app = make_app()
+    app.register_blueprint(grants_api.grants_bp)
+
+    print(f'LLM latency {LLM_LATENCY * 1000:.0f}ms, then {OUTPUT_TOKENS} tokens at {TOKEN_DELAY * 1000:.0f}ms each')
+    for concurrency in [int(arg) for arg in sys.argv[1:]] or [1, 50]:
+        for name, stream in (('buffered', False), ('streamed', True)):
+            first, total = run(app, concurrency, stream)
+            print(f'{concurrency:>5} concurrent  {name:<9} first byte {first * 1000:8.0f}ms  '
+                  f'complete {total * 1000:8.0f}ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Time a batch eligibility scan at different concurrency limits.
+
+    python -m benchmarks.bench_eligibility_scan [grants]
+
+Defaults to 100 grants. Each analysis is one call to the local mock LLM
+(``benchmarks.mock_llm``), answering after ``LLM_LATENCY`` seconds; results
+are written to a SQLite database as they finish. Concurrency 1 is the
+previous one-request-per-grant script. Every run scans fresh grants, then
+the last run is repeated unchanged, where every result comes from the
+content-addressed cache.
+"""
+import logging
+import sys
+import time
+from models import db
+from models.eligibility import EligibilityScan
+from models.organisation import OrganisationProfile
+from api.eligibility_scans import start_scan
+from benchmarks.common import make_app, seed_grants
+from benchmarks.mock_llm import start_mock_llm
+
+LLM_LATENCY = 0.2
+CONCURRENCY = [1, 8, 32]
+
+def run_scan(app, grant_ids, concurrency: int) -> float:
+    start = time.perf_counter()
+    scan_id = start_scan(app, 1, grant_ids, concurrency).id
+    while True:
+        db.session.expire_all()
+        scan = db.session.get(EligibilityScan, scan_id)
+        if scan.status == 'completed':
+            assert scan.completed == len(grant_ids), scan.to_dict()
+            return time.perf_counter() - start
+        time.sleep(0.01)
+
+def main() -> None:
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    start_mock_llm(LLM_LATENCY)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    app = make_app()
+    with app.app_context():
+        seed_grants(size * len(CONCURRENCY))
+        db.session.add(OrganisationProfile(id=1, name='Outback Arts Collective'))
+        db.session.commit()
+
+        print(f'LLM latency {LLM_LATENCY * 1000:.0f}ms, {size} grants')
+        for run, concurrency in enumerate(CONCURRENCY):
+            grant_ids = list(range(run * size + 1, (run + 1) * size + 1))
+            seconds = run_scan(app, grant_ids, concurrency)
+            print(f'  concurrency {concurrency:>3}  {seconds:7.2f}s  {size / seconds:7.1f} grants/s')
+        seconds = run_scan(app, grant_ids, concurrency)
+        print(f'  repeated      {seconds:7.2f}s  {size / seconds:7.1f} grants/s')
+
+if __name__ == '__main__':
+    main()
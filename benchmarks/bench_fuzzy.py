@@ -0,0 +1,48 @@
+"""
+Time typo-tolerant name search and funder matching.
+
+    python -m benchmarks.bench_fuzzy [sizes...]
+
+Defaults to 100k rows. Reports the one-off index build, then the median
+time for a first page of fuzzy name results and for a fuzzy funder lookup.
+"""
+import sys
+import time
+from models import db
+from api.fuzzy import fuzzy_candidates, fuzzy_index, match_funders, paginate_matches, rank_candidates
+from api.pagination import DEFAULT_PAGE_SIZE
+from api.search_index import create_search_index
+from models.grant import Grant
+from benchmarks.common import make_app, seed_grants, timeit
+
+NAME_QUERIES = ['heritge', 'rurl watr', 'indigenus yuth']
+FUNDER_QUERIES = ['Lotterywst', 'Departmnt of Helth', 'Ian Poter Foundation']
+
+def run(size: int) -> None:
+    app = make_app()
+    with app.app_context():
+        seed_grants(size)
+        with db.engine.begin() as conn:
+            create_search_index(conn)
+
+        start = time.perf_counter()
+        fuzzy_index()
+        print(f'{size:>9,} rows  index build {(time.perf_counter() - start) * 1000:8.2f}ms')
+
+        for keyword in NAME_QUERIES:
+            def first_page():
+                matches = rank_candidates(keyword, fuzzy_candidates(keyword))
+                page, _ = paginate_matches(matches, None, DEFAULT_PAGE_SIZE)
+                return Grant.query.filter(Grant.id.in_([grant_id for grant_id, _ in page])).all(), page
+            rows, page = first_page()
+            print(f'{size:>9,} rows  name {keyword!r:<22} {timeit(first_page):8.2f}ms  '
+                  f'top: {db.session.get(Grant, page[0][0]).name if page else None}')
+        for funder in FUNDER_QUERIES:
+            print(f'{size:>9,} rows  funder {funder!r:<20} {timeit(lambda: match_funders(funder)):8.3f}ms  '
+                  f'matches: {match_funders(funder)[:2]}')
+        db.session.remove()
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,80 @@
+"""
+Compare JSON backends on the payloads the grants API produces.
+
+    python -m benchmarks.bench_json
+
+Times encoding a listing page (50 and 500 grants), a single grant, a
+10k-row NDJSON export and a response-cache entry round-trip. ``flask`` is
+the previous path: isoformat in ``to_dict`` plus Flask's default provider.
+"""
+import random
+from datetime import datetime
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from models.grant import Grant
+from api.export import iter_ndjson
+from api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, page_response
+from api import serialization
+from api.serialization import available_backends
+from benchmarks.common import synthetic_grant, timeit
+
+ANALYSIS = {
+    'score': 72,
+    'summary': 'Strong alignment with community arts and regional programs.',
+    'alignment_points': ['Regional focus', 'Youth participation', 'Arts delivery'],
+    'disqualifiers': [],
+    'missing_info': ['Audited financials']
+}
+
+def make_grants(n: int):
+    rng = random.Random(0)
+    grants = []
+    for i in range(n):
+        row = synthetic_grant(rng, i)
+        grants.append(Grant(id=i + 1, eligibility_analysis=ANALYSIS, last_scraped_at=datetime(2025, 1, 1), **row))
+    return grants
+
+def legacy_dict(grant: Grant) -> dict:
+    data = grant.to_dict()
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in data.items()}
+
+def main() -> None:
+    flask_json = DefaultJSONProvider(Flask('bench'))
+    backends = available_backends()
+    grants = make_grants(10_000)
+    cache_entry = {'body': flask_json.dumps(page_response([legacy_dict(g) for g in grants[:50]], 'x')), 'etag': 'e'}
+
+    cases = {
+        f'page {DEFAULT_PAGE_SIZE}': grants[:DEFAULT_PAGE_SIZE],
+        f'page {MAX_PAGE_SIZE}': grants[:MAX_PAGE_SIZE],
+        'single grant': grants[:1]
+    }
+    for name, rows in cases.items():
+        timings = {
+            'flask': timeit(lambda: flask_json.dumps(page_response([legacy_dict(g) for g in rows], 'x')).encode())
+        }
+        for backend in backends.values():
+            timings[backend.name] = timeit(
+                lambda: backend.dumps_bytes(page_response([g.to_dict() for g in rows], 'x'))
+            )
+        report(name, timings)
+
+    # Exports go through the module-level backend, so swap it for each run
+    timings, selected = {}, serialization.backend
+    for backend in backends.values():
+        serialization.backend = backend
+        timings[backend.name] = timeit(lambda: b''.join(iter_ndjson(g.to_dict() for g in grants)), repeat=3)
+    serialization.backend = selected
+    report('export 10k ndjson', timings)
+
+    timings = {
+        backend.name: timeit(lambda: backend.loads(backend.dumps(cache_entry)))
+        for backend in backends.values()
+    }
+    report('cache round-trip', timings)
+
+def report(name: str, timings: dict) -> None:
+    print(f'{name:<20} ' + '  '.join(f'{key} {ms:8.3f}ms' for key, ms in timings.items()))
+
+if __name__ == '__main__':
+    main()
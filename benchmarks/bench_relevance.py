@@ -0,0 +1,108 @@
+"""
+How much LLM work the local relevance pre-filter saves, on a labelled sample.
+
+    python -m benchmarks.bench_relevance [sizes...]
+
+Defaults to 10k grants. Each synthetic grant is written about one topic;
+grants on the arts and heritage topics are labelled relevant to an arts
+organisation, the rest not. Heritage grants share few words with the
+organisation's profile, so recall below 1 shows what a threshold costs.
+Every grant also carries common words ("community", "regional",
+"program") and filler, as real listings do.
+
+For each ``min_relevance`` the report gives the share of grants a scan
+would skip, the LLM time that saves at ``LLM_SECONDS`` per analysis, and
+the recall and precision of the grants still analysed. It then times
+scoring every grant with and without NumPy.
+"""
+import random
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from models import db
+from models.grant import Grant
+from api import relevance
+from api.relevance import RelevanceIndex, profile_terms
+from benchmarks.common import FILLER, make_app, timeit
+
+LLM_SECONDS = 10
+THRESHOLDS = [0.0, 0.05, 0.1, 0.2, 0.3]
+
+TOPICS = {
+    'arts': 'arts music theatre creative artists performance youth culture',
+    'heritage': 'heritage museum history archives collections culture',
+    'health': 'health hospital clinical mental patients wellbeing',
+    'water': 'water catchment rivers irrigation drought',
+    'sport': 'sport clubs athletes equipment facilities',
+    'housing': 'housing homelessness tenancy shelter accommodation',
+    'agriculture': 'agriculture farmers crops livestock soil',
+    'research': 'research science laboratory innovation university',
+    'seniors': 'seniors ageing aged care older',
+    'tourism': 'tourism visitors events destination marketing'
+}
+RELEVANT = {'arts', 'heritage'}
+COMMON = 'community regional program funding projects local support'.split()
+
+PROFILE = SimpleNamespace(
+    mission='Arts and music programs that build creative confidence in young people',
+    focus_areas=['arts', 'music', 'theatre', 'culture'],
+    target_demographics='Youth in regional and remote communities'
+)
+
+def labelled_grant(rng: random.Random, i: int):
+    """One synthetic grant about a single topic, with its label."""
+    topic = rng.choice(list(TOPICS))
+    words = TOPICS[topic].split()
+    return topic in RELEVANT, {
+        'name': f"{' '.join(rng.sample(words, 2)).title()} Grant {i}",
+        'funder': 'Lotterywest',
+        'description': ' '.join(rng.sample(words, 3) + rng.sample(COMMON, 3) + rng.choices(FILLER, k=40)),
+        'status': 'potential',
+        'created_at': datetime(2024, 1, 1),
+        'updated_at': datetime(2024, 1, 1)
+    }
+
+def run(size: int) -> None:
+    app = make_app()
+    rng = random.Random(0)
+    labels = {}
+    with app.app_context():
+        for start in range(0, size, 10000):
+            sample = [labelled_grant(rng, i) for i in range(start, min(size, start + 10000))]
+            db.session.execute(Grant.__table__.insert(), [row for _, row in sample])
+            # A fresh table numbers rows from 1 in insertion order
+            labels.update((grant_id, label) for grant_id, (label, _) in enumerate(sample, start + 1))
+        db.session.commit()
+
+        index = RelevanceIndex()
+        start = time.perf_counter()
+        index.sync()
+        print(f'{size:>9,} grants  index build {(time.perf_counter() - start) * 1000:8.1f}ms  '
+              f'{sum(labels.values()):,} labelled relevant')
+
+        terms = profile_terms(PROFILE)
+        scores = index.relevance(terms, labels)
+        relevant = sum(labels.values())
+        for threshold in THRESHOLDS:
+            kept = [grant_id for grant_id, score in scores.items() if score >= threshold]
+            hits = sum(labels[grant_id] for grant_id in kept)
+            skipped = size - len(kept)
+            print(f'  min_relevance {threshold:<4}  skips {skipped / size:6.1%}  '
+                  f'saves {skipped * LLM_SECONDS / 3600:7.1f} LLM-hours  '
+                  f'recall {hits / relevant:6.1%}  precision {hits / max(len(kept), 1):6.1%}')
+
+        vectorized = timeit(lambda: index.score(terms))
+        backend = relevance.numpy
+        relevance.numpy = None
+        try:
+            python = timeit(lambda: index.score(terms))
+        finally:
+            relevance.numpy = backend
+        print(f'  score all grants  numpy {vectorized:8.2f}ms  python {python:8.2f}ms')
+        db.session.remove()
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000]
+    for size in sizes:
+        run(size)
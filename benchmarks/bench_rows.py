@@ -0,0 +1,75 @@
+"""
+Compare ORM hydration with the plain-row path for listings and exports.
+
+    python -m benchmarks.bench_rows [sizes...]
+
+Defaults to 50k rows. ``orm`` is the previous path (``Grant`` instances,
+``to_dict`` per row); ``rows`` selects column tuples through
+``api.rows.RowEncoder``. Both encode with the active JSON backend. Reports
+median time, rows/s and tracemalloc peak for a 500-row listing page (all
+fields and a sparse fieldset) and for a full NDJSON export.
+"""
+import sys
+import tracemalloc
+from typing import Callable
+from sqlalchemy.orm import load_only
+from models import db
+from models.grant import Grant
+from api import serialization
+from api.export import EXPORT_BATCH_SIZE, iter_ndjson
+from api.pagination import MAX_PAGE_SIZE, page_response, paginate
+from api.rows import row_encoder
+from benchmarks.common import make_app, seed_grants, timeit
+
+SPARSE = ['id', 'name', 'funder', 'due_date']
+
+def orm_page(fields=None):
+    query = Grant.query
+    if fields:
+        query = query.options(load_only(*(getattr(Grant, f) for f in fields)))
+    rows, cursor = paginate(query, Grant, None, MAX_PAGE_SIZE)
+    return serialization.dumps_bytes(page_response([g.to_dict(fields) for g in rows], cursor))
+
+def row_page(fields=None):
+    encoder = row_encoder(fields, ['id', 'due_date'])
+    rows, cursor = paginate(encoder.query(), Grant, None, MAX_PAGE_SIZE)
+    return serialization.dumps_bytes(page_response(encoder.encode_all(rows), cursor))
+
+def orm_export():
+    query = Grant.query.order_by(Grant.id).yield_per(EXPORT_BATCH_SIZE)
+    return sum(len(chunk) for chunk in iter_ndjson(g.to_dict() for g in query))
+
+def row_export():
+    encoder = row_encoder()
+    query = encoder.query().order_by(Grant.id).yield_per(EXPORT_BATCH_SIZE)
+    return sum(len(chunk) for chunk in iter_ndjson(encoder.encode(row) for row in query))
+
+def peak_kib(fn: Callable[[], object]) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+def run(size: int) -> None:
+    app = make_app()
+    with app.app_context():
+        seed_grants(size)
+        cases = [
+            ('page 500', MAX_PAGE_SIZE, orm_page, row_page),
+            ('page 500 sparse', MAX_PAGE_SIZE, lambda: orm_page(SPARSE), lambda: row_page(SPARSE)),
+            ('export', size, orm_export, row_export)
+        ]
+        for label, rows, orm, fast in cases:
+            results = []
+            for name, fn in (('orm', orm), ('rows', fast)):
+                ms = timeit(fn, repeat=3 if label == 'export' else 7)
+                results.append(f'{name} {ms:9.2f}ms {rows / ms * 1000:>10,.0f} rows/s {peak_kib(fn):>9,.0f} KiB')
+            print(f'{size:>9,} rows  {label:<16} ' + '  |  '.join(results))
+        db.session.remove()
+
+if __name__ == '__main__':
+    print(f'JSON backend: {serialization.backend.name}')
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,42 @@
+"""
+Compare the ilike fallback with the full-text index for keyword search.
+
+    python -m benchmarks.bench_search [sizes...]
+
+Defaults to 10k, 100k and 1M rows. Reports the median time to fetch the
+first page (50 rows) and to count all matches for a few keywords.
+"""
+import sys
+from models import db
+from models.grant import Grant
+from api.grants_api import keyword_filter
+from api.pagination import DEFAULT_PAGE_SIZE, paginate
+from api.search_index import create_search_index, paginate_ranked, ranked_search
+from benchmarks.common import make_app, seed_grants, timeit
+
+KEYWORDS = ['heritage', 'rural water', 'lotterywest']
+
+def run(size: int) -> None:
+    app = make_app()
+    with app.app_context():
+        seed_grants(size)
+        with db.engine.begin() as conn:
+            create_search_index(conn)
+
+        for keyword in KEYWORDS:
+            ilike = Grant.query.filter(keyword_filter(keyword))
+            query, rank = ranked_search(keyword)
+            results = {
+                'ilike page': timeit(lambda: paginate(ilike, Grant, None, DEFAULT_PAGE_SIZE)),
+                'fts page': timeit(lambda: paginate_ranked(query, rank, None, DEFAULT_PAGE_SIZE)),
+                'ilike count': timeit(lambda: ilike.order_by(None).count()),
+                'fts count': timeit(lambda: query.order_by(None).count())
+            }
+            timings = '  '.join(f'{name} {ms:8.2f}ms' for name, ms in results.items())
+            print(f'{size:>9,} rows  {keyword!r:<14} {timings}')
+        db.session.remove()
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        run(size)
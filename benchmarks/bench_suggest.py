@@ -0,0 +1,49 @@
+"""
+Time prefix autocomplete against the ``ilike`` scan it replaces.
+
+    python -m benchmarks.bench_suggest [sizes...]
+
+Defaults to 100k rows. Reports the one-off index build, then median times
+for a warm SuggestIndex query (watermark check plus bisect) and for a
+name/funder ``ilike '%prefix%'`` query for the same number of rows,
+ordered by name.
+"""
+import sys
+import time
+from models import db
+from models.grant import Grant
+from api.suggest import DEFAULT_SUGGESTIONS, suggest_index
+from benchmarks.common import make_app, seed_grants, timeit
+
+PREFIXES = ['c', 'comm', 'rural wa', 'department of h', 'zzz']
+
+def run(size: int) -> None:
+    app = make_app()
+    with app.app_context():
+        seed_grants(size)
+
+        index = suggest_index()
+        start = time.perf_counter()
+        index.sync()
+        print(f'{size:>9,} rows  index build {(time.perf_counter() - start) * 1000:8.2f}ms  ({len(index):,} entries)')
+
+        for prefix in PREFIXES:
+            pattern = f'%{prefix}%'
+            sql = (
+                db.session.query(Grant.id, Grant.name, Grant.funder)
+                .filter(Grant.name.ilike(pattern) | Grant.funder.ilike(pattern))
+                .order_by(Grant.name)
+                .limit(DEFAULT_SUGGESTIONS)
+            )
+            results = {
+                'index': timeit(lambda: index.query(prefix, DEFAULT_SUGGESTIONS)),
+                'ilike': timeit(lambda: sql.all())
+            }
+            timings = '  '.join(f'{name} {ms:8.3f}ms' for name, ms in results.items())
+            print(f'{size:>9,} rows  {prefix!r:<18} {timings}')
+        db.session.remove()
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    for size in sizes:
+        run(size)
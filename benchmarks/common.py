@@ -0,0 +1,83 @@
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Callable, Dict, List
+from flask import Flask
+from models import db, init_db
+from api.serialization import init_json
+from models.grant import Grant
+
+WORDS = (
+    'community arts health education youth regional rural indigenous climate '
+    'environment research innovation housing sport heritage disability women '
+    'seniors families digital infrastructure water energy tourism agriculture '
+    'wellbeing training employment culture music literacy science'
+).split()
+
+FUNDERS = [
+    'Australia Council for the Arts',
+    'Department of Health',
+    'Department of Education',
+    'Regional Development Australia',
+    'Foundation for Rural and Regional Renewal',
+    'Ian Potter Foundation',
+    'Lotterywest',
+    'City of Melbourne'
+]
+
+STATUSES = ['potential', 'active', 'closed', 'applied']
+
+# Filler vocabulary so topic words stay selective, as in real descriptions
+FILLER = [f'term{i}' for i in range(5000)]
+
+def make_app(db_path: str = None) -> Flask:
+    """Create a bare app bound to a throwaway SQLite file."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='grants-bench-'), 'bench.db')
+    app = Flask('benchmarks')
+    app.config.update(
+        SECRET_KEY='bench',
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{db_path}',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False
+    )
+    init_json(app)
+    init_db(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+def synthetic_grant(rng: random.Random, i: int) -> Dict:
+    """Build one synthetic grant row."""
+    title_words = rng.sample(WORDS, 3)
+    return {
+        'name': f"{' '.join(title_words).title()} Grant {i}",
+        'funder': rng.choice(FUNDERS),
+        'source_url': f'https://example.org/grants/{i}',
+        'due_date': datetime(2025, 1, 1) + timedelta(days=rng.randrange(730)),
+        'amount_string': f'${rng.randrange(1, 200) * 1000:,}',
+        'description': ' '.join(rng.sample(WORDS, 3) + rng.choices(FILLER, k=57)),
+        'status': rng.choice(STATUSES),
+        'created_at': datetime(2024, 1, 1),
+        'updated_at': datetime(2024, 1, 1)
+    }
+
+def seed_grants(n: int, seed: int = 0, batch_size: int = 10000) -> None:
+    """Insert ``n`` synthetic grants with executemany batches (app context required)."""
+    rng = random.Random(seed)
+    for start in range(0, n, batch_size):
+        rows = [synthetic_grant(rng, i) for i in range(start, min(n, start + batch_size))]
+        db.session.execute(Grant.__table__.insert(), rows)
+    db.session.commit()
+
+def timeit(fn: Callable[[], object], repeat: int = 7) -> float:
+    """Median wall time of ``fn`` in milliseconds."""
+    fn()  # warm up
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
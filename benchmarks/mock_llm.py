@@ -0,0 +1,128 @@
+"""
+A local stand-in for the LLM provider, for benchmarks of the AI endpoints.
+
+``start_mock_llm`` serves the Messages API on a free local port, answering
+every request after ``latency`` seconds, and points the SDK at it through
+``ANTHROPIC_BASE_URL``. With ``token_delay``, answers are also written
+``OUTPUT_TOKENS`` tokens at that pace: streamed requests get each token
+as it is written, others the whole message at the end. ``FixedRows`` replaces ``get_db_session()`` with one
+grant and one profile, so the endpoints run without a database.
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+# Valid as a draft and as an eligibility analysis
+ANALYSIS = {
+    'score': 0.8,
+    'alignment_points': ['Youth arts focus matches the program'],
+    'disqualifiers': ['None identified'],
+    'missing_info': ['Project budget'],
+    'criteria': [{'name': 'Location', 'met': True, 'description': 'Regional town'}]
+}
+
+OUTPUT_TOKENS = 400
+
+def message_body(text: str) -> bytes:
+    return json.dumps({
+        'id': 'msg_bench', 'type': 'message', 'role': 'assistant', 'model': 'claude-3-opus-20240229',
+        'content': [{'type': 'text', 'text': text}],
+        'stop_reason': 'end_turn', 'stop_sequence': None,
+        'usage': {'input_tokens': 900, 'output_tokens': 400}
+    }).encode()
+
+def stream_events(tokens: int):
+    """The Messages API's server-sent events for a reply of ``tokens`` tokens, in order."""
+    def event(name, data):
+        return f'event: {name}\ndata: {json.dumps(dict(data, type=name))}\n\n'.encode()
+
+    message = json.loads(message_body(''))
+    message.update(content=[], stop_reason=None, usage={'input_tokens': 900, 'output_tokens': 1})
+    yield event('message_start', {'message': message})
+    yield event('content_block_start', {'index': 0, 'content_block': {'type': 'text', 'text': ''}})
+    for i in range(tokens):
+        yield event('content_block_delta', {'index': 0, 'delta': {'type': 'text_delta', 'text': f'word{i} '}})
+    yield event('content_block_stop', {'index': 0})
+    yield event('message_delta', {'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                                  'usage': {'output_tokens': tokens}})
+    yield event('message_stop', {})
+
+def start_mock_llm(latency: float, token_delay: float = 0.0) -> str:
+    """Serve the mock Messages API and point the SDK at it; returns its URL."""
+    body = message_body(json.dumps(ANALYSIS))
+
+    class MockLLM(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            params = json.loads(self.rfile.read(int(self.headers.get('content-length', 0))))
+            time.sleep(latency)
+            if params.get('stream'):
+                self.send_response(200)
+                self.send_header('content-type', 'text/event-stream')
+                self.send_header('transfer-encoding', 'chunked')
+                self.end_headers()
+                for i, chunk in enumerate(stream_events(OUTPUT_TOKENS)):
+                    if i > 2:
+                        time.sleep(token_delay)
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                    self.wfile.flush()
+                self.wfile.write(b'0\r\n\r\n')
+                return
+            time.sleep(token_delay * OUTPUT_TOKENS)
+            self.send_response(200)
+            self.send_header('content-type', 'application/json')
+            self.send_header('content-length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockLLM)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    os.environ.update(ANTHROPIC_API_KEY='bench', ANTHROPIC_BASE_URL=url)
+    return url
+
+GRANT = SimpleNamespace(
+    id=1, org_id=1, name='Regional Arts Fund', funder='Creative Australia', amount_string='Up to $20,000',
+    due_date=None, description='Funding for arts and cultural programs in regional towns'
+)
+PROFILE = SimpleNamespace(
+    id=1, name='Outback Arts Collective', mission='Creative opportunities for young people in remote towns',
+    focus_areas=['Arts', 'Youth'], target_demographics='Young people aged 12-25', annual_revenue=400000,
+    dgr_status=True, profile_text='Twelve years of workshops and festivals; Lotterywest 2023 grantee'
+)
+
+class FixedRows:
+    """
+    Stands in for ``get_db_session()`` without I/O: the profile above, and
+    the grant above named after the requested id (so results are cached per id).
+    """
+
+    def query(self, model):
+        self._model = model.__name__
+        self._id = None
+        return self
+
+    def filter(self, *criteria):
+        # Grant.id == <value>
+        self._id = getattr(getattr(criteria[0], 'right', None), 'value', None)
+        return self
+
+    def first(self):
+        if self._model == 'OrganisationProfile':
+            return PROFILE
+        return SimpleNamespace(**dict(vars(GRANT), id=self._id, name=f'{GRANT.name} {self._id}'))
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
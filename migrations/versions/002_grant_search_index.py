@@ -0,0 +1,22 @@
+"""Add full-text search index for grants
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+from api.search_index import create_search_index, drop_search_index
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # FTS5 table and sync triggers on SQLite, tsvector column and GIN index on PostgreSQL
+    create_search_index(op.get_bind())
+
+def downgrade():
+    drop_search_index(op.get_bind())
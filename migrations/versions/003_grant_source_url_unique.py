@@ -0,0 +1,48 @@
+"""Add unique index on grants.source_url
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+# Conflicting URLs listed in the error, at most
+MAX_REPORTED = 50
+
+def upgrade():
+    # Ingest stores a missing source_url as NULL, which the index allows repeatedly
+    op.execute("UPDATE grants SET source_url = NULL WHERE source_url = ''")
+    # Grants sharing a source_url may each carry edits (status, analyses), so they
+    # are left for someone to merge rather than resolved here
+    rows = op.get_bind().execute(sa.text(
+        "SELECT source_url, id FROM grants WHERE source_url IN ("
+        " SELECT source_url FROM grants WHERE source_url IS NOT NULL"
+        " GROUP BY source_url HAVING COUNT(*) > 1"
+        ") ORDER BY source_url, id"
+    )).fetchall()
+    if rows:
+        conflicts = {}
+        for url, grant_id in rows:
+            conflicts.setdefault(url, []).append(grant_id)
+        report = '\n'.join(
+            f'  {url}: grants {", ".join(map(str, ids))}' for url, ids in list(conflicts.items())[:MAX_REPORTED]
+        )
+        if len(conflicts) > MAX_REPORTED:
+            report += f'\n  ... and {len(conflicts) - MAX_REPORTED} more'
+        raise RuntimeError(
+            f'Cannot add unique index ux_grants_source_url: {len(conflicts)} source URL(s) are each '
+            f'used by more than one grant. Merge or clear the duplicates, then run the upgrade again.\n{report}'
+        )
+    # Required by the ON CONFLICT (source_url) upsert used for bulk ingest
+    op.create_index('ux_grants_source_url', 'grants', ['source_url'], unique=True)
+
+def downgrade():
+    op.drop_index('ux_grants_source_url', table_name='grants')
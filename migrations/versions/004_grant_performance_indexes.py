@@ -0,0 +1,51 @@
+"""Add indexes for hot grant queries
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Organisation link read by eligibility scans. SQLite can't add the
+    # constraint in place, and batch mode would drop the search triggers
+    op.add_column('grants', sa.Column('org_id', sa.Integer(), nullable=True))
+    if op.get_bind().dialect.name != 'sqlite':
+        op.create_foreign_key(
+            'fk_grants_org_id_organisation_profiles',
+            'grants', 'organisation_profiles', ['org_id'], ['id']
+        )
+    op.create_index(op.f('ix_grants_org_id'), 'grants', ['org_id'], unique=False)
+
+    # Keyset listing order (due_date, id), alone and behind the status/funder
+    # filters; the composites supersede the single-column indexes from 001
+    op.create_index('ix_grants_due_date_id', 'grants', ['due_date', 'id'], unique=False)
+    op.create_index('ix_grants_status_due_date_id', 'grants', ['status', 'due_date', 'id'], unique=False)
+    op.create_index('ix_grants_funder_due_date_id', 'grants', ['funder', 'due_date', 'id'], unique=False)
+    op.drop_index(op.f('ix_grants_status'), table_name='grants')
+    op.drop_index(op.f('ix_grants_funder'), table_name='grants')
+
+    # Collection version (max updated_at) used for listing ETags
+    op.create_index('ix_grants_updated_at', 'grants', ['updated_at'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_grants_updated_at', table_name='grants')
+    op.create_index(op.f('ix_grants_funder'), 'grants', ['funder'], unique=False)
+    op.create_index(op.f('ix_grants_status'), 'grants', ['status'], unique=False)
+    op.drop_index('ix_grants_funder_due_date_id', table_name='grants')
+    op.drop_index('ix_grants_status_due_date_id', table_name='grants')
+    op.drop_index('ix_grants_due_date_id', table_name='grants')
+    op.drop_index(op.f('ix_grants_org_id'), table_name='grants')
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ALTER TABLE grants DROP COLUMN org_id')
+    else:
+        op.drop_constraint('fk_grants_org_id_organisation_profiles', 'grants', type_='foreignkey')
+        op.drop_column('grants', 'org_id')
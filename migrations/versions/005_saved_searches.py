@@ -0,0 +1,61 @@
+"""Add saved searches and notifications
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'saved_searches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('keyword', sa.String(length=200), nullable=True),
+        sa.Column('funder', sa.String(length=200), nullable=True),
+        sa.Column('min_date', sa.DateTime(), nullable=True),
+        sa.Column('max_date', sa.DateTime(), nullable=True),
+        sa.Column('min_amount', sa.Float(), nullable=True),
+        sa.Column('max_amount', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_saved_searches_user_id'), 'saved_searches', ['user_id'], unique=False)
+
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('saved_search_id', sa.Integer(), nullable=False),
+        sa.Column('grant_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('read_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['saved_search_id'], ['saved_searches.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['grant_id'], ['grants.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Percolation inserts with ON CONFLICT DO NOTHING on (saved_search_id, grant_id)
+    op.create_index('ux_notifications_search_grant', 'notifications',
+                    ['saved_search_id', 'grant_id'], unique=True)
+    op.create_index('ix_notifications_user_read_at', 'notifications', ['user_id', 'read_at'], unique=False)
+    op.create_index(op.f('ix_notifications_grant_id'), 'notifications', ['grant_id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_notifications_grant_id'), table_name='notifications')
+    op.drop_index('ix_notifications_user_read_at', table_name='notifications')
+    op.drop_index('ux_notifications_search_grant', table_name='notifications')
+    op.drop_table('notifications')
+    op.drop_index(op.f('ix_saved_searches_user_id'), table_name='saved_searches')
+    op.drop_table('saved_searches')
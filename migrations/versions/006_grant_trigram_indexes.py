@@ -0,0 +1,28 @@
+"""Add trigram indexes for fuzzy grant matching
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # SQLite keeps its trigram indexes in memory (api/fuzzy.py)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_grants_name_trgm ON grants USING GIN (name gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_grants_funder_trgm ON grants USING GIN (funder gin_trgm_ops)")
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_grants_funder_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_grants_name_trgm")
@@ -0,0 +1,66 @@
+"""Add MinHash signatures, LSH bands and duplicate candidates
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'grant_signatures',
+        sa.Column('grant_id', sa.Integer(), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['grant_id'], ['grants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('grant_id')
+    )
+
+    op.create_table(
+        'grant_lsh_bands',
+        sa.Column('grant_id', sa.Integer(), nullable=False),
+        sa.Column('band', sa.SmallInteger(), nullable=False),
+        sa.Column('band_key', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['grant_id'], ['grants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('grant_id', 'band')
+    )
+    op.create_index('ix_grant_lsh_bands_band_key', 'grant_lsh_bands', ['band_key'], unique=False)
+
+    op.create_table(
+        'duplicate_candidates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('grant_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_id', sa.Integer(), nullable=False),
+        sa.Column('similarity', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('kept_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('resolved_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['grant_id'], ['grants.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['duplicate_id'], ['grants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Detection inserts with ON CONFLICT DO NOTHING on the (lower id, higher id) pair
+    op.create_index('ux_duplicate_candidates_pair', 'duplicate_candidates',
+                    ['grant_id', 'duplicate_id'], unique=True)
+    op.create_index('ix_duplicate_candidates_status', 'duplicate_candidates', ['status', 'id'], unique=False)
+    op.create_index(op.f('ix_duplicate_candidates_duplicate_id'), 'duplicate_candidates',
+                    ['duplicate_id'], unique=False)
+
+    # Existing grants are signed by api.dedup.backfill_signatures()
+
+def downgrade():
+    op.drop_index(op.f('ix_duplicate_candidates_duplicate_id'), table_name='duplicate_candidates')
+    op.drop_index('ix_duplicate_candidates_status', table_name='duplicate_candidates')
+    op.drop_index('ux_duplicate_candidates_pair', table_name='duplicate_candidates')
+    op.drop_table('duplicate_candidates')
+    op.drop_index('ix_grant_lsh_bands_band_key', table_name='grant_lsh_bands')
+    op.drop_table('grant_lsh_bands')
+    op.drop_table('grant_signatures')
@@ -0,0 +1,30 @@
+"""Add parsed amount bounds to grants
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from api.amounts import backfill_amounts
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('grants', sa.Column('amount_min', sa.Float(), nullable=True))
+    op.add_column('grants', sa.Column('amount_max', sa.Float(), nullable=True))
+    # Parse existing amount_string values in id-ordered batches
+    backfill_amounts(op.get_bind())
+    op.create_index('ix_grants_amount_max_id', 'grants', ['amount_max', 'id'], unique=False)
+    op.create_index('ix_grants_amount_min', 'grants', ['amount_min'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_grants_amount_min', table_name='grants')
+    op.drop_index('ix_grants_amount_max_id', table_name='grants')
+    op.drop_column('grants', 'amount_max')
+    op.drop_column('grants', 'amount_min')
@@ -0,0 +1,41 @@
+"""Add the grant change log
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'grant_changes',
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('grant_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=20), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('seq'),
+        sqlite_autoincrement=True
+    )
+    op.create_index(op.f('ix_grant_changes_grant_id'), 'grant_changes', ['grant_id'], unique=False)
+
+    # Seed one entry per existing grant so a feed read from the start covers the table
+    op.execute("""
+        INSERT INTO grant_changes (grant_id, operation, changed_at)
+        SELECT id,
+               CASE status WHEN 'duplicate' THEN 'deleted' WHEN 'closed' THEN 'closed' ELSE 'created' END,
+               COALESCE(updated_at, created_at)
+        FROM grants
+        ORDER BY id
+    """)
+
+def downgrade():
+    op.drop_index(op.f('ix_grant_changes_grant_id'), table_name='grant_changes')
+    op.drop_table('grant_changes')
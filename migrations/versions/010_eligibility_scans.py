@@ -0,0 +1,58 @@
+"""Add batch eligibility scans and their per-grant results
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'eligibility_scans',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('concurrency', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('completed', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['org_id'], ['organisation_profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_eligibility_scans_org_id'), 'eligibility_scans', ['org_id'], unique=False)
+
+    op.create_table(
+        'eligibility_scan_results',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scan_id', sa.Integer(), nullable=False),
+        sa.Column('grant_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('score', sa.Float(), nullable=True),
+        sa.Column('analysis', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['scan_id'], ['eligibility_scans.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['grant_id'], ['grants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ux_eligibility_scan_results_scan_grant', 'eligibility_scan_results',
+                    ['scan_id', 'grant_id'], unique=True)
+    op.create_index('ix_eligibility_scan_results_scan_status_score', 'eligibility_scan_results',
+                    ['scan_id', 'status', 'score', 'id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_eligibility_scan_results_scan_status_score', table_name='eligibility_scan_results')
+    op.drop_index('ux_eligibility_scan_results_scan_grant', table_name='eligibility_scan_results')
+    op.drop_table('eligibility_scan_results')
+    op.drop_index(op.f('ix_eligibility_scans_org_id'), table_name='eligibility_scans')
+    op.drop_table('eligibility_scans')
@@ -0,0 +1,29 @@
+"""Add local relevance scores to eligibility scans
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # mission and focus_areas already exist from 001
+    op.add_column('organisation_profiles', sa.Column('target_demographics', sa.Text(), nullable=True))
+
+    op.add_column('eligibility_scans', sa.Column('skipped', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('eligibility_scans', sa.Column('min_relevance', sa.Float(), nullable=True))
+    op.add_column('eligibility_scan_results', sa.Column('relevance', sa.Float(), nullable=True))
+
+def downgrade():
+    op.drop_column('eligibility_scan_results', 'relevance')
+    op.drop_column('eligibility_scans', 'min_relevance')
+    op.drop_column('eligibility_scans', 'skipped')
+    op.drop_column('organisation_profiles', 'target_demographics')
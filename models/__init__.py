@@ -1,11 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
+from datetime import datetime
 
 db = SQLAlchemy()
 login_manager = LoginManager()
 migrate = Migrate()
 
+def serialize_fields(obj, fields):
+    """Map ``fields`` of a model instance to JSON-ready values, with datetimes as ISO 8601."""
+    data = {}
+    for field in fields:
+        value = getattr(obj, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        data[field] = value
+    return data
+
 def init_db(app):
     db.init_app(app)
     login_manager.init_app(app)
@@ -15,6 +26,10 @@ def init_db(app):
     from .user import User
     from .grant import Grant
     from .organisation import OrganisationProfile
+    from .saved_search import SavedSearch, Notification
+    from .duplicate import GrantSignature, GrantBand, DuplicateCandidate
+    from .change import GrantChange
+    from .eligibility import EligibilityScan, EligibilityScanResult
     
     @login_manager.user_loader
     def load_user(user_id):
@@ -0,0 +1,17 @@
+from . import db
+from datetime import datetime
+
+class GrantChange(db.Model):
+    """One entry in the grant change log; ``seq`` only ever increases."""
+    __tablename__ = 'grant_changes'
+    # Never reuse a sequence number, even after the newest entries are pruned
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    seq = db.Column(db.Integer, primary_key=True)
+    # No foreign key: tombstones outlive the grants they describe
+    grant_id = db.Column(db.Integer, nullable=False, index=True)
+    operation = db.Column(db.String(20), nullable=False)  # created, updated, closed, deleted
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<GrantChange {self.seq} {self.operation} grant={self.grant_id}>'
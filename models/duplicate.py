@@ -0,0 +1,65 @@
+from . import db, serialize_fields
+from datetime import datetime
+
+class GrantSignature(db.Model):
+    """MinHash signature of a grant's name, funder and description shingles."""
+    __tablename__ = 'grant_signatures'
+
+    grant_id = db.Column(db.Integer, db.ForeignKey('grants.id', ondelete='CASCADE'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f'<GrantSignature grant={self.grant_id}>'
+
+class GrantBand(db.Model):
+    """One LSH band bucket of a grant's signature; equal keys mean a likely duplicate."""
+    __tablename__ = 'grant_lsh_bands'
+    __table_args__ = (
+        # Candidate lookup is band_key IN (...) for an incoming batch
+        db.Index('ix_grant_lsh_bands_band_key', 'band_key'),
+    )
+
+    grant_id = db.Column(db.Integer, db.ForeignKey('grants.id', ondelete='CASCADE'), primary_key=True)
+    band = db.Column(db.SmallInteger, primary_key=True)
+    band_key = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f'<GrantBand grant={self.grant_id} band={self.band}>'
+
+class DuplicateCandidate(db.Model):
+    """A pair of grants that look like the same opportunity, awaiting review."""
+    __tablename__ = 'duplicate_candidates'
+    __table_args__ = (
+        # Pairs are stored lowest id first and reported once
+        db.Index('ux_duplicate_candidates_pair', 'grant_id', 'duplicate_id', unique=True),
+        db.Index('ix_duplicate_candidates_status', 'status', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    grant_id = db.Column(db.Integer, db.ForeignKey('grants.id', ondelete='CASCADE'), nullable=False)
+    duplicate_id = db.Column(db.Integer, db.ForeignKey('grants.id', ondelete='CASCADE'), nullable=False, index=True)
+    similarity = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, merged, dismissed
+    kept_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime)
+
+    grant = db.relationship('Grant', foreign_keys=[grant_id])
+    duplicate = db.relationship('Grant', foreign_keys=[duplicate_id])
+
+    def __repr__(self):
+        return f'<DuplicateCandidate {self.grant_id}~{self.duplicate_id}>'
+
+    SERIALIZED_FIELDS = (
+        'id',
+        'grant_id',
+        'duplicate_id',
+        'similarity',
+        'status',
+        'kept_id',
+        'created_at',
+        'resolved_at'
+    )
+
+    def to_dict(self):
+        return serialize_fields(self, self.SERIALIZED_FIELDS)
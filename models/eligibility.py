@@ -0,0 +1,76 @@
+from . import db, serialize_fields
+from datetime import datetime
+
+class EligibilityScan(db.Model):
+    """A batch eligibility scan of many grants for one organisation."""
+    __tablename__ = 'eligibility_scans'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    org_id = db.Column(db.Integer, db.ForeignKey('organisation_profiles.id', ondelete='CASCADE'), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, completed
+    concurrency = db.Column(db.Integer, nullable=False)
+    # Progress counters, updated with each result
+    total = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    # Grants left out for scoring below min_relevance locally, never sent to the LLM
+    skipped = db.Column(db.Integer, nullable=False, default=0)
+    min_relevance = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<EligibilityScan {self.id} org={self.org_id} {self.status}>'
+    
+    SERIALIZED_FIELDS = (
+        'id',
+        'org_id',
+        'status',
+        'concurrency',
+        'total',
+        'completed',
+        'failed',
+        'skipped',
+        'min_relevance',
+        'created_at',
+        'finished_at'
+    )
+    
+    def to_dict(self):
+        return serialize_fields(self, self.SERIALIZED_FIELDS)
+
+class EligibilityScanResult(db.Model):
+    """One grant's outcome within a scan; ``pending`` until its analysis finishes."""
+    __tablename__ = 'eligibility_scan_results'
+    __table_args__ = (
+        db.Index('ux_eligibility_scan_results_scan_grant', 'scan_id', 'grant_id', unique=True),
+        # Partial results are read best score first within one scan and status
+        db.Index('ix_eligibility_scan_results_scan_status_score', 'scan_id', 'status', 'score', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    scan_id = db.Column(db.Integer, db.ForeignKey('eligibility_scans.id', ondelete='CASCADE'), nullable=False)
+    grant_id = db.Column(db.Integer, db.ForeignKey('grants.id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, completed, failed, skipped
+    relevance = db.Column(db.Float)  # local lexical score, before any LLM call
+    score = db.Column(db.Float)
+    analysis = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<EligibilityScanResult scan={self.scan_id} grant={self.grant_id} {self.status}>'
+    
+    SERIALIZED_FIELDS = (
+        'id',
+        'grant_id',
+        'status',
+        'relevance',
+        'score',
+        'analysis',
+        'error',
+        'finished_at'
+    )
+    
+    def to_dict(self):
+        return serialize_fields(self, self.SERIALIZED_FIELDS)
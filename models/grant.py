@@ -1,9 +1,22 @@
-from . import db
+from . import db, serialize_fields
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import JSON
 
 class Grant(db.Model):
     __tablename__ = 'grants'
+    __table_args__ = (
+        # Bulk ingest and scrapers upsert on the source URL
+        db.Index('ux_grants_source_url', 'source_url', unique=True),
+        # Keyset listing order (due date, then id), alone and behind each filter
+        db.Index('ix_grants_due_date_id', 'due_date', 'id'),
+        db.Index('ix_grants_status_due_date_id', 'status', 'due_date', 'id'),
+        db.Index('ix_grants_funder_due_date_id', 'funder', 'due_date', 'id'),
+        # Collection version used for listing ETags
+        db.Index('ix_grants_updated_at', 'updated_at'),
+        # Amount range filters, and keyset order for sort=amount
+        db.Index('ix_grants_amount_max_id', 'amount_max', 'id'),
+        db.Index('ix_grants_amount_min', 'amount_min'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -11,6 +24,8 @@ class Grant(db.Model):
     source_url = db.Column(db.String(500))
     due_date = db.Column(db.DateTime)
     amount_string = db.Column(db.String(100))  # Store as string to handle ranges and complex amounts
+    amount_min = db.Column(db.Float)  # Parsed bounds of amount_string; None when open or unknown
+    amount_max = db.Column(db.Float)
     description = db.Column(db.Text)
     status = db.Column(db.String(50), default='potential')  # potential, active, closed, etc.
     eligibility_analysis = db.Column(JSON)
@@ -20,18 +35,27 @@ class Grant(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_scraped_at = db.Column(db.DateTime)  # For tracking when the grant was last updated from source
     
+    # Organisation the grant is being assessed for (used by eligibility scans)
+    org_id = db.Column(db.Integer, db.ForeignKey('organisation_profiles.id'), index=True)
+    
     def __repr__(self):
         return f'<Grant {self.name} by {self.funder}>'
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'funder': self.funder,
-            'source_url': self.source_url,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'amount_string': self.amount_string,
-            'description': self.description,
-            'status': self.status,
-            'eligibility_analysis': self.eligibility_analysis
-        } 
\ No newline at end of file
+    # Fields exposed by to_dict, in output order
+    SERIALIZED_FIELDS = (
+        'id',
+        'name',
+        'funder',
+        'source_url',
+        'due_date',
+        'amount_string',
+        'amount_min',
+        'amount_max',
+        'description',
+        'status',
+        'eligibility_analysis'
+    )
+    
+    def to_dict(self, fields=None):
+        # Only touch the requested attributes so deferred columns stay unloaded
+        return serialize_fields(self, fields or self.SERIALIZED_FIELDS) 
\ No newline at end of file
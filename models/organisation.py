@@ -18,6 +18,9 @@ class OrganisationProfile(db.Model):
     dgr_status = db.Column(db.Boolean, default=False)
     annual_revenue = db.Column(db.Integer)
     profile_text = db.Column(db.Text)
+    mission = db.Column(db.Text)
+    focus_areas = db.Column(db.JSON)  # list of focus area names
+    target_demographics = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -0,0 +1,66 @@
+from . import db, serialize_fields
+from datetime import datetime
+
+class SavedSearch(db.Model):
+    __tablename__ = 'saved_searches'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    name = db.Column(db.String(200), nullable=False)
+    
+    # Predicates, all optional; a grant must satisfy every one that is set
+    keyword = db.Column(db.String(200))
+    funder = db.Column(db.String(200))
+    min_date = db.Column(db.DateTime)
+    max_date = db.Column(db.DateTime)
+    min_amount = db.Column(db.Float)
+    max_amount = db.Column(db.Float)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    notifications = db.relationship('Notification', back_populates='saved_search',
+                                    cascade='all, delete-orphan')
+    
+    def __repr__(self):
+        return f'<SavedSearch {self.name}>'
+    
+    SERIALIZED_FIELDS = (
+        'id',
+        'user_id',
+        'name',
+        'keyword',
+        'funder',
+        'min_date',
+        'max_date',
+        'min_amount',
+        'max_amount',
+        'created_at'
+    )
+    
+    def to_dict(self):
+        return serialize_fields(self, self.SERIALIZED_FIELDS)
+
+class Notification(db.Model):
+    __tablename__ = 'notifications'
+    __table_args__ = (
+        # A grant is reported once per saved search, however often it is rewritten
+        db.Index('ux_notifications_search_grant', 'saved_search_id', 'grant_id', unique=True),
+        db.Index('ix_notifications_user_read_at', 'user_id', 'read_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_searches.id', ondelete='CASCADE'), nullable=False)
+    grant_id = db.Column(db.Integer, db.ForeignKey('grants.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)
+    
+    saved_search = db.relationship('SavedSearch', back_populates='notifications')
+    grant = db.relationship('Grant')
+    
+    def __repr__(self):
+        return f'<Notification search={self.saved_search_id} grant={self.grant_id}>'
+    
+    def to_dict(self):
+        return serialize_fields(self, ('id', 'saved_search_id', 'grant_id', 'user_id', 'created_at', 'read_at'))
@@ -1,20 +1,14 @@
 import os
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import requests
 from bs4 import BeautifulSoup
-from supabase import create_client, Client
 from dotenv import load_dotenv
+from api.amounts import parse_amount_range
 
 load_dotenv()
 
-# Initialize Supabase client
-supabase: Client = create_client(
-    os.getenv('SUPABASE_URL', ''),
-    os.getenv('SUPABASE_SERVICE_ROLE_KEY', '')
-)
-
 class GrantScraper:
     def __init__(self):
         self.headers = {
@@ -22,22 +16,19 @@ class GrantScraper:
         }
 
     def parse_amount(self, amount_text: str) -> Dict:
-        """Parse amount text into structured format."""
+        """Parse amount text into structured format, with the parser ingest uses."""
         amount_text = amount_text.lower().strip()
-        try:
-            if 'up to' in amount_text:
-                return {'max': float(amount_text.split('up to')[1].strip().replace('$', '').replace(',', ''))}
-            elif '-' in amount_text:
-                min_str, max_str = amount_text.split('-')
-                return {
-                    'min': float(min_str.strip().replace('$', '').replace(',', '')),
-                    'max': float(max_str.strip().replace('$', '').replace(',', ''))
-                }
-            elif '$' in amount_text:
-                return {'fixed': float(amount_text.replace('$', '').replace(',', ''))}
-            return {'description': amount_text}
-        except:
+        low, high = parse_amount_range(amount_text)
+        if low is None and high is None:
             return {'description': amount_text}
+        if low == high:
+            return {'fixed': low}
+        amount = {}
+        if low is not None:
+            amount['min'] = low
+        if high is not None:
+            amount['max'] = high
+        return amount
 
     def parse_date(self, date_text: str) -> Optional[str]:
         """Parse date text into ISO format."""
@@ -93,24 +84,61 @@ class GrantScraper:
         # Implementation for additional grant sources
         return []
 
-    def save_to_supabase(self, grants: List[Dict]) -> None:
-        """Save grants to Supabase database."""
-        try:
-            for grant in grants:
-                # Check if grant already exists
-                existing = supabase.table('grants').select('id').eq('source_url', grant['source_url']).execute()
-                
-                if not existing.data:
-                    # Insert new grant
-                    supabase.table('grants').insert(grant).execute()
-                else:
-                    # Update existing grant
-                    supabase.table('grants').update(grant).eq('source_url', grant['source_url']).execute()
-                    
-        except Exception as e:
-            print(f"Error saving to Supabase: {e}")
+    def format_amount(self, amount: Dict) -> Optional[str]:
+        """Render a parsed amount back into display text."""
+        if 'fixed' in amount:
+            return f"${amount['fixed']:,.0f}"
+        if 'min' in amount and 'max' in amount:
+            return f"${amount['min']:,.0f} - ${amount['max']:,.0f}"
+        if 'max' in amount:
+            return f"Up to ${amount['max']:,.0f}"
+        if 'min' in amount:
+            return f"From ${amount['min']:,.0f}"
+        return amount.get('description')
+
+    def amount_bounds(self, amount: Dict) -> Tuple[Optional[float], Optional[float]]:
+        """Numeric (min, max) from a parsed amount; a fixed amount is both."""
+        if 'fixed' in amount:
+            return amount['fixed'], amount['fixed']
+        return amount.get('min'), amount.get('max')
+
+    def save_to_database(self, grants: List[Dict]) -> List[Dict]:
+        """
+        Upsert scraped grants into the application database (requires an app context).
+
+        Waits for the deferred write hooks too, so a one-off scraper process
+        doesn't exit with percolation and duplicate detection still queued.
+        """
+        from api.ingest import upsert_grants
+        from api.grant_events import hook_queue
+
+        scraped_at = datetime.utcnow()
+        records = []
+        for grant in grants:
+            amount = grant.get('amount_range') or {}
+            record = {
+                'name': grant['title'],
+                'funder': grant['funder'],
+                'source_url': grant['source_url'],
+                'due_date': grant.get('due_date'),
+                'amount_string': self.format_amount(amount),
+                'description': grant.get('description'),
+                'last_scraped_at': scraped_at
+            }
+            # Keep the bounds parse_amount found; otherwise ingest parses amount_string
+            amount_min, amount_max = self.amount_bounds(amount)
+            if amount_min is not None or amount_max is not None:
+                record.update(amount_min=amount_min, amount_max=amount_max)
+            records.append(record)
+        results = upsert_grants(records)
+        hook_queue.join()
+        return results
 
-def main():
+def main(app=None):
+    """Scrape every source and upsert the grants into the app's database."""
+    if app is None:
+        from app import create_app
+        app = create_app(os.getenv('FLASK_ENV', 'production'))
     scraper = GrantScraper()
     
     # Scrape from different sources
@@ -118,10 +146,13 @@ def main():
     grants.extend(scraper.scrape_grants_gov_au())
     grants.extend(scraper.scrape_community_grants())
     
-    # Save to database
-    scraper.save_to_supabase(grants)
+    # Save to database (bulk upsert, change log and write hooks)
+    with app.app_context():
+        results = scraper.save_to_database(grants)
     
-    print(f"Scraped {len(grants)} grants")
+    saved = sum(result.get('status') in ('created', 'updated') for result in results)
+    print(f"Scraped {len(grants)} grants, saved {saved}")
+    return results
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
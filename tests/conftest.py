@@ -0,0 +1,52 @@
+"""
+Fixtures shared by the test modules.
+
+``app`` is a minimal app on a fresh database with an app context pushed,
+registering the blueprints from the ``blueprints`` fixture (the grants API
+unless a module overrides it). A module overrides ``database_uri`` for a
+file database shared with other threads, or wraps ``app`` in its own
+``app`` fixture to add rows or routes. ``make_app`` builds further apps for
+tests that need more than one, or a different configuration.
+"""
+import pytest
+from flask import Flask
+from models import db, init_db
+from api.grants_api import grants_bp
+from api.serialization import init_json
+
+@pytest.fixture
+def make_app():
+    """Build a minimal app; ``database_uri=None`` leaves the database out."""
+    def make(*blueprints, database_uri='sqlite:///:memory:', **config):
+        app = Flask(__name__)
+        app.config.update({'TESTING': True, 'SECRET_KEY': 'test', **config})
+        init_json(app)
+        if database_uri:
+            app.config.update(SQLALCHEMY_DATABASE_URI=database_uri, SQLALCHEMY_TRACK_MODIFICATIONS=False)
+            init_db(app)
+        for blueprint in blueprints:
+            app.register_blueprint(blueprint)
+        return app
+    return make
+
+@pytest.fixture
+def blueprints():
+    return [grants_bp]
+
+@pytest.fixture
+def database_uri():
+    return 'sqlite:///:memory:'
+
+@pytest.fixture
+def app(make_app, blueprints, database_uri):
+    """Create a minimal app with the module's blueprints and an empty database."""
+    app = make_app(*blueprints, database_uri=database_uri)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
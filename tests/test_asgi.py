@@ -0,0 +1,114 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from flask import jsonify, request
+from api.asgi import ASGIApp
+
+@pytest.fixture
+def app(app):
+    """The shared app plus slow async and sync views."""
+    @app.route('/slow-echo', methods=['POST'])
+    async def slow_echo():
+        await asyncio.sleep(0.1)
+        return jsonify({'echo': request.get_json(), 'thread': threading.get_ident()})
+
+    @app.route('/slow-sync')
+    def slow_sync():
+        time.sleep(0.1)
+        return jsonify({'thread': threading.get_ident()})
+
+    return app
+
+async def call(asgi_app, method, path, body=b'', query=b'', headers=()):
+    """Send one request through an ASGI app, returning (status, headers, body)."""
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query,
+        'headers': [(b'content-type', b'application/json'), *headers],
+        'http_version': '1.1', 'scheme': 'http', 'server': ('testserver', 80)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    start = sent[0]
+    assert all(message['type'] == 'http.response.body' for message in sent[1:])
+    assert not sent[-1].get('more_body', False)
+    return start['status'], dict(start['headers']), b''.join(message.get('body', b'') for message in sent[1:])
+
+def test_sync_views_match_wsgi(app):
+    """Test that sync views answer the same over ASGI as over WSGI."""
+    asgi_app = ASGIApp(app)
+    body = json.dumps({'name': 'Community Arts Grant', 'funder': 'Creative Australia'}).encode()
+    status, _, created = asyncio.run(call(asgi_app, 'POST', '/api/grants', body))
+    assert status == 201
+    assert json.loads(created)['data']['name'] == 'Community Arts Grant'
+
+    status, headers, listed = asyncio.run(call(asgi_app, 'GET', '/api/grants', query=b'fields=id,name'))
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json'
+    assert json.loads(listed) == app.test_client().get('/api/grants?fields=id,name').get_json()
+
+def test_streamed_export(app):
+    """Test that a streamed export arrives whole."""
+    client = app.test_client()
+    for i in range(3):
+        client.post('/api/grants', json={'name': f'Grant {i}', 'funder': 'Lotterywest'})
+    status, _, body = asyncio.run(call(ASGIApp(app), 'GET', '/api/grants/export', query=b'format=ndjson'))
+    assert status == 200
+    assert [json.loads(line)['name'] for line in body.splitlines()] == ['Grant 0', 'Grant 1', 'Grant 2']
+
+def test_sync_views_run_in_the_pool(app):
+    """Test that sync views run side by side in the adapter's pool, off the loop."""
+    asgi_app = ASGIApp(app, threads=10)
+
+    async def burst():
+        return await asyncio.gather(*(call(asgi_app, 'GET', '/slow-sync') for _ in range(10)))
+
+    start = time.perf_counter()
+    responses = asyncio.run(burst())
+    assert time.perf_counter() - start < 0.5  # 10 x 0.1s on one thread would take 1s
+    threads = {json.loads(body)['thread'] for _, _, body in responses}
+    assert len(threads) > 1 and threading.get_ident() not in threads
+
+def test_request_body_without_length(app):
+    """Test that a body sent without Content-Length still reaches the view."""
+    status, _, body = asyncio.run(call(ASGIApp(app), 'POST', '/slow-echo', b'{"n": 1}'))
+    assert status == 200
+    assert json.loads(body)['echo'] == {'n': 1}
+
+def test_routing_errors(app):
+    """Test that unknown paths and methods get the usual error responses."""
+    asgi_app = ASGIApp(app)
+    assert asyncio.run(call(asgi_app, 'GET', '/nope'))[0] == 404
+    assert asyncio.run(call(asgi_app, 'DELETE', '/slow-echo'))[0] == 405
+
+def test_async_views_share_the_loop(app):
+    """Test that concurrent async views run together on the server's loop thread."""
+    asgi_app = ASGIApp(app)
+
+    async def burst():
+        requests = [call(asgi_app, 'POST', '/slow-echo', json.dumps({'n': i}).encode()) for i in range(50)]
+        return await asyncio.gather(*requests)
+
+    start = time.perf_counter()
+    responses = asyncio.run(burst())
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0  # 50 x 0.1s serially would take 5s
+    payloads = [json.loads(body) for _, _, body in responses]
+    assert [payload['echo']['n'] for payload in payloads] == list(range(50))
+    assert {payload['thread'] for payload in payloads} == {threading.get_ident()}
+
+def test_async_view_errors_are_handled(app):
+    """Test that an async view's validation errors come back as responses."""
+    status, _, body = asyncio.run(call(ASGIApp(app), 'POST', '/api/grants/1/generate-draft', b'{}'))
+    assert status in (400, 404, 500)
+    assert json.loads(body)['success'] is False
@@ -129,6 +129,21 @@ class TestTieredCache:
         assert tiered_cache.get('test_2') is None
         assert tiered_cache.get('other') == {'data': 3}
 
+    def test_memory_tier_evicts_least_recently_used(self, tiered_cache):
+        """Test that the memory tier stays within its cap, dropping the least recently used."""
+        tiered_cache._max_memory_entries = 2
+        tiered_cache.set('a', {'data': 1})
+        tiered_cache.set('b', {'data': 2})
+        tiered_cache.get('a')
+        tiered_cache.set('c', {'data': 3})
+
+        assert len(tiered_cache._memory_cache) == 2
+        assert tiered_cache._get_versioned_key('b') not in tiered_cache._memory_cache
+        assert tiered_cache._get_versioned_key('b') not in tiered_cache._memory_expiry
+        tiered_cache._redis_client.get.return_value = None
+        assert tiered_cache.get('a') == {'data': 1}
+        assert tiered_cache.get('c') == {'data': 3}
+
 @pytest.mark.asyncio
 class TestCacheDecorator:
     """Test suite for cache decorator."""
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import pytest
+from api import grants_api, llm
+from api.asgi import ASGIApp
+from models.grant import Grant
+from models.organisation import OrganisationProfile
+
+TOKENS = ['Our ', 'youth ', 'arts ', 'program\n', 'reaches ', '400 ', 'students.']
+
+class Rows:
+    """Stands in for ``get_db_session()`` with one grant and one complete profile."""
+
+    def query(self, model):
+        self._model = model.__name__
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        if self._model == 'OrganisationProfile':
+            return OrganisationProfile(
+                name='Outback Arts Collective', mission='Creative opportunities for young people',
+                focus_areas=['Arts', 'Youth'], annual_revenue=400000, target_demographics='Young people'
+            )
+        return Grant(id=1, name='Regional Arts Fund', funder='Creative Australia',
+                     description='Arts programs in regional towns', amount_string='$20,000')
+
+    def close(self):
+        pass
+
+class FakeStream:
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.text_stream = self._text()
+
+    async def _text(self):
+        for i, token in enumerate(TOKENS):
+            if i == self.fail_after:
+                raise Exception('Overloaded')
+            await asyncio.sleep(0.05)
+            yield token
+
+    async def get_final_message(self):
+        return SimpleNamespace(stop_reason='end_turn', usage=SimpleNamespace(input_tokens=900, output_tokens=7))
+
+@pytest.fixture
+def streams(monkeypatch):
+    """Replace the provider with a stream that writes a token every 50ms, failing at ``fail_after``."""
+    state = {'calls': [], 'fail_after': None}
+
+    class Client:
+        @asynccontextmanager
+        async def stream_message(self, **params):
+            state['calls'].append(params)
+            yield FakeStream(state['fail_after'])
+
+    monkeypatch.setattr(grants_api, 'get_db_session', Rows)
+    monkeypatch.setattr(grants_api, 'llm_client', Client)
+    return state
+
+BODY = json.dumps({'application_question': 'Describe your program.'}).encode()
+
+def parse_events(body: bytes):
+    """Split an event stream into ``(event, data)`` pairs."""
+    events = []
+    for block in body.decode().strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+async def stream(asgi_app):
+    """POST a streamed draft over ASGI, returning the start message and (elapsed, body) per chunk."""
+    scope = {
+        'type': 'http', 'method': 'POST', 'path': '/api/grants/1/generate-draft', 'query_string': b'stream=true',
+        'headers': [(b'content-type', b'application/json')], 'http_version': '1.1'
+    }
+    messages = [{'type': 'http.request', 'body': BODY, 'more_body': False}]
+    sent = []
+    start = time.perf_counter()
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append((time.perf_counter() - start, message))
+
+    await asgi_app(scope, receive, send)
+    return sent[0][1], [(elapsed, message.get('body', b'')) for elapsed, message in sent[1:]]
+
+def test_tokens_are_sent_as_they_arrive(app, streams):
+    """Test that each token goes out as its own event before the draft is finished."""
+    start, chunks = asyncio.run(stream(ASGIApp(app)))
+    assert start['status'] == 200
+    assert dict(start['headers'])[b'content-type'].startswith(b'text/event-stream')
+    assert dict(start['headers'])[b'cache-control'] == b'no-cache'
+
+    events = parse_events(b''.join(body for _, body in chunks))
+    assert [event for event, _ in events] == ['token'] * len(TOKENS) + ['done']
+    assert ''.join(data['text'] for _, data in events[:-1]) == ''.join(TOKENS)
+    done = events[-1][1]
+    assert done['usage'] == {'input_tokens': 900, 'output_tokens': 7}
+    assert 0 < done['timing']['first_token_ms'] < done['timing']['total_ms']
+
+    # The first token is sent about 50ms in, long before the ~350ms draft is done
+    first_token = next(elapsed for elapsed, body in chunks if body)
+    assert first_token < chunks[-1][0] - 0.2
+    assert streams['calls'][0]['max_tokens'] == 4000
+    assert 'Focus Areas: Arts, Youth' in streams['calls'][0]['messages'][0]['content']
+
+def test_streams_under_wsgi(app, streams):
+    """Test that the same events come through a WSGI server."""
+    response = app.test_client().post('/api/grants/1/generate-draft?stream=true', data=BODY,
+                                      content_type='application/json')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = parse_events(response.get_data())
+    assert ''.join(data['text'] for event, data in events if event == 'token') == ''.join(TOKENS)
+    assert events[-1][0] == 'done'
+
+def test_wsgi_stream_closes_its_client(app, streams, monkeypatch):
+    """Test that the client made on a WSGI stream's private loop is closed with it."""
+    clients = []
+
+    @asynccontextmanager
+    async def stream_message(self, **params):
+        clients.append(self)
+        yield FakeStream()
+
+    monkeypatch.setattr(llm.LLMClient, 'stream_message', stream_message)
+    monkeypatch.setattr(grants_api, 'llm_client', llm.llm_client)
+    for _ in range(2):
+        response = app.test_client().post('/api/grants/1/generate-draft?stream=true', data=BODY,
+                                          content_type='application/json')
+        assert parse_events(response.get_data())[-1][0] == 'done'
+
+    assert len(clients) == 2 and clients[0] is not clients[1]
+    assert all(client.client.is_closed() for client in clients)
+    assert not any(client in clients for client in llm._clients.values())
+
+def test_asgi_streams_share_the_loop_client(app, streams, monkeypatch):
+    """Test that streams served over ASGI use the server loop's client and leave it open."""
+    clients = []
+
+    @asynccontextmanager
+    async def stream_message(self, **params):
+        clients.append(self)
+        yield FakeStream()
+
+    monkeypatch.setattr(llm.LLMClient, 'stream_message', stream_message)
+    monkeypatch.setattr(grants_api, 'llm_client', llm.llm_client)
+
+    async def twice():
+        asgi_app = ASGIApp(app)
+        for _ in range(2):
+            _, chunks = await stream(asgi_app)
+            assert parse_events(b''.join(body for _, body in chunks))[-1][0] == 'done'
+        return llm._clients.get(asyncio.get_running_loop())
+
+    shared = asyncio.run(twice())
+    assert clients == [shared, shared]
+    assert not shared.client.is_closed()
+
+def test_provider_errors_end_the_stream(app, streams):
+    """Test that a failure mid-draft ends the stream with an error event."""
+    streams['fail_after'] = 2
+
+    _, chunks = asyncio.run(stream(ASGIApp(app)))
+    events = parse_events(b''.join(body for _, body in chunks))
+    assert [event for event, _ in events] == ['token', 'token', 'error']
+    assert 'Overloaded' in events[-1][1]['error']
@@ -0,0 +1,126 @@
+import threading
+import pytest
+from models import db
+from models.grant import Grant
+from models.duplicate import DuplicateCandidate, GrantSignature
+from api.grants_api import grants_bp
+from api.duplicates_api import duplicates_bp
+from api.ingest import upsert_grants
+from api.dedup import backfill_signatures, estimate_similarity, minhash, shingles
+from api import grant_events
+
+DESCRIPTION = (
+    'Funding for community organisations delivering arts and cultural programs '
+    'in regional towns, including festivals, workshops and public art installations '
+    'that engage local young people and First Nations communities'
+)
+
+@pytest.fixture
+def blueprints():
+    return [grants_bp, duplicates_bp]
+
+@pytest.fixture
+def duplicate_pair(client):
+    """The same opportunity from a scraper and from manual entry."""
+    upsert_grants([
+        {'name': 'Regional Arts Fund 2025', 'funder': 'Creative Australia',
+         'source_url': 'https://www.grants.gov.au/Go/Show?GoUuid=1', 'description': DESCRIPTION},
+        {'name': 'Youth Sport Program', 'funder': 'Department of Health',
+         'source_url': 'https://example.org/sport', 'description': 'Equipment and coaching for junior clubs'}
+    ])
+    response = client.post('/api/grants', json={
+        'name': 'Regional Arts Fund (2025)', 'funder': 'Creative Australia',
+        'amount_string': 'Up to $20,000', 'description': DESCRIPTION.replace('festivals, ', '')
+    })
+    return response.get_json()['data']['id']
+
+def test_signature_estimates_similarity():
+    """Test that signatures agree more for more similar texts."""
+    base = shingles('Regional Arts Fund', 'Creative Australia', DESCRIPTION)
+    close = shingles('Regional Arts Fund 2025', 'Creative Australia', DESCRIPTION)
+    unrelated = shingles('Youth Sport Program', 'Department of Health', 'Equipment and coaching')
+    assert minhash(base) == minhash(set(base))
+    assert estimate_similarity(minhash(base), minhash(close)) > 0.7
+    assert estimate_similarity(minhash(base), minhash(unrelated)) < 0.2
+
+def test_writes_record_candidates(client, duplicate_pair):
+    """Test that a near-duplicate written through the API is flagged once."""
+    body = client.get('/api/grants/duplicates').get_json()
+    assert body['success'] is True
+    assert len(body['data']) == 1
+    candidate = body['data'][0]
+    assert candidate['duplicate_id'] == duplicate_pair
+    assert candidate['grant']['name'] == 'Regional Arts Fund 2025'
+    assert candidate['similarity'] >= 0.6
+
+    # Rewriting either grant does not report the pair again
+    upsert_grants([{'name': 'Regional Arts Fund 2025', 'funder': 'Creative Australia',
+                    'source_url': 'https://www.grants.gov.au/Go/Show?GoUuid=1', 'description': DESCRIPTION}])
+    client.put(f'/api/grants/{duplicate_pair}', json={'status': 'active'})
+    assert DuplicateCandidate.query.count() == 1
+
+def test_merge_keeps_one_grant(client, duplicate_pair):
+    """Test that merging fills gaps on the kept grant and marks the other."""
+    candidate = client.get('/api/grants/duplicates').get_json()['data'][0]
+    response = client.post(f"/api/grants/duplicates/{candidate['id']}/merge", json={'keep_id': candidate['grant_id']})
+    assert response.status_code == 200
+    assert response.get_json()['data']['status'] == 'merged'
+
+    kept = db.session.get(Grant, candidate['grant_id'])
+    assert kept.amount_string == 'Up to $20,000'
+    assert (kept.amount_min, kept.amount_max) == (None, 20000)
+    assert kept.id in [g['id'] for g in client.get('/api/grants?min_amount=15000').get_json()['data']]
+    assert db.session.get(Grant, duplicate_pair).status == 'duplicate'
+    assert client.get('/api/grants/duplicates').get_json()['data'] == []
+    again = client.post(f"/api/grants/duplicates/{candidate['id']}/merge", json={'keep_id': candidate['grant_id']})
+    assert again.status_code == 400
+
+def test_dismiss_and_validation(client, duplicate_pair):
+    """Test dismissing a pair and rejecting invalid merges."""
+    candidate = client.get('/api/grants/duplicates').get_json()['data'][0]
+    bad = client.post(f"/api/grants/duplicates/{candidate['id']}/merge", json={'keep_id': 999})
+    assert bad.status_code == 400
+    assert client.post('/api/grants/duplicates/999/dismiss').status_code == 404
+
+    assert client.post(f"/api/grants/duplicates/{candidate['id']}/dismiss").status_code == 200
+    assert client.get('/api/grants/duplicates').get_json()['data'] == []
+    dismissed = client.get('/api/grants/duplicates?status=dismissed').get_json()['data']
+    assert [c['id'] for c in dismissed] == [candidate['id']]
+
+def test_backfill_signs_existing_grants(app):
+    """Test that rows written without the hook are signed and compared."""
+    db.session.add_all([
+        Grant(name='Regional Arts Fund', funder='Creative Australia', description=DESCRIPTION),
+        Grant(name='Regional Arts Fund', funder='Creative Australia', description=DESCRIPTION + ' statewide'),
+        Grant(name='', funder='')
+    ])
+    db.session.commit()
+    assert backfill_signatures(batch_size=1) == 3
+    assert GrantSignature.query.count() == 2
+    assert DuplicateCandidate.query.count() == 1
+
+def test_hooks_run_after_the_write(tmp_path, make_app, monkeypatch):
+    """Test that, outside testing, duplicate detection runs on the hook thread once writes go quiet."""
+    app = make_app(database_uri=f"sqlite:///{tmp_path / 'hooks.db'}", TESTING=False)
+    threads = []
+    run_deferred_hooks = grant_events.run_deferred_hooks
+
+    def record_thread(grant_ids):
+        threads.append((threading.current_thread().name, grant_ids))
+        run_deferred_hooks(grant_ids)
+
+    monkeypatch.setattr(grant_events, 'run_deferred_hooks', record_thread)
+    monkeypatch.setattr(grant_events, 'HOOK_QUIET_SECONDS', 0.2)
+    with app.app_context():
+        db.create_all()
+        first = upsert_grants([{'name': 'Regional Arts Fund', 'funder': 'Creative Australia',
+                                'source_url': 'a', 'description': DESCRIPTION}])
+        second = upsert_grants([{'name': 'Regional Arts Fund 2025', 'funder': 'Creative Australia',
+                                 'source_url': 'b', 'description': DESCRIPTION}])
+        grant_events.hook_queue.join()
+
+        # Both batches were checked together, off the writer's thread
+        assert threads == [('grant-hooks', [first[0]['id'], second[0]['id']])]
+        assert DuplicateCandidate.query.count() == 1
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.orm import sessionmaker
+from models import db
+from models.change import GrantChange
+from models.grant import Grant
+from models.organisation import OrganisationProfile
+from api import ai_core
+from api.cache_manager import TieredCache
+
+ANALYSIS = {
+    'score': 0.8,
+    'alignment_points': ['Youth arts focus'],
+    'disqualifiers': ['None identified'],
+    'missing_info': ['Project budget'],
+    'criteria': [{'name': 'Location', 'met': True, 'description': 'Regional town'}]
+}
+
+def make_grant(**fields):
+    return Grant(**dict(
+        id=1, org_id=1, name='Regional Arts Fund', funder='Creative Australia',
+        description='Arts programs in regional towns', amount_string='Up to $20,000',
+        due_date=datetime(2025, 6, 30), status='potential'
+    ) | fields)
+
+def make_profile(**fields):
+    return OrganisationProfile(**dict(
+        id=1, name='Outback Arts Collective', mission='Creative opportunities for young people',
+        focus_areas=['Arts', 'Youth'], target_demographics='Young people', annual_revenue=400000,
+        dgr_status=True, profile_text='Twelve years of youth arts programs'
+    ) | fields)
+
+@pytest.fixture
+def blueprints():
+    return []
+
+@pytest.fixture
+def database_uri(tmp_path):
+    """A file database, which the scan reads through its own session."""
+    return f"sqlite:///{tmp_path / 'eligibility.db'}"
+
+@pytest.fixture
+def app(app):
+    """The shared app with a grant and its organisation."""
+    db.session.add_all([make_profile(), make_grant()])
+    db.session.commit()
+    return app
+
+@pytest.fixture
+def scan(app, monkeypatch):
+    """Run scans against the database, counting LLM calls."""
+    state = {'calls': 0}
+
+    class FakeLLM:
+        async def create_message(self, **params):
+            state['calls'] += 1
+            return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(ANALYSIS))])
+
+    monkeypatch.setattr(ai_core, 'cache', TieredCache())
+    monkeypatch.setattr(ai_core, 'get_db_session', sessionmaker(bind=db.engine))
+    monkeypatch.setattr(ai_core, 'llm_client', FakeLLM)
+    state['run'] = lambda: asyncio.run(ai_core.run_eligibility_scan(1))
+    return state
+
+def edit(model, **fields):
+    """Change a stored row, as an edit through the API would."""
+    row = db.session.get(model, 1)
+    for field, value in fields.items():
+        setattr(row, field, value)
+    db.session.commit()
+
+def test_cache_key_follows_prompt_inputs():
+    """Test that the key changes with any prompted field, the model or the prompt version."""
+    key = ai_core.eligibility_cache_key(make_grant(), make_profile())
+    assert key == ai_core.eligibility_cache_key(make_grant(id=2, status='closed'), make_profile(id=9))
+    assert key != ai_core.eligibility_cache_key(make_grant(description='Sport programs'), make_profile())
+    assert key != ai_core.eligibility_cache_key(make_grant(due_date=datetime(2025, 7, 1)), make_profile())
+    assert key != ai_core.eligibility_cache_key(make_grant(), make_profile(annual_revenue=500000))
+
+def test_cache_key_includes_model_and_version(monkeypatch):
+    """Test that a new model or prompt version misses."""
+    key = ai_core.eligibility_cache_key(make_grant(), make_profile())
+    monkeypatch.setattr(ai_core, 'ELIGIBILITY_PROMPT_VERSION', ai_core.ELIGIBILITY_PROMPT_VERSION + 1)
+    assert ai_core.eligibility_cache_key(make_grant(), make_profile()) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(ai_core, 'ELIGIBILITY_MODEL', 'another-model')
+    assert ai_core.eligibility_cache_key(make_grant(), make_profile()) != key
+
+def test_unchanged_inputs_hit_and_edits_miss(scan):
+    """Test that repeating a scan hits the cache and editing an input calls the LLM again."""
+    assert scan['run']()['score'] == 0.8
+    assert scan['run']()['score'] == 0.8
+    assert scan['calls'] == 1
+
+    edit(OrganisationProfile, mission='Music education in remote towns')
+    scan['run']()
+    assert scan['calls'] == 2
+
+    edit(Grant, amount_string='Up to $50,000')
+    scan['run']()
+    scan['run']()
+    assert scan['calls'] == 3
+
+def test_analysis_is_stored_on_the_grant(scan):
+    """Test that a scan's result is saved to the grant's eligibility_analysis and logged as a change."""
+    scan['run']()
+    db.session.expire_all()
+    grant = db.session.get(Grant, 1)
+    assert grant.eligibility_analysis['score'] == 0.8
+    assert grant.eligibility_analysis['criteria'][0]['name'] == 'Location'
+    assert [(c.grant_id, c.operation) for c in GrantChange.query] == [(1, 'updated')]
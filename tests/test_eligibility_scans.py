@@ -0,0 +1,193 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from models import db
+from models.grant import Grant
+from models.organisation import OrganisationProfile
+from api.eligibility_api import eligibility_bp
+from api.grants_api import grants_bp
+from api import ai_core, eligibility_scans
+from api.cache_manager import TieredCache
+
+@pytest.fixture
+def blueprints():
+    return [grants_bp, eligibility_bp]
+
+@pytest.fixture
+def database_uri(tmp_path):
+    """A file database, shared with the scan thread."""
+    return f"sqlite:///{tmp_path / 'scans.db'}"
+
+@pytest.fixture
+def app(app):
+    """The shared app with an organisation and 20 grants."""
+    db.session.add(OrganisationProfile(id=1, name='Outback Arts Collective'))
+    db.session.add_all([
+        Grant(id=i, name=f'Grant {i}', funder='Lotterywest' if i % 2 else 'Creative Australia',
+              status='potential')
+        for i in range(1, 21)
+    ])
+    db.session.commit()
+    return app
+
+@pytest.fixture
+def fake_scan(monkeypatch):
+    """Replace the LLM-backed scan: score by grant id, fail grant 13, track concurrency."""
+    state = {'running': 0, 'peak': 0, 'calls': []}
+
+    async def scan(grant, org_profile):
+        grant_id = grant.id
+        state['calls'].append((grant_id, org_profile.id))
+        state['running'] += 1
+        state['peak'] = max(state['peak'], state['running'])
+        try:
+            await asyncio.sleep(0.01)
+            if grant_id == 13:
+                raise Exception('Invalid AI response format')
+            return {'score': grant_id / 100, 'alignment_points': ['Arts focus']}
+        finally:
+            state['running'] -= 1
+
+    monkeypatch.setattr(eligibility_scans, 'analyze_eligibility', scan)
+    return state
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Keep the real ``analyze_eligibility``, answering its LLM calls with a valid analysis."""
+    prompts = []
+
+    class FakeLLM:
+        def __init__(self, *args):
+            pass
+
+        async def create_message(self, **params):
+            prompts.append(params['messages'][0]['content'])
+            return SimpleNamespace(content=[SimpleNamespace(text=json.dumps({
+                'score': 0.7,
+                'alignment_points': ['Arts focus'],
+                'disqualifiers': ['None identified'],
+                'missing_info': ['Project budget'],
+                'criteria': [{'name': 'Location', 'met': True, 'description': 'Regional town'}]
+            }))])
+
+    monkeypatch.setattr(ai_core, 'cache', TieredCache())
+    monkeypatch.setattr(ai_core, 'llm_client', FakeLLM)
+    monkeypatch.setattr(eligibility_scans, 'llm_client', FakeLLM)
+    return prompts
+
+def wait_for(client, scan_id, **params):
+    """Poll a scan until it completes."""
+    deadline = time.time() + 10
+    while True:
+        body = client.get(f'/api/orgs/1/eligibility-scan/{scan_id}', query_string=params).get_json()
+        if body['scan']['status'] == 'completed' or time.time() > deadline:
+            return body
+        time.sleep(0.02)
+
+class TestEligibilityScans:
+    def test_scan_grant_ids(self, client, fake_scan):
+        """Test that a scan covers the given grants and ranks results by score."""
+        response = client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': [3, 5, 13, 999, 5]})
+        assert response.status_code == 202
+        scan = response.get_json()['data']
+        assert scan['total'] == 3
+
+        body = wait_for(client, scan['id'])
+        assert body['scan']['completed'] == 2
+        assert body['scan']['failed'] == 1
+        assert body['scan']['finished_at'] is not None
+        assert [result['grant_id'] for result in body['data']] == [5, 3]
+        assert body['data'][0]['analysis']['alignment_points'] == ['Arts focus']
+        assert sorted(fake_scan['calls']) == [(3, 1), (5, 1), (13, 1)]
+
+        failed = client.get(f"/api/orgs/1/eligibility-scan/{scan['id']}?status=failed").get_json()
+        assert [(r['grant_id'], r['error']) for r in failed['data']] == [(13, 'Invalid AI response format')]
+
+    def test_scan_filter_with_bounded_concurrency(self, client, fake_scan):
+        """Test that a filtered scan runs at most ``concurrency`` analyses at once."""
+        response = client.post('/api/orgs/1/eligibility-scan?funder=Lotterywest', json={'concurrency': 3})
+        assert response.status_code == 202
+        scan_id = response.get_json()['data']['id']
+
+        body = wait_for(client, scan_id, limit=4)
+        assert body['scan']['total'] == 10
+        assert fake_scan['peak'] == 3
+        assert [result['grant_id'] for result in body['data']] == [19, 17, 15, 11]
+
+        rest = client.get(f"/api/orgs/1/eligibility-scan/{scan_id}?limit=4&cursor={body['next_cursor']}").get_json()
+        assert [result['grant_id'] for result in rest['data']] == [9, 7, 5, 3]
+
+    def test_real_analysis_with_profile_model(self, app, client, llm):
+        """Test that the real analysis runs against the organisation profile model."""
+        with app.app_context():
+            profile = db.session.get(OrganisationProfile, 1)
+            profile.mission = 'Creative opportunities for young people'
+            profile.focus_areas = ['Arts', 'Youth']
+            db.session.commit()
+
+        scan_id = client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': [1, 2]}).get_json()['data']['id']
+        body = wait_for(client, scan_id)
+        assert body['scan']['completed'] == 2
+        assert body['scan']['failed'] == 0
+        assert [result['analysis']['score'] for result in body['data']] == [0.7, 0.7]
+        assert len(llm) == 2
+        assert '- Focus Areas: Arts, Youth' in llm[0]
+        assert '- Annual Revenue: Not provided' in llm[0]
+
+    def test_scan_reads_grants_once(self, client, fake_scan, monkeypatch):
+        """Test that a scan loads its grants up front instead of opening a session per grant."""
+        def no_session():
+            raise AssertionError('scans should not open their own sessions')
+
+        monkeypatch.setattr(ai_core, 'get_db_session', no_session)
+        scan_id = client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': [1, 2, 3, 4]}).get_json()['data']['id']
+        body = wait_for(client, scan_id)
+        assert body['scan']['completed'] == 4
+        assert sorted(fake_scan['calls']) == [(1, 1), (2, 1), (3, 1), (4, 1)]
+
+    def test_partial_results(self, app, client):
+        """Test that finished results are visible while the rest are pending."""
+        with app.app_context():
+            scan = eligibility_scans.EligibilityScan(org_id=1, status='running', concurrency=2, total=2)
+            db.session.add(scan)
+            db.session.flush()
+            db.session.add_all([
+                eligibility_scans.EligibilityScanResult(scan_id=scan.id, grant_id=1, status='pending'),
+                eligibility_scans.EligibilityScanResult(scan_id=scan.id, grant_id=2, status='pending')
+            ])
+            db.session.commit()
+            scan_id = scan.id
+        eligibility_scans.record_result(app, scan_id, 2, {'score': 0.7}, None)
+
+        body = client.get(f'/api/orgs/1/eligibility-scan/{scan_id}').get_json()
+        assert body['scan']['status'] == 'running'
+        assert body['scan']['completed'] == 1
+        assert [result['grant_id'] for result in body['data']] == [2]
+        pending = client.get(f'/api/orgs/1/eligibility-scan/{scan_id}?status=pending').get_json()
+        assert [result['grant_id'] for result in pending['data']] == [1]
+
+    def test_invalid_requests(self, client, fake_scan):
+        """Test validation of the organisation, grants and concurrency."""
+        assert client.post('/api/orgs/2/eligibility-scan', json={'grant_ids': [1]}).status_code == 404
+        assert client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': []}).status_code == 400
+        assert client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': ['x']}).status_code == 400
+        assert client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': [999]}).status_code == 400
+        assert client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': [1], 'concurrency': 0}).status_code == 400
+        assert client.post('/api/orgs/1/eligibility-scan?funder=Nobody').status_code == 400
+        assert client.get('/api/orgs/1/eligibility-scan/999').status_code == 404
+        assert fake_scan['calls'] == []
+
+    def test_unexpected_errors(self, client, fake_scan, monkeypatch):
+        """Test that an unexpected failure reading a scan is a 500 response."""
+        scan_id = client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': [1]}).get_json()['data']['id']
+        wait_for(client, scan_id)
+
+        def broken(self):
+            raise RuntimeError('boom')
+
+        monkeypatch.setattr(eligibility_scans.EligibilityScanResult, 'to_dict', broken)
+        response = client.get(f'/api/orgs/1/eligibility-scan/{scan_id}')
+        assert response.status_code == 500
+        assert response.get_json() == {'success': False, 'error': 'Failed to fetch eligibility scan'}
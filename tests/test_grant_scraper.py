@@ -0,0 +1,55 @@
+import pytest
+from models import db
+from models.change import GrantChange
+from models.grant import Grant
+from models.saved_search import Notification, SavedSearch
+from scrapers import grant_scraper
+from scrapers.grant_scraper import GrantScraper
+
+SCRAPED = [
+    {'title': 'Regional Arts Fund', 'funder': 'Creative Australia', 'description': 'Arts in regional towns',
+     'amount_range': {'max': 20000.0}, 'due_date': '2025-06-30T00:00:00',
+     'source_url': 'https://www.grants.gov.au/Go/Show?GoUuid=1'},
+    {'title': 'Community Health Grants', 'funder': 'Department of Health', 'description': None,
+     'amount_range': {'description': 'varies'}, 'due_date': None,
+     'source_url': 'https://www.grants.gov.au/Go/Show?GoUuid=2'}
+]
+
+@pytest.fixture
+def blueprints():
+    return []
+
+@pytest.fixture
+def scraped(monkeypatch):
+    """Serve the scraped listings above instead of fetching the sources."""
+    monkeypatch.setattr(GrantScraper, 'scrape_grants_gov_au', lambda self: [dict(grant) for grant in SCRAPED])
+    return SCRAPED
+
+def test_main_upserts_into_the_app_database(app, scraped):
+    """Test that a scraper run writes through bulk ingest, the change log and the write hooks."""
+    db.session.add(SavedSearch(name='Arts', user_id=1, keyword='regional arts'))
+    db.session.commit()
+
+    results = grant_scraper.main(app)
+    assert [result['status'] for result in results] == ['created', 'created']
+    grant = Grant.query.filter_by(source_url=scraped[0]['source_url']).one()
+    assert (grant.name, grant.amount_string, grant.amount_min, grant.amount_max) == \
+        ('Regional Arts Fund', 'Up to $20,000', None, 20000)
+    assert grant.last_scraped_at is not None
+    assert Grant.query.filter_by(source_url=scraped[1]['source_url']).one().amount_string == 'varies'
+    assert GrantChange.query.count() == 2
+    assert [n.grant_id for n in Notification.query] == [grant.id]
+
+    # A second run updates the same rows
+    assert [result['status'] for result in grant_scraper.main(app)] == ['updated', 'updated']
+    assert Grant.query.count() == 2
+
+def test_parse_amount_shares_the_ingest_parser():
+    """Test that scraped amounts parse as ingest parses amount_string."""
+    scraper = GrantScraper()
+    assert scraper.parse_amount('$5,000 - $20,000') == {'min': 5000, 'max': 20000}
+    assert scraper.parse_amount('Up to $10k') == {'max': 10000}
+    assert scraper.parse_amount('$75,000') == {'fixed': 75000}
+    assert scraper.parse_amount('From $1 million') == {'min': 1_000_000}
+    assert scraper.parse_amount('Varies') == {'description': 'varies'}
+    assert scraper.format_amount(scraper.parse_amount('From $1 million')) == 'From $1,000,000'
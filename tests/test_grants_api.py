@@ -0,0 +1,1012 @@
+import pytest
+import csv
+import fnmatch
+import time
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+from flask import Flask, Response
+from sqlalchemy import event
+from models import db
+from models.grant import Grant
+from api.grants_api import grants_bp
+from api.pagination import encode_cursor, decode_cursor, InvalidCursorError
+from api.export import iter_csv, iter_ndjson
+from api.search_index import create_search_index, to_match_expression
+from api.http_cache import set_validators
+from api.middleware import setup_compression, setup_security_headers
+from api.ingest import upsert_grants
+from api.cache_manager import TieredCache, cache
+from api.fuzzy import similarity
+from api.amounts import backfill_amounts
+from api import fuzzy, grant_events, grants_api, response_cache
+from api.rows import row_encoder
+from api.changes import record_changes
+from api.deadlines import deadline_index
+from api.suggest import suggest_index
+
+@pytest.fixture
+def sample_grants(app):
+    """Insert grants with a mix of due dates, including missing ones."""
+    base = datetime(2025, 1, 1)
+    grants = []
+    for i in range(7):
+        grants.append(Grant(
+            name=f"Grant {i}",
+            funder='Arts Council' if i % 2 else 'Health Fund',
+            due_date=base + timedelta(days=i // 2) if i < 5 else None,
+            status='potential' if i % 3 else 'active',
+            description=f"Community program number {i}"
+        ))
+    db.session.add_all(grants)
+    db.session.commit()
+    return grants
+
+def collect_pages(client, url, limit):
+    """Follow next_cursor links until exhausted and return all ids."""
+    ids, cursor = [], None
+    while True:
+        query = f"{url}{'&' if '?' in url else '?'}limit={limit}"
+        if cursor:
+            query += f"&cursor={cursor}"
+        body = client.get(query).get_json()
+        assert body['success'] is True
+        assert len(body['data']) <= limit
+        ids.extend(g['id'] for g in body['data'])
+        cursor = body['next_cursor']
+        if not cursor:
+            return ids
+
+class TestPagination:
+    """Test suite for keyset pagination on listing endpoints."""
+
+    def test_cursor_round_trip(self):
+        """Test that cursors decode to the values they were built from."""
+        due = datetime(2025, 3, 4, 5, 6)
+        assert decode_cursor(encode_cursor(due, 42)) == (due, 42)
+        assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+    def test_invalid_cursor(self):
+        """Test that garbage cursors are rejected."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor('not-a-cursor')
+
+    def test_pages_cover_all_rows_in_order(self, client, sample_grants):
+        """Test that walking every page yields each grant exactly once, nulls last."""
+        ids = collect_pages(client, '/api/grants', limit=2)
+        expected = sorted(
+            sample_grants,
+            key=lambda g: (g.due_date is None, g.due_date or datetime.min, g.id)
+        )
+        assert ids == [g.id for g in expected]
+
+    def test_filtered_pages(self, client, sample_grants):
+        """Test that filters are preserved across pages."""
+        ids = collect_pages(client, '/api/grants?funder=Arts%20Council', limit=1)
+        assert sorted(ids) == sorted(g.id for g in sample_grants if g.funder == 'Arts Council')
+
+    def test_count_is_optional(self, client, sample_grants):
+        """Test that the total count is only computed on request."""
+        body = client.get('/api/grants?limit=2').get_json()
+        assert 'count' not in body
+        body = client.get('/api/grants?limit=2&include_count=true').get_json()
+        assert body['count'] == len(sample_grants)
+        assert len(body['data']) == 2
+
+    def test_search_pages(self, client, sample_grants):
+        """Test that search results are paginated."""
+        ids = collect_pages(client, '/api/grants/search?min_date=2025-01-02', limit=2)
+        assert sorted(ids) == sorted(
+            g.id for g in sample_grants if g.due_date and g.due_date >= datetime(2025, 1, 2)
+        )
+
+    def test_bad_parameters(self, client, sample_grants):
+        """Test that invalid limit and cursor values return 400."""
+        assert client.get('/api/grants?limit=0').status_code == 400
+        assert client.get('/api/grants?limit=abc').status_code == 400
+        assert client.get('/api/grants?cursor=bogus').status_code == 400
+        assert client.get('/api/grants/search?cursor=bogus').status_code == 400
+
+class TestExport:
+    """Test suite for the streaming export endpoint."""
+
+    def test_ndjson_export(self, client, sample_grants):
+        """Test that NDJSON export emits one JSON object per grant."""
+        response = client.get('/api/grants/export?format=ndjson')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+        lines = response.get_data(as_text=True).splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r['id'] for r in records] == sorted(g.id for g in sample_grants)
+
+    def test_csv_export_with_filter(self, client, sample_grants):
+        """Test that CSV export has a header and honours listing filters."""
+        response = client.get('/api/grants/export?format=csv&status=active')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [int(r['id']) for r in rows] == sorted(g.id for g in sample_grants if g.status == 'active')
+        assert rows[0]['funder'] == 'Health Fund'
+
+    def test_export_chunks_by_batch(self):
+        """Test that streamed output is split into batches of rows."""
+        records = [{'id': i, 'name': f'g{i}'} for i in range(5)]
+        assert len(list(iter_ndjson(records, batch_size=2))) == 3
+        # Header chunk plus three row chunks
+        assert len(list(iter_csv(records, batch_size=2))) == 4
+
+    def test_unknown_format(self, client):
+        """Test that unsupported formats are rejected."""
+        assert client.get('/api/grants/export?format=xml').status_code == 400
+
+class TestFullTextSearch:
+    """Test suite for the ranked full-text search path."""
+
+    @pytest.fixture
+    def indexed(self, app, sample_grants):
+        with db.engine.begin() as conn:
+            create_search_index(conn)
+        return sample_grants
+
+    def test_match_expression_quotes_terms(self):
+        """Test that user input cannot inject FTS5 query syntax."""
+        assert to_match_expression('arts OR "health"*') == '"arts" "or" "health"'
+        assert to_match_expression('  --  ') is None
+
+    def test_ranked_results_with_snippets(self, client, indexed):
+        """Test that name matches outrank description-only matches."""
+        db.session.add(Grant(name='Regional Arts Program', funder='Other', description='Funding'))
+        db.session.add(Grant(name='Misc', funder='Other', description='Includes a regional component'))
+        db.session.commit()
+
+        body = client.get('/api/grants/search?keyword=regional').get_json()
+        names = [g['name'] for g in body['data']]
+        assert names == ['Regional Arts Program', 'Misc']
+        assert body['data'][0]['score'] > body['data'][1]['score']
+        assert '<mark>' in body['data'][0]['snippet']
+
+    def test_index_follows_updates(self, client, indexed):
+        """Test that triggers keep the index in sync with writes."""
+        grant = indexed[0]
+        assert client.get('/api/grants/search?keyword=philanthropy').get_json()['data'] == []
+        response = client.put(f'/api/grants/{grant.id}', json={'description': 'Philanthropy matched funding'})
+        assert response.status_code == 200
+        body = client.get('/api/grants/search?keyword=philanthropy').get_json()
+        assert [g['id'] for g in body['data']] == [grant.id]
+
+    def test_ranked_pagination_and_date_filter(self, client, indexed):
+        """Test that ranked results page through every match and respect date filters."""
+        ids = collect_pages(client, '/api/grants/search?keyword=community', limit=3)
+        assert sorted(ids) == sorted(g.id for g in indexed)
+        ids = collect_pages(client, '/api/grants/search?keyword=community&max_date=2025-01-01', limit=3)
+        assert sorted(ids) == sorted(
+            g.id for g in indexed if g.due_date and g.due_date <= datetime(2025, 1, 1)
+        )
+
+    def test_date_cursor_rejected_for_ranked_search(self, client, indexed):
+        """Test that cursors from a different ordering are rejected."""
+        cursor = encode_cursor(None, 1)
+        response = client.get(f'/api/grants/search?keyword=community&cursor={cursor}')
+        assert response.status_code == 400
+
+class TestConditionalRequests:
+    """Test suite for ETag / Last-Modified support on grant reads."""
+
+    def test_grant_etag_round_trip(self, client, sample_grants):
+        """Test that a matching If-None-Match returns an empty 304."""
+        grant = sample_grants[0]
+        first = client.get(f'/api/grants/{grant.id}')
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+        etag = first.headers['ETag']
+
+        second = client.get(f'/api/grants/{grant.id}', headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.get_data() == b''
+        assert second.headers['ETag'] == etag
+
+    def test_grant_etag_changes_on_update(self, client, sample_grants):
+        """Test that an update invalidates the previous ETag."""
+        grant = sample_grants[0]
+        etag = client.get(f'/api/grants/{grant.id}').headers['ETag']
+        client.put(f'/api/grants/{grant.id}', json={'status': 'closed'})
+        response = client.get(f'/api/grants/{grant.id}', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['data']['status'] == 'closed'
+
+    def test_grant_if_modified_since(self, client, sample_grants):
+        """Test that If-Modified-Since is honoured when no ETag is sent."""
+        grant = sample_grants[0]
+        last_modified = client.get(f'/api/grants/{grant.id}').headers['Last-Modified']
+        response = client.get(f'/api/grants/{grant.id}', headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+        response = client.get(
+            f'/api/grants/{grant.id}',
+            headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'}
+        )
+        assert response.status_code == 200
+
+    def test_list_etag_tracks_collection_and_query(self, client, sample_grants):
+        """Test that listing ETags depend on both the query and the data."""
+        etag = client.get('/api/grants?limit=2').headers['ETag']
+        assert client.get('/api/grants?limit=2', headers={'If-None-Match': etag}).status_code == 304
+        assert client.get('/api/grants?limit=3', headers={'If-None-Match': etag}).status_code == 200
+
+        client.post('/api/grants', json={'name': 'New grant', 'funder': 'Arts Council'})
+        assert client.get('/api/grants?limit=2', headers={'If-None-Match': etag}).status_code == 200
+
+    def test_security_headers_respect_route_policy(self):
+        """Test that no-store is only applied when the route sets no policy."""
+        app = Flask(__name__)
+        setup_security_headers(app)
+
+        @app.route('/plain')
+        def plain():
+            return 'ok'
+
+        @app.route('/cached')
+        def cached_view():
+            return set_validators(Response('ok'), 'abc')
+
+        client = app.test_client()
+        assert client.get('/plain').headers['Cache-Control'].startswith('no-store')
+        response = client.get('/cached')
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+        assert 'Pragma' not in response.headers
+
+class TestSparseFieldsets:
+    """Test suite for the fields= projection parameter."""
+
+    @pytest.fixture
+    def statements(self, app):
+        """Capture SQL statements sent to the database."""
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            captured.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        yield captured
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    def test_list_returns_only_requested_fields(self, client, sample_grants, statements):
+        """Test that both the SQL and the payload are narrowed."""
+        body = client.get('/api/grants?fields=name,funder,due_date,status').get_json()
+        assert set(body['data'][0]) == {'id', 'name', 'funder', 'due_date', 'status'}
+        page_query = [s for s in statements if 'LIMIT' in s][-1]
+        assert 'grants.description' not in page_query
+        assert 'grants.eligibility_analysis' not in page_query
+        assert not any('grants.description' in s for s in statements)
+
+    def test_search_returns_only_requested_fields(self, client, sample_grants):
+        """Test that search honours the fieldset."""
+        body = client.get('/api/grants/search?min_date=2025-01-01&fields=name').get_json()
+        assert all(set(g) == {'id', 'name'} for g in body['data'])
+
+    def test_unknown_field_rejected(self, client, sample_grants):
+        """Test that unknown field names return 400."""
+        response = client.get('/api/grants?fields=name,password_hash')
+        assert response.status_code == 400
+        assert 'password_hash' in response.get_json()['error']
+
+    def test_default_is_all_fields(self, client, sample_grants):
+        """Test that omitting fields keeps the full representation."""
+        body = client.get('/api/grants?limit=1').get_json()
+        assert set(body['data'][0]) == set(Grant.SERIALIZED_FIELDS)
+
+class TestBulkUpsert:
+    """Test suite for the bulk create/upsert endpoint."""
+
+    def test_bulk_create_and_update(self, client, app):
+        """Test that rows are created, then updated on the same source_url."""
+        rows = [
+            {'name': f'Grant {i}', 'funder': 'Funder', 'source_url': f'https://example.org/{i}'}
+            for i in range(3)
+        ]
+        body = client.post('/api/grants/bulk', json=rows).get_json()
+        assert body['success'] is True
+        assert body['data']['summary']['created'] == 3
+        ids = [r['id'] for r in body['data']['results']]
+
+        client.put(f'/api/grants/{ids[0]}', json={'status': 'applied'})
+        rows[0]['name'] = 'Renamed'
+        body = client.post('/api/grants/bulk', json=rows[:1]).get_json()
+        assert body['data']['results'] == [{'index': 0, 'id': ids[0], 'status': 'updated'}]
+
+        grant = db.session.get(Grant, ids[0])
+        db.session.refresh(grant)
+        assert grant.name == 'Renamed'
+        # Omitted optional fields keep their stored values
+        assert grant.status == 'applied'
+        assert Grant.query.count() == 3
+
+    def test_bulk_ndjson_with_invalid_rows(self, client, app):
+        """Test NDJSON input with per-row validation errors and duplicates."""
+        lines = [
+            {'name': 'A', 'funder': 'F', 'source_url': 'https://example.org/a'},
+            {'name': 'Missing funder'},
+            {'name': 'B', 'funder': 'F', 'due_date': 'not a date'},
+            {'name': 'A2', 'funder': 'F', 'source_url': 'https://example.org/a'},
+            {'name': 'No URL', 'funder': 'F', 'due_date': '2025-06-30'}
+        ]
+        body = client.post(
+            '/api/grants/bulk',
+            data='\n'.join(json.dumps(line) for line in lines),
+            content_type='application/x-ndjson'
+        ).get_json()
+        statuses = [r['status'] for r in body['data']['results']]
+        assert statuses == ['skipped', 'error', 'error', 'created', 'created']
+        assert body['data']['results'][1]['error'] == 'Missing required field: funder'
+        assert body['success'] is False
+        assert sorted(g.name for g in Grant.query.all()) == ['A2', 'No URL']
+
+    def test_bulk_rejects_non_list(self, client):
+        """Test that the body must be a list of grants."""
+        assert client.post('/api/grants/bulk', json={'name': 'x'}).status_code == 400
+        response = client.post('/api/grants/bulk', data='{bad', content_type='application/x-ndjson')
+        assert response.status_code == 400
+
+    def test_upsert_grants_batches(self, app):
+        """Test that ingest splits work into batches and keeps result order."""
+        records = [{'name': f'G{i}', 'funder': 'F', 'source_url': f'u{i}'} for i in range(5)]
+        results = upsert_grants(records, batch_size=2)
+        assert [r['status'] for r in results] == ['created'] * 5
+        assert [db.session.get(Grant, r['id']).name for r in results] == [f'G{i}' for i in range(5)]
+
+class TestFacets:
+    """Test suite for faceted counts."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache._memory_cache.clear()
+        yield
+        cache._memory_cache.clear()
+
+    def test_facet_counts(self, client, sample_grants):
+        """Test counts per status, funder and due month."""
+        body = client.get('/api/grants/facets').get_json()
+        assert body['success'] is True
+        facets = body['data']
+        assert facets['total'] == 7
+        assert facets['status'] == [
+            {'value': 'potential', 'count': 4},
+            {'value': 'active', 'count': 3}
+        ]
+        assert {f['value']: f['count'] for f in facets['funder']} == {'Health Fund': 4, 'Arts Council': 3}
+        assert facets['due_month'] == [
+            {'value': '2025-01', 'count': 5},
+            {'value': None, 'count': 2}
+        ]
+
+    def test_facets_respect_filters(self, client, app, sample_grants):
+        """Test that keyword and date filters narrow every facet."""
+        facets = client.get('/api/grants/facets?min_date=2025-01-02').get_json()['data']
+        assert facets['total'] == 3
+        assert sum(f['count'] for f in facets['status']) == 3
+
+        facets = client.get('/api/grants/facets?keyword=number 3').get_json()['data']
+        assert facets['total'] == 1
+        assert facets['funder'] == [{'value': 'Arts Council', 'count': 1}]
+
+        with db.engine.begin() as conn:
+            create_search_index(conn)
+        facets = client.get('/api/grants/facets?keyword=program number 4').get_json()['data']
+        assert facets['total'] == 1
+        assert facets['status'] == [{'value': 'potential', 'count': 1}]
+        assert client.get('/api/grants/facets?min_date=bad').status_code == 400
+
+    def test_facets_match_search_filters(self, client, sample_grants):
+        """Test that amount and fuzzy filters narrow facets as they narrow search."""
+        for i, grant in enumerate(sample_grants):
+            grant.amount_min, grant.amount_max = i * 1000, i * 1000
+        db.session.commit()
+        for query in ('min_amount=4000', 'max_amount=2000', 'keyword=grnt&fuzzy=true&min_date=2025-01-02'):
+            search = client.get(f'/api/grants/search?{query}&include_count=true').get_json()
+            facets = client.get(f'/api/grants/facets?{query}').get_json()['data']
+            assert facets['total'] == search['count'] > 0
+        assert client.get('/api/grants/facets?keyword=grnt').get_json()['data']['total'] == 0
+        assert client.get('/api/grants/facets?min_amount=10&max_amount=5').status_code == 400
+
+    def test_facets_cached_until_write(self, client, sample_grants):
+        """Test that facets are served from cache and invalidated by writes."""
+        assert client.get('/api/grants/facets').get_json()['data']['total'] == 7
+        Grant.query.filter_by(name='Grant 0').delete()
+        db.session.commit()
+        # Direct deletes bypass the API, so the cached counts are still served
+        assert client.get('/api/grants/facets').get_json()['data']['total'] == 7
+
+        client.post('/api/grants', json={'name': 'New', 'funder': 'Health Fund'})
+        assert client.get('/api/grants/facets').get_json()['data']['total'] == 7
+
+        client.post('/api/grants/bulk', json=[{'name': 'Bulk', 'funder': 'F', 'source_url': 'u1'}])
+        assert client.get('/api/grants/facets').get_json()['data']['total'] == 8
+
+class SharedRedis:
+    """The subset of a Redis client the tiered cache uses, shared between workers."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def pttl(self, key):
+        return -1 if key in self.values else -2
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.values) if fnmatch.fnmatchcase(key, match)]
+
+def test_facets_across_workers(tmp_path, make_app, monkeypatch):
+    """Test that a worker's copy of Redis facets expires after a write through another worker."""
+    redis_client = SharedRedis()
+    workers = []
+    for _ in range(2):
+        app = make_app(grants_bp, database_uri=f"sqlite:///{tmp_path / 'shared.db'}")
+        worker_cache = TieredCache()
+        worker_cache._redis_client = redis_client
+        workers.append((app, worker_cache))
+    monkeypatch.setattr(grants_api, 'FACET_MEMORY_TTL', 0.2)
+
+    def request(worker, method, url, **kwargs):
+        app, worker_cache = worker
+        for module in (grants_api, grant_events, response_cache):
+            monkeypatch.setattr(module, 'cache', worker_cache)
+        return getattr(app.test_client(), method)(url, **kwargs).get_json()
+
+    writer, reader = workers
+    with writer[0].app_context():
+        db.create_all()
+    request(writer, 'post', '/api/grants', json={'name': 'First', 'funder': 'F'})
+    assert request(writer, 'get', '/api/grants/facets')['data']['total'] == 1
+    # Served from Redis, then from the reader's own copy
+    assert request(reader, 'get', '/api/grants/facets')['data']['total'] == 1
+
+    request(writer, 'post', '/api/grants/bulk', json=[{'name': 'Second', 'funder': 'F', 'source_url': 'u1'}])
+    time.sleep(0.25)
+    assert request(reader, 'get', '/api/grants/facets')['data']['total'] == 2
+
+class TestResponseCache:
+    """Test suite for read-through caching of grant read responses."""
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, app):
+        app.config['RESPONSE_CACHE_ROUTES'] = {'get_grant': True, 'get_grants': True, 'search_grants': True}
+        cache._memory_cache.clear()
+        yield
+        cache._memory_cache.clear()
+
+    @pytest.fixture
+    def statements(self, app):
+        captured = []
+        def capture(conn, cursor, statement, *args):
+            captured.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        yield captured
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    def test_repeat_reads_skip_database(self, client, sample_grants, statements):
+        """Test that cached responses and revalidations issue no queries."""
+        grant_id = sample_grants[0].id
+        for url in (f'/api/grants/{grant_id}', '/api/grants?limit=3', '/api/grants/search?keyword=program'):
+            first = client.get(url)
+            statements.clear()
+            second = client.get(url)
+            assert statements == []
+            assert second.get_json() == first.get_json()
+            assert second.headers.get('ETag') == first.headers.get('ETag')
+
+        etag = client.get('/api/grants?limit=3').headers['ETag']
+        revalidated = client.get('/api/grants?limit=3', headers={'If-None-Match': etag})
+        assert revalidated.status_code == 304
+        assert statements == []
+
+    def test_writes_invalidate(self, client, sample_grants):
+        """Test that API writes and ingest drop grant, listing and search entries."""
+        grant_id = sample_grants[0].id
+        client.get(f'/api/grants/{grant_id}')
+        client.get('/api/grants?limit=10')
+        client.put(f'/api/grants/{grant_id}', json={'name': 'Renamed'})
+        assert client.get(f'/api/grants/{grant_id}').get_json()['data']['name'] == 'Renamed'
+        assert 'Renamed' in [g['name'] for g in client.get('/api/grants?limit=10').get_json()['data']]
+
+        assert client.get('/api/grants/search?keyword=fresh').get_json()['data'] == []
+        upsert_grants([{'name': 'Fresh', 'funder': 'F', 'source_url': 'u1'}])
+        assert len(client.get('/api/grants/search?keyword=fresh').get_json()['data']) == 1
+
+    def test_route_switch(self, client, app, sample_grants, statements):
+        """Test that a disabled route always renders from the database."""
+        app.config['RESPONSE_CACHE_ROUTES']['get_grants'] = False
+        client.get('/api/grants?limit=3')
+        statements.clear()
+        client.get('/api/grants?limit=3')
+        assert statements
+
+class TestCompression:
+    """Test suite for response compression."""
+
+    @pytest.fixture
+    def client(self, app):
+        setup_compression(app)
+        app.config['COMPRESSION_MIN_SIZE'] = 512
+        return app.test_client()
+
+    @pytest.fixture
+    def many_grants(self, app):
+        db.session.add_all([
+            Grant(name=f'Grant {i}', funder='Arts Council', description='Community arts program ' * 5)
+            for i in range(30)
+        ])
+        db.session.commit()
+
+    def test_large_json_is_gzipped(self, client, many_grants):
+        """Test that large listings are gzipped with a weak validator."""
+        plain = client.get('/api/grants?limit=30')
+        response = client.get('/api/grants?limit=30', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+        assert len(response.data) < len(plain.data) / 3
+        assert response.headers['ETag'] == f"W/{plain.headers['ETag']}"
+        revalidated = client.get('/api/grants?limit=30', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']
+        })
+        assert revalidated.status_code == 304
+
+    def test_small_or_unaccepted_bodies_are_plain(self, client, many_grants):
+        """Test the size threshold and Accept-Encoding negotiation."""
+        small = client.get('/api/grants/1', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in small.headers
+        refused = client.get('/api/grants?limit=30', headers={'Accept-Encoding': 'gzip;q=0'})
+        assert 'Content-Encoding' not in refused.headers
+        assert 'Content-Encoding' not in client.get('/api/grants?limit=30').headers
+
+    def test_streamed_export_is_compressed(self, client, many_grants):
+        """Test that generator responses are compressed as they stream."""
+        response = client.get('/api/grants/export?format=ndjson', headers={'Accept-Encoding': 'gzip'})
+        assert response.is_streamed
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        lines = gzip.decompress(response.data).decode().splitlines()
+        assert len(lines) == 30
+
+    def test_cached_responses_reuse_compressed_bytes(self, client, app, many_grants, monkeypatch):
+        """Test that cache hits serve stored compressed bytes without recompressing."""
+        calls = []
+        original = response_cache.compress
+        monkeypatch.setattr(response_cache, 'compress', lambda *a: calls.append(a) or original(*a))
+        app.config['RESPONSE_CACHE_ROUTES'] = {'search_grants': True}
+        cache._memory_cache.clear()
+        try:
+            url = '/api/grants/search?keyword=community&limit=30'
+            bodies = [
+                client.get(url, headers={'Accept-Encoding': 'gzip'}).data
+                for _ in range(3)
+            ]
+            assert len(calls) == 1
+            assert bodies[0] == bodies[1] == bodies[2]
+            assert len(json.loads(gzip.decompress(bodies[2]))['data']) == 30
+        finally:
+            cache._memory_cache.clear()
+
+    def test_encoding_does_not_modify_shared_entry(self, client, app, many_grants):
+        """Test that adding a compressed variant stores a copy rather than editing the cached entry."""
+        app.config['RESPONSE_CACHE_ROUTES'] = {'search_grants': True}
+        cache._memory_cache.clear()
+        try:
+            url = '/api/grants/search?keyword=community&limit=30'
+            client.get(url)
+            (key, entry), = cache._memory_cache.items()
+            assert 'encoded' not in entry
+
+            body = client.get(url, headers={'Accept-Encoding': 'gzip'}).data
+            assert 'encoded' not in entry
+            assert set(cache._memory_cache[key]['encoded']) == {'gzip'}
+            assert len(json.loads(gzip.decompress(body))['data']) == 30
+        finally:
+            cache._memory_cache.clear()
+
+class TestDeadlines:
+    """Test suite for the deadline calendar."""
+
+    @pytest.fixture
+    def due_grants(self, app):
+        today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+        offsets = {'past': -2, 'soon': 1, 'next': 3, 'later': 10, 'far': 40}
+        grants = {
+            name: Grant(name=name, funder='F', due_date=today + timedelta(days=days),
+                        status='active' if days % 2 else 'potential')
+            for name, days in offsets.items()
+        }
+        grants['undated'] = Grant(name='undated', funder='F')
+        db.session.add_all(grants.values())
+        db.session.commit()
+        return grants
+
+    def calendar(self, client, horizon):
+        body = client.get(f'/api/grants/deadlines?horizon={horizon}').get_json()
+        assert body['success'] is True
+        return body['data']
+
+    def names(self, data):
+        return sorted(
+            grant['name']
+            for week in data['weeks']
+            for grants in week['statuses'].values()
+            for grant in grants
+        )
+
+    def test_buckets_by_week_and_status(self, client, due_grants):
+        """Test that only grants due within the horizon are bucketed."""
+        data = self.calendar(client, 2)
+        assert self.names(data) == ['later', 'next', 'soon']
+        assert data['total'] == 3
+        assert data['horizon_weeks'] == 2
+        assert len(data['weeks']) in (2, 3)
+        for week in data['weeks']:
+            assert datetime.fromisoformat(week['week_start']).weekday() == 0
+            assert week['count'] == sum(len(g) for g in week['statuses'].values())
+            for status, grants in week['statuses'].items():
+                assert all(g['status'] == status for g in grants)
+                assert [g['due_date'] for g in grants] == sorted(g['due_date'] for g in grants)
+        assert self.names(self.calendar(client, 8)) == ['far', 'later', 'next', 'soon']
+
+    def test_writes_update_index_incrementally(self, client, app, due_grants):
+        """Test that API writes and ingest are reflected without a rebuild."""
+        self.calendar(client, 2)
+        soon = due_grants['soon']
+        far_date = (datetime.utcnow() + timedelta(days=60)).isoformat()
+        client.put(f'/api/grants/{soon.id}', json={'due_date': far_date})
+        client.put(f"/api/grants/{due_grants['undated'].id}", json={
+            'due_date': (datetime.utcnow() + timedelta(days=2)).isoformat(), 'status': 'applied'
+        })
+        upsert_grants([{'name': 'ingested', 'funder': 'F',
+                        'due_date': (datetime.utcnow() + timedelta(days=5)).isoformat()}])
+        data = self.calendar(client, 2)
+        assert self.names(data) == ['ingested', 'later', 'next', 'undated']
+        assert any('applied' in week['statuses'] for week in data['weeks'])
+
+        # With nothing new, a query only checks the watermark
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            self.calendar(client, 2)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert len(statements) == 1 and 'max(' in statements[0]
+
+    def test_removed_grants_leave_the_calendar(self, client, due_grants):
+        """Test that grants marked duplicate are dropped, on build and on sync, and return if restored."""
+        soon, later = due_grants['soon'], due_grants['later']
+        client.put(f'/api/grants/{soon.id}', json={'status': 'duplicate'})
+        assert self.names(self.calendar(client, 2)) == ['later', 'next']
+        client.put(f'/api/grants/{later.id}', json={'status': 'duplicate'})
+        client.put(f'/api/grants/{soon.id}', json={'status': 'active'})
+        data = self.calendar(client, 2)
+        assert self.names(data) == ['next', 'soon']
+        assert data['total'] == 2
+
+    def test_late_commits_are_applied(self, client, due_grants):
+        """Test that a write committed late with an older updated_at still reaches the index."""
+        self.calendar(client, 2)
+        latest = db.session.query(db.func.max(Grant.updated_at)).scalar()
+        late = Grant(name='late', funder='F', due_date=datetime.utcnow() + timedelta(days=3),
+                     status='potential', updated_at=latest - timedelta(seconds=1))
+        db.session.add(late)
+        db.session.flush()
+        record_changes([(late.id, 'created')])
+        db.session.commit()
+        assert 'late' in self.names(self.calendar(client, 2))
+
+    def test_one_version_read_per_request(self, app, due_grants):
+        """Test that the indexes synced in one request share a single version read."""
+        with app.test_request_context():
+            deadline_index().sync()
+            suggest_index().sync()
+        db.session.add(Grant(name='new', funder='F'))
+        db.session.commit()
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            with app.test_request_context():
+                deadline_index().sync()
+                suggest_index().sync()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert len([statement for statement in statements if 'max(' in statement]) == 1
+        assert len(statements) == 3
+
+    def test_invalid_horizon(self, client):
+        """Test that the horizon must be a sensible number of weeks."""
+        for value in ('0', '53', 'soon'):
+            assert client.get(f'/api/grants/deadlines?horizon={value}').status_code == 400
+
+class TestFuzzyMatching:
+    """Test suite for typo-tolerant name and funder matching."""
+
+    @pytest.fixture
+    def named_grants(self, app):
+        names = ['Community Arts Program', 'Regional Community Program', 'Heritage Trail Fund', 'Youth Sport Program']
+        grants = [Grant(name=name, funder='Health Fund' if i % 2 else 'Arts Council', due_date=datetime(2025, 1, 1 + i))
+                  for i, name in enumerate(names)]
+        db.session.add_all(grants)
+        db.session.commit()
+        return grants
+
+    def test_similarity_matches_pg_trgm(self):
+        """Test that similarity follows pg_trgm's trigram scoring."""
+        assert similarity('word', 'word') == 1.0
+        assert similarity('word', '') == 0.0
+        assert round(similarity('word', 'two words'), 6) == round(4 / 11, 6)
+        assert similarity('Helth', 'Health') > 0.3 > similarity('Helth', 'Arts')
+
+    def test_fuzzy_funder_filter(self, client, named_grants):
+        """Test that a misspelt funder only matches with fuzzy=true."""
+        assert client.get('/api/grants?funder=Helth Fund').get_json()['data'] == []
+        body = client.get('/api/grants?funder=Helth Fund&fuzzy=true').get_json()
+        assert {g['funder'] for g in body['data']} == {'Health Fund'}
+        assert len(body['data']) == 2
+
+    @pytest.mark.parametrize('indexed', [False, True])
+    def test_fuzzy_name_search(self, client, app, named_grants, indexed):
+        """Test ranked typo-tolerant search with and without the FTS index."""
+        if indexed:
+            with db.engine.begin() as conn:
+                create_search_index(conn)
+        body = client.get('/api/grants/search?keyword=comunity progrm&fuzzy=true&include_count=true').get_json()
+        names = [g['name'] for g in body['data']]
+        assert sorted(names) == ['Community Arts Program', 'Regional Community Program']
+        scores = [g['score'] for g in body['data']]
+        assert scores == sorted(scores, reverse=True)
+        assert body['count'] == 2
+
+        ids = collect_pages(client, '/api/grants/search?keyword=comunity progrm&fuzzy=true', limit=1)
+        assert sorted(ids) == sorted(g.id for g in named_grants[:2])
+        body = client.get('/api/grants/search?keyword=comunity progrm&fuzzy=true&max_date=2025-01-01').get_json()
+        assert [g['name'] for g in body['data']] == ['Community Arts Program']
+        assert client.get('/api/grants/search?keyword=zzqx&fuzzy=true').get_json()['data'] == []
+
+    def test_capped_candidates_keep_best_matches(self, client, named_grants, monkeypatch):
+        """Test that the candidate cap keeps the best full-text matches and says it was hit."""
+        monkeypatch.setattr(fuzzy, 'MAX_CANDIDATES', 1)
+        db.session.add(Grant(name='Heritage Program', funder='F'))
+        db.session.commit()
+        with db.engine.begin() as conn:
+            create_search_index(conn)
+        body = client.get('/api/grants/search?keyword=heritge trail&fuzzy=true&include_count=true').get_json()
+        assert [g['name'] for g in body['data']] == ['Heritage Trail Fund']
+        assert (body['count'], body['count_capped']) == (1, False)
+
+        body = client.get('/api/grants/search?keyword=progrm&fuzzy=true&include_count=true').get_json()
+        assert (body['count'], body['count_capped']) == (1, True)
+        assert [g['name'] for g in body['data']] == ['Heritage Program']
+
+    def test_new_names_are_indexed(self, client, named_grants):
+        """Test that words from newly written grants become searchable."""
+        assert client.get('/api/grants/search?keyword=aquaculure&fuzzy=true').get_json()['data'] == []
+        client.post('/api/grants', json={'name': 'Aquaculture Innovation', 'funder': 'Fisheries'})
+        body = client.get('/api/grants/search?keyword=aquaculure&fuzzy=true').get_json()
+        assert [g['name'] for g in body['data']] == ['Aquaculture Innovation']
+
+class TestSuggest:
+    """Test suite for prefix autocomplete."""
+
+    @pytest.fixture
+    def named_grants(self, app):
+        grants = [
+            Grant(name='Community Arts Program', funder='Arts Council'),
+            Grant(name='Regional Community Program', funder='Health Fund'),
+            Grant(name='Youth Sport', funder='Community Foundation')
+        ]
+        db.session.add_all(grants)
+        db.session.commit()
+        return grants
+
+    def suggest(self, client, q, **params):
+        body = client.get('/api/grants/suggest', query_string=dict(q=q, **params)).get_json()
+        assert body['success'] is True
+        return [(s['type'], s['value']) for s in body['data']]
+
+    def test_prefix_matches_any_word(self, client, named_grants):
+        """Test that leading matches rank first and mid-value words also match."""
+        assert self.suggest(client, 'comm') == [
+            ('funder', 'Community Foundation'),
+            ('grant', 'Community Arts Program'),
+            ('grant', 'Regional Community Program')
+        ]
+        assert self.suggest(client, '  COMMUNITY   ar') == [('grant', 'Community Arts Program')]
+        assert self.suggest(client, 'health') == [('funder', 'Health Fund')]
+        assert self.suggest(client, 'comm', limit=1) == [('funder', 'Community Foundation')]
+        assert self.suggest(client, '') == []
+
+    def test_writes_update_index_incrementally(self, client, named_grants):
+        """Test that renames, new funders and ingest are picked up without a rebuild."""
+        self.suggest(client, 'comm')
+        client.put(f'/api/grants/{named_grants[0].id}', json={'name': 'Arts Program', 'funder': 'Health Fund'})
+        upsert_grants([{'name': 'Aquaculture Trial', 'funder': 'Fisheries'}])
+        assert self.suggest(client, 'comm') == [
+            ('funder', 'Community Foundation'),
+            ('grant', 'Regional Community Program')
+        ]
+        assert self.suggest(client, 'arts') == [('grant', 'Arts Program')]
+        assert self.suggest(client, 'aqua') == [('grant', 'Aquaculture Trial')]
+        assert self.suggest(client, 'fish') == [('funder', 'Fisheries')]
+
+    def test_removed_grants_are_not_suggested(self, client, named_grants):
+        """Test that duplicates drop out, taking funders only they used with them."""
+        client.put(f'/api/grants/{named_grants[2].id}', json={'status': 'duplicate'})
+        assert self.suggest(client, 'comm') == [
+            ('grant', 'Community Arts Program'),
+            ('grant', 'Regional Community Program')
+        ]
+        assert self.suggest(client, 'youth') == []
+        client.put(f'/api/grants/{named_grants[2].id}', json={'status': 'active'})
+        assert self.suggest(client, 'youth') == [('grant', 'Youth Sport')]
+        assert ('funder', 'Community Foundation') in self.suggest(client, 'comm')
+
+    def test_invalid_limit(self, client):
+        """Test that out-of-range limits are rejected."""
+        assert client.get('/api/grants/suggest?q=a&limit=0').status_code == 400
+        assert client.get('/api/grants/suggest?q=a&limit=many').status_code == 400
+
+class TestAmounts:
+    """Test suite for parsed amount bounds, range filters and amount sorting."""
+
+    @pytest.fixture
+    def amount_grants(self, client):
+        amounts = {
+            'small': '$5,000', 'range': '$10,000 - $60,000', 'capped': 'Up to $40k',
+            'open': 'From $100,000', 'large': '$250,000', 'unknown': 'Varies'
+        }
+        for name, text in amounts.items():
+            client.post('/api/grants', json={'name': name, 'funder': 'F', 'amount_string': text})
+        client.post('/api/grants', json={'name': 'unset', 'funder': 'F'})
+        return {g.name: g for g in Grant.query}
+
+    def names(self, client, url):
+        body = client.get(url).get_json()
+        assert body['success'] is True, body
+        return [g['name'] for g in body['data']]
+
+    def test_bounds_are_parsed_on_write(self, client, amount_grants):
+        """Test that create, update and ingest keep the numeric bounds in step."""
+        assert (amount_grants['range'].amount_min, amount_grants['range'].amount_max) == (10000, 60000)
+        assert (amount_grants['capped'].amount_min, amount_grants['capped'].amount_max) == (None, 40000)
+        client.put(f"/api/grants/{amount_grants['small'].id}", json={'amount_string': '$7,500'})
+        assert db.session.get(Grant, amount_grants['small'].id).amount_max == 7500
+
+        upsert_grants([{'name': 'ingested', 'funder': 'F', 'source_url': 'https://example.org/a',
+                        'amount_string': '$1m'}])
+        upsert_grants([{'name': 'ingested', 'funder': 'F', 'source_url': 'https://example.org/a'}])
+        grant = Grant.query.filter_by(name='ingested').one()
+        assert (grant.amount_string, grant.amount_min, grant.amount_max) == ('$1m', 1_000_000, 1_000_000)
+
+    def test_invalid_bounds_are_rejected(self, client, amount_grants):
+        """Test that non-numeric explicit bounds are a 400, leaving the grant unchanged."""
+        response = client.post('/api/grants', json={'name': 'bad', 'funder': 'F', 'amount_min': 'abc'})
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'amount_min must be a number'
+        grant_id = amount_grants['small'].id
+        assert client.put(f'/api/grants/{grant_id}', json={'amount_max': [1]}).status_code == 400
+        assert db.session.get(Grant, grant_id).amount_max == 5000
+
+        results = upsert_grants([{'name': 'bad', 'funder': 'F', 'source_url': 'u1', 'amount_min': 'abc'}])
+        assert results[0]['status'] == 'error'
+
+    def test_range_filters(self, client, amount_grants):
+        """Test that filters keep overlapping ranges and drop unparsed amounts."""
+        assert sorted(self.names(client, '/api/grants?min_amount=50000')) == ['large', 'open', 'range']
+        assert sorted(self.names(client, '/api/grants?max_amount=20000')) == ['capped', 'range', 'small']
+        assert sorted(self.names(client, '/api/grants/search?keyword=open&min_amount=1')) == ['open']
+        assert client.get('/api/grants?min_amount=lots').status_code == 400
+        assert client.get('/api/grants?min_amount=10&max_amount=5').status_code == 400
+
+    def test_sort_by_amount(self, client, amount_grants):
+        """Test ascending and descending amount order, paged by cursor."""
+        ascending = ['small', 'capped', 'range', 'large', 'open', 'unknown', 'unset']
+        assert self.names(client, '/api/grants?sort=amount') == ascending
+        ids = collect_pages(client, '/api/grants?sort=-amount', limit=2)
+        assert [db.session.get(Grant, i).name for i in ids] == ['large', 'range', 'capped', 'small', 'unset', 'unknown', 'open']
+        ids = collect_pages(client, '/api/grants/search?sort=amount&fields=name', limit=3)
+        assert [db.session.get(Grant, i).name for i in ids] == ascending
+        assert client.get('/api/grants?sort=size').status_code == 400
+
+    def test_backfill(self, app, amount_grants):
+        """Test that the migration backfill parses existing amount text."""
+        db.session.execute(Grant.__table__.update().values(amount_min=None, amount_max=None))
+        db.session.commit()
+        with db.engine.begin() as conn:
+            assert backfill_amounts(conn, batch_size=2) == 5
+        db.session.expire_all()
+        assert db.session.get(Grant, amount_grants['open'].id).amount_min == 100000
+
+class TestRowEncoder:
+    """Test suite for the plain-row listing path."""
+
+    def test_rows_match_model_serialization(self, client, sample_grants):
+        """Test that listings built from column rows match Grant.to_dict."""
+        sample_grants[0].eligibility_analysis = {'score': 80}
+        db.session.commit()
+        body = client.get('/api/grants?limit=50').get_json()
+        expected = client.application.json.loads(
+            client.application.json.dumps([g.to_dict() for g in sorted(sample_grants, key=lambda g: g.id)])
+        )
+        assert sorted(body['data'], key=lambda g: g['id']) == expected
+
+    def test_key_columns_are_not_encoded(self, app, sample_grants):
+        """Test that sort-key columns selected for paging stay out of the output."""
+        encoder = row_encoder(['id', 'name'], ['id', 'due_date'])
+        assert len(encoder.columns) == 3
+        row = encoder.query().filter(Grant.id == sample_grants[0].id).one()
+        assert row.due_date == sample_grants[0].due_date
+        assert encoder.encode(row) == {'id': sample_grants[0].id, 'name': 'Grant 0'}
+        assert row_encoder(['id', 'name'], ['id', 'due_date']) is encoder
+
+class TestChangeFeed:
+    """Test suite for the incremental grant change feed."""
+
+    def read(self, client, cursor=None, **params):
+        if cursor:
+            params['since'] = cursor
+        body = client.get('/api/grants/changes', query_string=params).get_json()
+        assert body['success'] is True, body
+        return body
+
+    def test_feed_follows_writes_in_order(self, client):
+        """Test that creates, updates, closes and ingest appear once each, in order."""
+        start = self.read(client)
+        assert start['data'] == [] and start['has_more'] is False
+
+        first = client.post('/api/grants', json={'name': 'A', 'funder': 'F'}).get_json()['data']['id']
+        second = client.post('/api/grants', json={'name': 'B', 'funder': 'F'}).get_json()['data']['id']
+        body = self.read(client, start['next_cursor'])
+        assert [(c['id'], c['operation']) for c in body['data']] == [(first, 'created'), (second, 'created')]
+        assert body['data'][0]['grant']['name'] == 'A'
+
+        cursor = body['next_cursor']
+        client.put(f'/api/grants/{first}', json={'name': 'A2'})
+        client.put(f'/api/grants/{second}', json={'status': 'closed'})
+        client.put(f'/api/grants/{first}', json={'description': 'again'})
+        upsert_grants([{'name': 'C', 'funder': 'F', 'source_url': 'https://example.org/c'}])
+        body = self.read(client, cursor)
+        assert [(c['id'], c['operation']) for c in body['data']] == [
+            (second, 'closed'), (first, 'updated'), (body['data'][2]['id'], 'created')
+        ]
+        assert body['data'][1]['grant']['name'] == 'A2'
+        seqs = [c['seq'] for c in body['data']]
+        assert seqs == sorted(seqs)
+
+        caught_up = self.read(client, body['next_cursor'])
+        assert caught_up['data'] == [] and caught_up['next_cursor'] == body['next_cursor']
+
+    def test_paging_and_tombstones(self, client):
+        """Test limit/has_more paging and tombstones for removed grants."""
+        ids = [client.post('/api/grants', json={'name': f'G{i}', 'funder': 'F'}).get_json()['data']['id']
+               for i in range(5)]
+        client.put(f'/api/grants/{ids[0]}', json={'status': 'duplicate'})
+        seen, cursor = [], None
+        while True:
+            body = self.read(client, cursor, limit=2, fields='name')
+            seen.extend(body['data'])
+            cursor = body['next_cursor']
+            if not body['has_more']:
+                break
+        assert [c['id'] for c in seen] == ids + [ids[0]]
+        assert seen[-1]['operation'] == 'deleted' and seen[-1]['grant'] is None
+        assert set(seen[1]['grant']) == {'id', 'name'}
+
+    def test_invalid_cursor(self, client):
+        """Test that malformed cursors are rejected."""
+        assert client.get('/api/grants/changes?since=nope').status_code == 400
+        assert client.get(f'/api/grants/changes?since={encode_cursor(None, 1)}').status_code == 400
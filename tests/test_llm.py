@@ -0,0 +1,63 @@
+import asyncio
+from contextlib import asynccontextmanager
+from api.llm import LLMClient, llm_client
+
+def test_one_client_per_loop():
+    """Test that calls on a loop share its client and other loops get their own."""
+    async def twice():
+        return llm_client(), llm_client()
+
+    first, again = asyncio.run(twice())
+    assert first is again
+    other, _ = asyncio.run(twice())
+    assert other is not first
+
+def test_client_timeouts():
+    """Test that the client carries the configured timeouts and retries."""
+    async def build():
+        return LLMClient(timeout=30, connect_timeout=2, max_retries=1)
+
+    client = asyncio.run(build())
+    assert client.client.timeout.read == 30
+    assert client.client.timeout.connect == 2
+    assert client.client.max_retries == 1
+
+def test_in_flight_calls_are_capped():
+    """Test that calls past the cap wait for a slot."""
+    peak = 0
+
+    async def burst():
+        client = LLMClient(max_in_flight=3)
+
+        async def create(**params):
+            nonlocal peak
+            peak = max(peak, client.in_flight)
+            await asyncio.sleep(0.01)
+            return params['n']
+
+        client.client.messages.create = create
+        return await asyncio.gather(*(client.create_message(n=i) for i in range(10)))
+
+    assert asyncio.run(burst()) == list(range(10))
+    assert peak == 3
+
+def test_streams_hold_a_slot():
+    """Test that a stream counts as in flight until it is closed."""
+
+    async def run():
+        client = LLMClient(max_in_flight=1)
+
+        @asynccontextmanager
+        async def stream(**params):
+            yield params['n']
+
+        client.client.messages.stream = stream
+        async with client.stream_message(n=1) as first:
+            assert (first, client.in_flight) == (1, 1)
+            waiting = asyncio.ensure_future(client.create_message(n=2))
+            await asyncio.sleep(0.01)
+            assert not waiting.done()
+        waiting.cancel()
+        return client.in_flight
+
+    assert asyncio.run(run()) == 0
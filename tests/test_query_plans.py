@@ -0,0 +1,118 @@
+import pytest
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from models import db
+from models.grant import Grant
+from api.search_index import create_search_index
+
+# A plan step that reads the whole grants table, through an index or not
+FULL_SCAN = re.compile(r'^SCAN grants(\s|$)')
+
+# Full scans that are intended, by name: request -> the statement allowed to scan
+ALLOWED_SCANS = {
+    # The caller asked for the total of every grant; there is nothing to narrow it by
+    'unfiltered include_count': ('/api/grants?limit=10&include_count=true', re.compile(r'^SELECT count\(\*\)'))
+}
+
+@pytest.fixture
+def app(app):
+    """The shared app with the full-text index installed and 60 grants."""
+    with db.engine.begin() as conn:
+        create_search_index(conn)
+    base = datetime(2025, 1, 1)
+    db.session.add_all([
+        Grant(
+            name=f'Community Grant {i}',
+            funder=f'Funder {i % 5}',
+            source_url=f'https://example.org/{i}',
+            due_date=base + timedelta(days=i) if i % 4 else None,
+            status=['potential', 'active', 'closed'][i % 3],
+            amount_max=1000.0 * i if i % 3 else None,
+            description='Support for local community programs'
+        )
+        for i in range(60)
+    ])
+    db.session.commit()
+    return app
+
+@pytest.fixture
+def statements(app):
+    """Capture the SELECT statements (with parameters) sent by each request."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    yield captured
+    event.remove(db.engine, 'before_cursor_execute', capture)
+
+def query_plan(statement, parameters):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+    conn = db.session.connection()
+    return [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+
+def assert_no_full_scans(statements, url=None):
+    """Fail if any captured statement scans grants, unless ``ALLOWED_SCANS`` names it for ``url``."""
+    assert statements, 'no queries were captured'
+    allowed = [pattern for allowed_url, pattern in ALLOWED_SCANS.values() if allowed_url == url]
+    for statement, parameters in statements:
+        if any(pattern.match(statement.lstrip()) for pattern in allowed):
+            continue
+        plan = query_plan(statement, parameters)
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+        assert not scans, f"Full table scan in plan {plan} for:\n{statement}"
+
+def next_cursor(client, url):
+    return client.get(url).get_json()['next_cursor']
+
+HOT_REQUESTS = [
+    '/api/grants?limit=10',
+    '/api/grants?limit=10&status=active',
+    '/api/grants?limit=10&funder=Funder%202',
+    '/api/grants?limit=10&status=active&include_count=true',
+    '/api/grants?limit=10&fields=name,funder,due_date,status',
+    '/api/grants/search?min_date=2025-01-10&max_date=2025-02-10&limit=10',
+    '/api/grants/search?keyword=community&limit=10',
+    '/api/grants/search?keyword=community&min_date=2025-01-10&limit=10',
+    '/api/grants?limit=10&sort=-amount',
+    '/api/grants?limit=10&min_amount=20000&sort=amount',
+    '/api/grants/7',
+    *(url for url, _ in ALLOWED_SCANS.values())
+]
+
+@pytest.mark.parametrize('url', HOT_REQUESTS)
+def test_endpoint_queries_use_indexes(client, statements, url):
+    """Test that each hot endpoint query is served from an index."""
+    assert client.get(url).status_code == 200
+    assert_no_full_scans(statements, url)
+
+@pytest.mark.parametrize('url', [
+    '/api/grants?limit=10',
+    '/api/grants?limit=10&status=active',
+    '/api/grants/search?min_date=2025-01-10&limit=10',
+    '/api/grants?limit=10&sort=-amount'
+])
+def test_cursor_pages_seek(client, statements, url):
+    """Test that later pages seek to the cursor instead of scanning from the start."""
+    cursor = next_cursor(client, url)
+    statements.clear()
+    assert client.get(f'{url}&cursor={cursor}').status_code == 200
+    page_queries = [(s, p) for s, p in statements if 'ORDER BY' in s]
+    assert page_queries
+    for statement, parameters in page_queries:
+        assert all(step.startswith('SEARCH') for step in query_plan(statement, parameters))
+
+def test_bulk_source_url_lookup_uses_index(client, statements):
+    """Test that the upsert pre-lookup on source_url is an index search."""
+    rows = [{'name': 'x', 'funder': 'y', 'source_url': f'https://example.org/{i}'} for i in range(3)]
+    assert client.post('/api/grants/bulk', json=rows).status_code == 200
+    assert_no_full_scans(statements)
+
+def test_org_lookup_uses_index(app):
+    """Test that grants are looked up by organisation through an index."""
+    statement = Grant.query.filter(Grant.org_id == 1).statement.compile(db.engine)
+    plan = query_plan(str(statement), tuple(statement.params.values()))
+    assert not any(FULL_SCAN.match(step) for step in plan), plan
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from models import db
+from models.grant import Grant
+from models.organisation import OrganisationProfile
+from api.eligibility_api import eligibility_bp
+from api import eligibility_scans, relevance
+from api.relevance import RelevanceIndex, profile_terms, relevance_index
+
+GRANTS = [
+    (1, 'Youth Music Program', 'Music workshops for young people in regional towns'),
+    (2, 'Regional Arts Fund', 'Supports arts projects in regional and remote communities'),
+    (3, 'Road Safety Grant', 'Funding for road safety infrastructure and signage'),
+    (4, 'Seniors Wellbeing', 'Programs for seniors living alone'),
+    (5, 'Community Sport', 'Sport equipment for local clubs')
+]
+
+@pytest.fixture
+def blueprints():
+    return [eligibility_bp]
+
+@pytest.fixture
+def database_uri(tmp_path):
+    """A file database, shared with the scan thread."""
+    return f"sqlite:///{tmp_path / 'relevance.db'}"
+
+@pytest.fixture
+def app(app):
+    """The shared app with an arts organisation and a few grants."""
+    db.session.add(OrganisationProfile(
+        id=1, name='Outback Arts Collective', mission='Arts and music for young people',
+        focus_areas=['arts', 'music'], target_demographics='Youth in regional communities'
+    ))
+    db.session.add(OrganisationProfile(id=2, name='Blank Org'))
+    db.session.add_all([
+        Grant(id=grant_id, name=name, description=description, funder='Lotterywest', status='potential')
+        for grant_id, name, description in GRANTS
+    ])
+    db.session.commit()
+    return app
+
+@pytest.fixture
+def scanned(monkeypatch):
+    """Replace the LLM-backed scan, recording the grants it is called for in order."""
+    calls = []
+
+    async def scan(grant, org_profile):
+        calls.append(grant.id)
+        await asyncio.sleep(0.01)
+        return {'score': 0.5}
+
+    monkeypatch.setattr(eligibility_scans, 'analyze_eligibility', scan)
+    return calls
+
+def wait_for(client, scan_id):
+    """Poll a scan until it completes."""
+    deadline = time.time() + 10
+    while True:
+        body = client.get(f'/api/orgs/1/eligibility-scan/{scan_id}').get_json()
+        if body['scan']['status'] == 'completed' or time.time() > deadline:
+            return body
+        time.sleep(0.02)
+
+def test_profile_terms():
+    """Test that profile terms combine the fields, drop stopwords and fall back to profile text."""
+    profile = SimpleNamespace(mission='Arts for the young', focus_areas=['arts', 'music'],
+                              target_demographics=None, profile_text='ignored')
+    assert profile_terms(profile) == ['arts', 'young', 'music']
+    assert profile_terms(SimpleNamespace(profile_text='Rural health')) == ['rural', 'health']
+    assert profile_terms(SimpleNamespace()) == []
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_scores_rank_overlap(app, monkeypatch, use_numpy):
+    """Test that both scoring paths rank grants by shared terms and stay within 0-1."""
+    if not use_numpy:
+        monkeypatch.setattr(relevance, 'numpy', None)
+    elif relevance.numpy is None:
+        pytest.skip('numpy is not installed')
+    terms = profile_terms(db.session.get(OrganisationProfile, 1))
+    scores = RelevanceIndex().relevance(terms, [1, 2, 3, 4, 5, 999])
+    assert scores[1] > scores[2] > 0
+    assert scores[3] == scores[4] == scores[5] == scores[999] == 0.0
+    assert all(0 <= score <= 1 for score in scores.values())
+
+def test_paths_agree(app, monkeypatch):
+    """Test that the NumPy and pure-Python paths give the same scores."""
+    if relevance.numpy is None:
+        pytest.skip('numpy is not installed')
+    terms = profile_terms(db.session.get(OrganisationProfile, 1))
+    vectorized = RelevanceIndex().relevance(terms)
+    monkeypatch.setattr(relevance, 'numpy', None)
+    assert RelevanceIndex().relevance(terms) == vectorized
+
+def test_index_follows_updates(app):
+    """Test that edited grants are rescored on the next query."""
+    terms = ['safety']
+    index = relevance_index()
+    assert set(index.relevance(terms)) == {3}
+    time.sleep(0.01)
+    grant = db.session.get(Grant, 3)
+    grant.name, grant.description = 'Arts Grant', 'For artists'
+    db.session.get(Grant, 5).description = 'Sport safety equipment'
+    db.session.commit()
+    assert set(index.relevance(terms)) == {5}
+
+def test_removed_grants_are_not_scored(app):
+    """Test that duplicates lose their postings and stop counting as documents."""
+    terms = ['regional']
+    index = relevance_index()
+    before = index.relevance(terms)
+    assert set(before) == {1, 2} and len(index) == 5
+    time.sleep(0.01)
+    db.session.get(Grant, 1).status = 'duplicate'
+    db.session.commit()
+    after = index.relevance(terms)
+    assert set(after) == {2} and len(index) == 4
+    assert after == RelevanceIndex().relevance(terms)
+    time.sleep(0.01)
+    db.session.get(Grant, 1).status = 'potential'
+    db.session.commit()
+    assert index.relevance(terms) == before
+
+def test_relevance_endpoint(client):
+    """Test ranking, thresholds, sparse fields and paging of the relevance listing."""
+    body = client.get('/api/orgs/1/relevance?fields=name').get_json()
+    assert [grant['id'] for grant in body['data']] == [1, 2]
+    assert set(body['data'][0]) == {'id', 'name', 'relevance'}
+
+    first = client.get('/api/orgs/1/relevance?limit=1').get_json()
+    assert [grant['id'] for grant in first['data']] == [1]
+    rest = client.get(f"/api/orgs/1/relevance?limit=1&cursor={first['next_cursor']}").get_json()
+    assert [grant['id'] for grant in rest['data']] == [2]
+
+    threshold = body['data'][1]['relevance'] + 0.01
+    assert [g['id'] for g in client.get(f'/api/orgs/1/relevance?min_relevance={threshold}').get_json()['data']] == [1]
+    assert client.get('/api/orgs/2/relevance').get_json()['data'] == []
+    assert client.get('/api/orgs/1/relevance?min_relevance=2').status_code == 400
+    assert client.get('/api/orgs/9/relevance').status_code == 404
+
+def test_scan_skips_irrelevant_grants(client, scanned):
+    """Test that a scan analyses grants best match first and skips those under min_relevance."""
+    response = client.post('/api/orgs/1/eligibility-scan', json={
+        'grant_ids': [3, 2, 1, 4], 'concurrency': 1, 'min_relevance': 0.01
+    })
+    assert response.status_code == 202
+    scan = response.get_json()['data']
+    assert (scan['total'], scan['skipped'], scan['min_relevance']) == (4, 2, 0.01)
+
+    body = wait_for(client, scan['id'])
+    assert scanned == [1, 2]
+    assert body['scan']['completed'] == 2
+    assert all(result['relevance'] > 0 for result in body['data'])
+
+    skipped = client.get(f"/api/orgs/1/eligibility-scan/{scan['id']}?status=skipped").get_json()
+    assert sorted(result['grant_id'] for result in skipped['data']) == [3, 4]
+    assert {result['relevance'] for result in skipped['data']} == {0.0}
+
+def test_scan_with_everything_skipped(client, scanned):
+    """Test that a scan with nothing left to analyse completes at once."""
+    scan = client.post('/api/orgs/1/eligibility-scan', json={'grant_ids': [3, 5], 'min_relevance': 0.5})
+    assert scan.get_json()['data']['status'] == 'completed'
+    assert scan.get_json()['data']['skipped'] == 2
+    assert scanned == []
+    assert client.post('/api/orgs/2/eligibility-scan', json={'grant_ids': [1], 'min_relevance': 0.1}).status_code == 400
@@ -0,0 +1,148 @@
+import pytest
+from api import saved_searches_api
+from models import db
+from models.saved_search import Notification
+from api.grants_api import grants_bp
+from api.saved_searches_api import saved_searches_bp
+from api.ingest import upsert_grants
+from api.amounts import parse_amount_range
+from api.percolator import percolator_index
+
+@pytest.fixture
+def blueprints():
+    return [grants_bp, saved_searches_bp]
+
+@pytest.fixture
+def searches(client):
+    """Saved searches covering each kind of predicate."""
+    payloads = {
+        'arts': {'name': 'Arts', 'user_id': 1, 'keyword': 'Regional Arts'},
+        'health': {'name': 'Health', 'user_id': 2, 'funder': 'Health Fund'},
+        'big': {'name': 'Big', 'user_id': 1, 'min_amount': 50000, 'max_date': '2025-12-31'},
+        'small_arts': {'name': 'Small arts', 'user_id': 2, 'keyword': 'arts', 'max_amount': 10000}
+    }
+    ids = {}
+    for key, payload in payloads.items():
+        response = client.post('/api/saved-searches', json=payload)
+        assert response.status_code == 201
+        ids[key] = response.get_json()['data']['id']
+    return ids
+
+def matched(client, **params):
+    query = '&'.join(f'{k}={v}' for k, v in params.items())
+    return sorted(
+        (n['saved_search_id'], n['grant_id'])
+        for n in client.get(f'/api/notifications?{query}').get_json()['data']
+    )
+
+class TestPercolator:
+    """Test suite for saved-search matching at write time."""
+
+    def test_amount_ranges(self):
+        """Test parsing of the amount text scrapers produce."""
+        assert parse_amount_range('$5,000 - $20,000') == (5000, 20000)
+        assert parse_amount_range('Up to $10k') == (None, 10000)
+        assert parse_amount_range('$75,000') == (75000, 75000)
+        assert parse_amount_range('From $1 million') == (1_000_000, None)
+        assert parse_amount_range('Varies') == (None, None)
+
+    def test_ingest_records_matches(self, client, searches):
+        """Test that ingested grants notify exactly the searches they satisfy."""
+        results = upsert_grants([
+            {'name': 'Regional arts program', 'funder': 'Arts Council', 'source_url': 'a',
+             'amount_string': '$5,000', 'due_date': '2025-06-01'},
+            {'name': 'Clinic upgrades', 'funder': 'Health Fund', 'source_url': 'b',
+             'amount_string': 'Up to $100,000', 'due_date': '2025-06-01'},
+            {'name': 'Arts infrastructure', 'funder': 'Arts Council', 'source_url': 'c',
+             'amount_string': '$60,000 - $80,000', 'due_date': '2026-02-01'},
+        ])
+        a, b, c = (r['id'] for r in results)
+        assert matched(client) == sorted([
+            (searches['arts'], a), (searches['small_arts'], a),
+            (searches['health'], b), (searches['big'], b)
+        ])
+        assert matched(client, user_id=2) == sorted([(searches['small_arts'], a), (searches['health'], b)])
+
+        # Rewriting a grant doesn't notify twice; a change that newly matches does
+        upsert_grants([{'name': 'Regional arts program', 'funder': 'Arts Council', 'source_url': 'a'}])
+        client.put(f'/api/grants/{c}', json={'due_date': '2025-11-01'})
+        assert (searches['big'], c) in matched(client)
+        assert len(matched(client)) == 5
+
+    def test_amount_alerts_follow_stored_bounds(self, client, searches):
+        """Test that amount alerts use the stored bounds, as the listing filters do."""
+        grant_id = upsert_grants([{
+            'name': 'Capital works', 'funder': 'Infrastructure Fund', 'source_url': 'd',
+            'amount_string': 'Contact the funder', 'amount_min': 60000, 'amount_max': 90000,
+            'due_date': '2025-06-01'
+        }])[0]['id']
+        assert matched(client) == [(searches['big'], grant_id)]
+        listed = client.get('/api/grants?min_amount=50000&max_date=2025-12-31').get_json()['data']
+        assert [grant['id'] for grant in listed] == [grant_id]
+
+    def test_create_grant_is_percolated(self, client, searches):
+        """Test that grants created through the API are matched."""
+        grant_id = client.post('/api/grants', json={'name': 'Wellbeing', 'funder': 'Health Fund'}).get_json()['data']['id']
+        assert matched(client) == [(searches['health'], grant_id)]
+
+    def test_only_candidate_searches_are_checked(self, app, searches):
+        """Test that a grant is verified only against searches sharing its anchors."""
+        index = percolator_index()
+        index.sync()
+        grant = type('Row', (), dict(
+            id=1, name='Regional arts', description=None, funder='Other',
+            due_date=None, amount_min=None, amount_max=None
+        ))
+        candidates = index.candidates({'regional', 'arts'}, 'Other')
+        assert sorted(c.id for c in candidates) == sorted([searches['arts'], searches['small_arts'], searches['big']])
+        assert [s.id for s in index.match(grant)] == [searches['arts']]
+
+    def test_notification_lifecycle(self, client, searches):
+        """Test reading notifications and deleting a saved search."""
+        upsert_grants([{'name': 'Clinic', 'funder': 'Health Fund'}])
+        notification = client.get('/api/notifications?unread=true').get_json()['data'][0]
+        assert client.post(f"/api/notifications/{notification['id']}/read").get_json()['data']['read_at']
+        assert client.get('/api/notifications?unread=true').get_json()['data'] == []
+
+        assert client.delete(f"/api/saved-searches/{searches['health']}").status_code == 200
+        assert Notification.query.count() == 0
+        upsert_grants([{'name': 'Clinic 2', 'funder': 'Health Fund'}])
+        assert Notification.query.count() == 0
+
+    def test_listings_are_paginated(self, client, searches):
+        """Test that saved searches and notifications are returned a page at a time."""
+        upsert_grants([{'name': f'Clinic {i}', 'funder': 'Health Fund'} for i in range(3)])
+
+        def pages(url):
+            ids, cursor = [], None
+            while True:
+                body = client.get(f"{url}&cursor={cursor}" if cursor else url).get_json()
+                assert len(body['data']) <= 2
+                ids.extend(item['id'] for item in body['data'])
+                cursor = body['next_cursor']
+                if not cursor:
+                    return ids
+
+        assert pages('/api/saved-searches?limit=2') == sorted(searches.values())
+        expected = [n.id for n in Notification.query.order_by(Notification.id.desc())]
+        assert len(expected) == 3 and pages('/api/notifications?limit=2') == expected
+        assert client.get('/api/notifications?limit=0').status_code == 400
+        assert client.get('/api/saved-searches?cursor=bogus').status_code == 400
+
+    def test_unexpected_errors_roll_back(self, client, monkeypatch):
+        """Test that a failure outside the database layer is a 500 with the session rolled back."""
+        def fail(data):
+            db.session.add(Notification(saved_search_id=1, grant_id=1))
+            raise RuntimeError('boom')
+
+        monkeypatch.setattr(saved_searches_api, 'build_saved_search', fail)
+        response = client.post('/api/saved-searches', json={'name': 'x'})
+        assert response.status_code == 500
+        assert response.get_json()['error'] == 'Failed to create saved search'
+        assert not db.session.new
+
+    def test_invalid_saved_search(self, client):
+        """Test payload validation."""
+        assert client.post('/api/saved-searches', json={'keyword': 'x'}).status_code == 400
+        assert client.post('/api/saved-searches', json={'name': 'x', 'min_amount': 5, 'max_amount': 1}).status_code == 400
+        assert client.post('/api/saved-searches', json={'name': 'x', 'min_date': 'soon'}).status_code == 400
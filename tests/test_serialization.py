@@ -0,0 +1,65 @@
+import pytest
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Flask, jsonify, request
+from api.serialization import available_backends
+from api.export import iter_csv, iter_ndjson
+from models.grant import Grant
+
+PAYLOAD = {
+    'id': 1,
+    'name': 'Grant – Ü',
+    'due_date': datetime(2025, 3, 4, 5, 6, 7, 890000),
+    'opens': date(2025, 1, 2),
+    'amount': Decimal('1500.50'),
+    'eligibility_analysis': {'score': 0.5, 'points': ['a', 'b'], 3: None}
+}
+
+EXPECTED = {
+    'id': 1,
+    'name': 'Grant – Ü',
+    'due_date': '2025-03-04T05:06:07.890000',
+    'opens': '2025-01-02',
+    'amount': '1500.50',
+    'eligibility_analysis': {'score': 0.5, 'points': ['a', 'b'], '3': None}
+}
+
+@pytest.mark.parametrize('name', sorted(available_backends()))
+def test_backends_agree(name):
+    """Test that every backend produces the same compact JSON."""
+    backend = available_backends()[name]
+    encoded = backend.dumps_bytes(PAYLOAD)
+    assert json.loads(encoded) == EXPECTED
+    assert b' ' not in encoded.replace('Grant – Ü'.encode(), b'')
+    assert backend.loads(backend.dumps(PAYLOAD)) == EXPECTED
+    with pytest.raises(TypeError):
+        backend.dumps({'value': object()})
+
+def test_flask_provider(make_app):
+    """Test that jsonify and request parsing go through the provider."""
+    app = make_app(database_uri=None)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify(dict(PAYLOAD, received=request.get_json()))
+
+    response = app.test_client().post('/echo', data='{"x": 1}', content_type='application/json')
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == dict(EXPECTED, received={'x': 1})
+
+def test_export_encodes_datetimes():
+    """Test that exports serialize raw datetimes as ISO 8601."""
+    records = [{'id': 1, 'due_date': datetime(2025, 1, 2), 'eligibility_analysis': {}}]
+    line = b''.join(iter_ndjson(records)).decode()
+    assert json.loads(line)['due_date'] == '2025-01-02T00:00:00'
+    assert '2025-01-02T00:00:00' in ''.join(iter_csv(records))
+
+def test_to_dict_without_provider():
+    """Test that model dicts keep ISO dates under Flask's default JSON provider."""
+    app = Flask(__name__)
+    grant = Grant(id=1, name='Arts Fund', funder='Lotterywest', due_date=datetime(2025, 1, 2))
+    with app.app_context():
+        data = json.loads(app.json.dumps(grant.to_dict()))
+    assert data['due_date'] == '2025-01-02T00:00:00'
+    assert grant.to_dict(['due_date']) == {'due_date': '2025-01-02T00:00:00'}